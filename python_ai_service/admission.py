@@ -0,0 +1,255 @@
+"""
+Admission control for the AI prediction service's heavy endpoints
+
+Each limited route has a number of concurrent slots and a bounded FIFO
+queue in front of them. A request that finds the slots taken waits in the
+queue for at most ADMISSION_QUEUE_TIMEOUT seconds (less if its deadline is
+sooner); a full queue or an expired wait is answered with 503 and a
+Retry-After estimated from recent service times. Routes without a limit,
+such as /health and /metrics, never queue behind the heavy ones.
+
+A request may carry a deadline as an X-Request-Timeout header (seconds).
+Routes that can degrade (prediction routes) serve their last materialized
+result marked stale when the deadline cannot be met, instead of a 503.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import Callable, Dict, Optional, Tuple, Union
+
+from fastapi import HTTPException, Request
+
+from ml_models.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_REQUESTS = REGISTRY.counter(
+    'admission_requests_total',
+    'Requests to limited routes by outcome (admitted at once, after queueing, rejected, or past their deadline)',
+    ('route', 'outcome')
+)
+ADMISSION_IN_FLIGHT = REGISTRY.gauge('admission_in_flight', 'Requests holding a route slot', ('route',))
+ADMISSION_QUEUED = REGISTRY.gauge('admission_queued', 'Requests waiting for a route slot', ('route',))
+ADMISSION_QUEUE_WAIT = REGISTRY.histogram(
+    'admission_queue_wait_seconds',
+    'Time requests waited for a route slot',
+    ('route',)
+)
+
+DEADLINE_HEADER = 'x-request-timeout'
+
+# Weight of the latest request in the running service time estimate
+SERVICE_TIME_SMOOTHING = 0.2
+
+
+class AdmissionRejected(Exception):
+    """No slot could be had; `reason` is queue_full, queue_timeout or deadline"""
+
+    def __init__(self, message: str, reason: str, retry_after: int):
+        super().__init__(message)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def parse_limits(spec: str) -> Dict[str, Tuple[int, int]]:
+    """'route=concurrency:queue,...' -> {route: (concurrency, queue)}"""
+    limits = {}
+    for item in spec.split(','):
+        if not item.strip():
+            continue
+        route, _, values = item.partition('=')
+        concurrency, _, queue = values.partition(':')
+        limits[route.strip()] = (int(concurrency), int(queue or 0))
+    return limits
+
+
+class AdmissionLimit:
+    """Concurrency slots and a bounded FIFO queue for one route, on one event loop"""
+
+    def __init__(self, route: str, max_concurrent: int, max_queue: int):
+        self.route = route
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.active = 0
+        self._waiters = deque()
+        # Running estimate of how long a request holds its slot
+        self._service_seconds = None
+
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """Seconds until the queue ahead of a new request has likely drained"""
+        if self._service_seconds is None:
+            return 1
+        return max(1, math.ceil(self._service_seconds * (len(self._waiters) + 1) / self.max_concurrent))
+
+    async def acquire(self, timeout: Optional[float], reason: str = 'queue_timeout') -> bool:
+        """Take a slot, queueing up to `timeout` seconds; True if the request had to queue"""
+        if self.active < self.max_concurrent and not self._waiters:
+            self.active += 1
+            self._update_gauges()
+            return False
+        if len(self._waiters) >= self.max_queue or (timeout is not None and timeout <= 0):
+            raise AdmissionRejected(
+                f"{self.route} is saturated ({self.active} running, {len(self._waiters)} queued)",
+                'queue_full' if len(self._waiters) >= self.max_queue else reason,
+                self.retry_after()
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._update_gauges()
+        try:
+            # A slot is handed over by release(), which resolves the future
+            await asyncio.wait_for(waiter, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            # The slot may have been handed over just as the wait ended
+            if waiter.done() and not waiter.cancelled():
+                self._hand_over()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise AdmissionRejected(
+                f"Timed out after {timeout:.3g}s waiting for a {self.route} slot", reason, self.retry_after()
+            )
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            self._update_gauges()
+        return True
+
+    def release(self, held_seconds: float):
+        self._service_seconds = held_seconds if self._service_seconds is None else (
+            SERVICE_TIME_SMOOTHING * held_seconds + (1 - SERVICE_TIME_SMOOTHING) * self._service_seconds
+        )
+        self._hand_over()
+
+    def _hand_over(self):
+        # Hand the slot straight to the oldest waiter still waiting
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._update_gauges()
+                return
+        self.active -= 1
+        self._update_gauges()
+
+    def _update_gauges(self):
+        ADMISSION_IN_FLIGHT.set(self.active, self.route)
+        ADMISSION_QUEUED.set(len(self._waiters), self.route)
+
+    def get_info(self) -> Dict[str, Union[int, float, None]]:
+        return {
+            'max_concurrent': self.max_concurrent,
+            'max_queue': self.max_queue,
+            'active': self.active,
+            'queued': len(self._waiters),
+            'service_seconds': round(self._service_seconds, 4) if self._service_seconds is not None else None
+        }
+
+
+class Admission:
+    """One request's admission: its route, deadline, and whether it got a slot in time"""
+
+    def __init__(self, route: str, deadline: Optional[float], limit: Optional[AdmissionLimit] = None):
+        self.route = route
+        self.deadline = deadline
+        self.limit = limit
+        # True when the deadline passed before a slot was free; the request
+        # holds no slot and should be answered from materialized results
+        self.expired = False
+
+    def retry_after(self) -> int:
+        return self.limit.retry_after() if self.limit is not None else 1
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline, None without one"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def timeout(self, default: float) -> float:
+        """`default`, cut short by the deadline"""
+        remaining = self.remaining()
+        return default if remaining is None else min(default, remaining)
+
+
+def request_deadline(request: Request) -> Optional[float]:
+    """Monotonic deadline from the X-Request-Timeout header, if the client sent one"""
+    value = request.headers.get(DEADLINE_HEADER)
+    if value is None:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"X-Request-Timeout must be a number of seconds, got {value!r}")
+    if not math.isfinite(seconds) or seconds < 0:
+        raise HTTPException(status_code=400, detail="X-Request-Timeout must be a non-negative number of seconds")
+    return time.monotonic() + seconds
+
+
+class AdmissionController:
+    """The limited routes of one process and their shared queue timeout"""
+
+    def __init__(self, limits: Dict[str, Tuple[int, int]], queue_timeout: float = 5.0):
+        self.queue_timeout = queue_timeout
+        self.limits = {route: AdmissionLimit(route, concurrency, queue)
+                       for route, (concurrency, queue) in limits.items()}
+
+    def gate(self, route: Union[str, Callable[[Request], str]], degrade: bool = False) -> 'AdmissionGate':
+        return AdmissionGate(self, route, degrade)
+
+    def get_info(self) -> Dict[str, Dict[str, Union[int, float, None]]]:
+        return {route: limit.get_info() for route, limit in self.limits.items()}
+
+
+class AdmissionGate:
+    """FastAPI dependency holding a route slot until the response has been sent
+
+    `route` is a route name or a function choosing one from the request. A
+    route without a configured limit is admitted at once. With `degrade`,
+    a request whose deadline cannot be met is let through with
+    `expired` set instead of getting a 503.
+    """
+
+    def __init__(self, controller: AdmissionController, route: Union[str, Callable[[Request], str]],
+                 degrade: bool = False):
+        self.controller = controller
+        self.route = route
+        self.degrade = degrade
+
+    async def __call__(self, request: Request):
+        route = self.route(request) if callable(self.route) else self.route
+        limit = self.controller.limits.get(route)
+        admission = Admission(route, request_deadline(request), limit)
+        if limit is None:
+            yield admission
+            return
+
+        remaining = admission.remaining()
+        timeout = self.controller.queue_timeout if remaining is None else min(self.controller.queue_timeout, remaining)
+        reason = 'deadline' if remaining is not None and remaining <= self.controller.queue_timeout else 'queue_timeout'
+        start = time.monotonic()
+        try:
+            queued = await limit.acquire(timeout, reason)
+        except AdmissionRejected as e:
+            ADMISSION_QUEUE_WAIT.observe(time.monotonic() - start, route)
+            if self.degrade and admission.deadline is not None:
+                ADMISSION_REQUESTS.inc(route, 'expired')
+                admission.expired = True
+                yield admission
+                return
+            ADMISSION_REQUESTS.inc(route, 'rejected')
+            raise HTTPException(status_code=503, detail=str(e), headers={'Retry-After': str(e.retry_after)})
+
+        admitted = time.monotonic()
+        ADMISSION_QUEUE_WAIT.observe(admitted - start, route)
+        ADMISSION_REQUESTS.inc(route, 'queued' if queued else 'admitted')
+        try:
+            yield admission
+        finally:
+            limit.release(time.monotonic() - admitted)
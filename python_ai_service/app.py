@@ -1,12 +1,16 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, Response
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from starlette.concurrency import run_in_threadpool
+from typing import List, Dict, Any, Optional, Iterable, Iterator
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import joblib
+import asyncio
 import os
+import time
 from pathlib import Path
 import logging
 
@@ -14,6 +18,19 @@ import logging
 from ml_models.disease_predictor import DiseasePredictor
 from ml_models.data_processor import DataProcessor
 from ml_models.forecast_engine import ForecastEngine
+from ml_models.forecast_store import ForecastModelStore
+from ml_models.region_hierarchy import RegionHierarchy
+from ml_models.district_graph import DistrictGraph
+from ml_models.data_summary import drift_report
+from ml_models.metrics import REGISTRY, stage_timer
+from serialization import FastJSONResponse, dumps, prediction_records, MODEL_VERSION
+from http_metrics import MetricsMiddleware, set_metrics_district
+from profiling import profiler, ProfilingMiddleware
+from single_flight import SingleFlight, SingleFlightTimeout
+from http_caching import ConditionalCache
+from live_updates import LiveUpdates, TooManySubscribers
+from ingest import IngestBuffer, IngestError, IngestBackpressure, INGEST_FLUSHES
+from admission import Admission, AdmissionController, parse_limits
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -30,6 +47,66 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency and request counts for /metrics; districts outside the
+# region hierarchy are labelled "other"
+app.add_middleware(MetricsMiddleware, known_district=lambda name: region_hierarchy.known_district(name))
+
+# Admin-only request profiling (inactive unless PROFILING_ADMIN_TOKEN is set)
+app.add_middleware(ProfilingMiddleware)
+
+# Districts served by /predictions/all
+ALL_DISTRICTS = ["Imphal East", "Imphal West", "Bishnupur", "Senapati", "Churachandpur"]
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+def _wants_stream(request: Request, stream: bool) -> bool:
+    """Stream when asked via ?stream=true or an NDJSON Accept header"""
+    return stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+def _ndjson_stream(records: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """Encode records one per line as they are produced"""
+    try:
+        for record in records:
+            yield dumps(record) + b"\n"
+    except Exception as e:
+        # Headers are already sent, so report the failure in-band
+        logger.error(f"Error while streaming response: {str(e)}")
+        yield dumps({"error": str(e)}) + b"\n"
+
+def _forecast_route(request: Request) -> str:
+    """Forecasts past the cached horizon are computed from scratch, so they have their own limit"""
+    try:
+        days = int(request.query_params.get('days', 30))
+    except ValueError:
+        days = 30
+    return 'forecast_long' if days > forecast_engine.max_horizon else 'forecast'
+
+def _stale_predictions(route: str, districts: List[str], disease: Optional[str],
+                       admission: Admission) -> List[Dict[str, Any]]:
+    """Last materialized predictions, for a request whose deadline cannot be met"""
+    predictions = [
+        prediction for district in districts
+        for prediction in disease_predictor.stale_predictions(district, disease)
+    ]
+    if not predictions:
+        raise HTTPException(
+            status_code=503,
+            detail="Deadline cannot be met and no predictions have been materialized yet",
+            headers={"Retry-After": str(admission.retry_after())}
+        )
+    STALE_RESPONSES.inc(route)
+    return predictions
+
+def _iter_all_predictions() -> Iterator[Dict[str, Any]]:
+    """Predictions for every district, one district at a time"""
+    for district in ALL_DISTRICTS:
+        yield from disease_predictor.predict(
+            district=district,
+            timeframe_days=30,
+            include_environmental=True,
+            include_population=True
+        )
+
 # Pydantic models
 class PredictionRequest(BaseModel):
     district: str
@@ -54,33 +131,314 @@ class PredictionResponse(BaseModel):
     createdAt: str
     updatedAt: str
     modelVersion: str
+    stale: Optional[bool] = None
 
 class RefreshResponse(BaseModel):
     success: bool
     message: str
     predictions_updated: int
     timestamp: str
+    decision: Optional[str] = None
+    reason: Optional[str] = None
+    fingerprint: Optional[str] = None
+    drift: Optional[Dict[str, Any]] = None
+
+class ProfileSessionRequest(BaseModel):
+    mode: str = "cprofile"
+    requests: Optional[int] = None
+    seconds: Optional[float] = None
+    trace_memory: bool = False
 
 # Initialize ML components
-data_processor = DataProcessor()
-disease_predictor = DiseasePredictor()
-forecast_engine = ForecastEngine()
+# Cleaned records are also kept as month-partitioned parquet, so windowed
+# reads touch only their months; an empty HISTORY_STORE_DIR reads from memory
+HISTORY_STORE_DIR = os.getenv('HISTORY_STORE_DIR', str(Path(__file__).parent / "data" / "history"))
+data_processor = DataProcessor(
+    csv_engine=os.getenv('CSV_PARSER_ENGINE', 'auto'),
+    history_dir=HISTORY_STORE_DIR or None,
+    partition_history_by_district=os.getenv('HISTORY_PARTITION_BY_DISTRICT', 'false').lower() == 'true'
+)
+disease_predictor = DiseasePredictor(data_processor)
+region_hierarchy = RegionHierarchy()
+district_graph = DistrictGraph(region_hierarchy, decay_km=float(os.getenv('SPILLOVER_DECAY_KM', 50)))
+DATA_RECORDS = REGISTRY.gauge('data_records', 'Records in the loaded dataset')
+DISEASE_MODELS = REGISTRY.gauge('disease_models', 'Trained disease predictor models')
+FORECAST_MODELS = REGISTRY.gauge('forecast_models', 'Trained district-disease forecast models')
+FORECAST_CACHE_ENTRIES = REGISTRY.gauge('forecast_cache_entries', 'District forecasts held in the forecast cache')
+REFRESH_DURATION = REGISTRY.gauge('refresh_duration_seconds', 'Duration of the last data reload and retrain')
+REFRESHES_TOTAL = REGISTRY.counter('refreshes_total', 'Data reloads and retrains by outcome', ('outcome',))
+REFRESH_DECISIONS = REGISTRY.counter(
+    'refresh_decisions_total',
+    'Refreshes by retrain decision: skip, forecast_only or full',
+    ('decision',)
+)
+
+# A full retrain on /refresh needs a feature column or category share to
+# drift past one of these since the last full retrain
+RETRAIN_PSI_THRESHOLD = float(os.getenv('RETRAIN_PSI_THRESHOLD', 0.2))
+RETRAIN_KS_THRESHOLD = float(os.getenv('RETRAIN_KS_THRESHOLD', 0.1))
+
+# Forecast models live on disk and are loaded on demand into a bounded LRU;
+# an empty FORECAST_MODEL_STORE_DIR keeps them all in memory instead
+FORECAST_MODEL_STORE_DIR = os.getenv('FORECAST_MODEL_STORE_DIR', str(Path(__file__).parent / "data" / "forecast_models"))
+forecast_model_store = ForecastModelStore(
+    FORECAST_MODEL_STORE_DIR,
+    max_entries=int(os.getenv('FORECAST_MODEL_CACHE_ENTRIES', 0)),
+    max_bytes=int(float(os.getenv('FORECAST_MODEL_CACHE_MB', 64)) * 1024 * 1024)
+) if FORECAST_MODEL_STORE_DIR else None
+
+forecast_engine = ForecastEngine(
+    max_horizon=int(os.getenv('FORECAST_MAX_HORIZON', 90)),
+    interval_samples=int(os.getenv('FORECAST_INTERVAL_SAMPLES', 500)),
+    model_store=forecast_model_store
+)
+# Longest forecast a request may ask for; the cache grows to the longest one served
+FORECAST_MAX_DAYS = int(os.getenv('FORECAST_MAX_DAYS', 365))
+
+# Identical concurrent requests share one computation, run off the event loop
+SINGLE_FLIGHT_TIMEOUT = float(os.getenv('SINGLE_FLIGHT_TIMEOUT', 30))
+prediction_flights = SingleFlight('predict', SINGLE_FLIGHT_TIMEOUT)
+all_prediction_flights = SingleFlight('predictions_all', SINGLE_FLIGHT_TIMEOUT)
+forecast_flights = SingleFlight('forecast', SINGLE_FLIGHT_TIMEOUT)
+region_forecast_flights = SingleFlight('forecast_region', SINGLE_FLIGHT_TIMEOUT)
+
+# Heavy routes get a few concurrent slots and a bounded queue each, so cheap
+# routes (/health, /metrics, ...) stay fast under load; see admission.py
+admission_control = AdmissionController(
+    parse_limits(os.getenv(
+        'ADMISSION_LIMITS', 'predict=8:32,predictions_all=2:8,forecast=4:16,forecast_long=1:4,refresh=1:1'
+    )),
+    queue_timeout=float(os.getenv('ADMISSION_QUEUE_TIMEOUT', 5))
+)
+STALE_RESPONSES = REGISTRY.counter(
+    'stale_responses_total',
+    'Prediction responses served from materialized predictions because a deadline could not be met',
+    ('route',)
+)
+# Stale responses must not be revalidated against the current model version
+STALE_HEADERS = {'Warning': '110 - "Response is Stale"', 'Cache-Control': 'no-store'}
+
+DATA_RECORDS.set_function(lambda: len(data_processor.csv_data) if data_processor.csv_data is not None else 0)
+DISEASE_MODELS.set_function(lambda: len(disease_predictor.models))
+FORECAST_MODELS.set_function(lambda: len(forecast_engine.models))
+FORECAST_CACHE_ENTRIES.set_function(lambda: len(forecast_engine.forecast_cache))
+
+models_initialized = False
+
+# Fingerprint of the data the models were last trained on, and summaries of
+# the data the disease predictor was last fully retrained on
+trained_fingerprint = None
+reference_summary = None
+
+# Changes whenever data is reloaded or models are retrained; set before
+# workers are forked in production mode, so all workers share it
+model_state_version = "untrained"
+
+def _mark_models_updated():
+    global model_state_version
+    model_state_version = f"{time.time_ns():x}"
+
+def _cache_version() -> str:
+    """Model/data version that read endpoint ETags are derived from
+    
+    Includes the date because forecasts start from today.
+    """
+    return f"{MODEL_VERSION}|{model_state_version}|{forecast_engine.model_version}|{datetime.now().date()}"
+
+conditional_cache = ConditionalCache(_cache_version, max_age=int(os.getenv('HTTP_CACHE_MAX_AGE', 0)))
+
+# Records posted to /ingest: logged durably, buffered, and flushed into the
+# dataset in micro-batches
+ingest_buffer = IngestBuffer(
+    log_path=os.getenv('INGEST_LOG_PATH', str(Path(__file__).parent / "data" / "ingest_log.ndjson")),
+    batch_size=int(os.getenv('INGEST_BATCH_SIZE', 5000)),
+    flush_interval=float(os.getenv('INGEST_FLUSH_INTERVAL', 1.0)),
+    max_pending=int(os.getenv('INGEST_MAX_PENDING', 100000)),
+    fsync=os.getenv('INGEST_FSYNC', 'true').lower() != 'false'
+)
+ingest_flush_task = None
+# Set in pre-fork workers (production_server.MasterLink): refreshes and
+# ingested records are applied by the master, which re-forks the workers
+master_link = None
+
+def _load_training_data() -> pd.DataFrame:
+    """CSV data plus every record ingested so far; call with ingest_buffer.flush_lock held"""
+    logged = ingest_buffer.replay_log()
+    with profiler.memory_snapshot("load_csv_data"):
+        csv_data = data_processor.load_csv_data()
+    if not logged.empty:
+        data_processor.append_records(logged)
+        csv_data = data_processor.csv_data
+    return csv_data
+
+def initialize_models():
+    """Load CSV data and train all models
+    
+    Called once per process on startup, or once in the master before
+    workers are forked in production mode (see production_server.py).
+    """
+    global models_initialized
+    
+    logger.info("Initializing AI models...")
+    start = time.perf_counter()
+    
+    with ingest_buffer.flush_lock:
+        # Load and process CSV data, plus records ingested before a restart
+        csv_data = _load_training_data()
+        logger.info(f"Loaded {len(csv_data)} records from CSV files and the ingest log")
+        
+        # Train models
+        with profiler.memory_snapshot("disease_predictor.train_models"):
+            disease_predictor.train_models(csv_data)
+        with profiler.memory_snapshot("forecast_engine.train_models"):
+            forecast_engine.train_models(csv_data)
+        _record_training(full=True)
+    
+    models_initialized = True
+    _mark_models_updated()
+    REFRESH_DURATION.set(time.perf_counter() - start)
+    logger.info("AI models initialized successfully!")
+
+def _record_training(full: bool):
+    global trained_fingerprint, reference_summary
+    trained_fingerprint = data_processor.fingerprint
+    if full:
+        reference_summary = data_processor.summary
+    # The districts /predictions/all and live updates cover stay in memory
+    forecast_engine.pin_districts(ALL_DISTRICTS)
+
+def _retrain_decision(force: bool) -> Dict[str, Any]:
+    """What the loaded data calls for: skip, forecast_only or full
+    
+    Unchanged data (same fingerprint) trains nothing. Changed data always
+    refits the forecasts, which track the latest cases; the disease
+    predictor is only retrained when its features or the district/disease
+    mix have drifted since its last full retrain.
+    """
+    if force:
+        return {'decision': 'full', 'reason': 'forced'}
+    if reference_summary is None or not disease_predictor.is_trained():
+        return {'decision': 'full', 'reason': 'no previous full retrain'}
+    if data_processor.fingerprint == trained_fingerprint:
+        return {'decision': 'skip', 'reason': 'data unchanged since last training'}
+    
+    with stage_timer('drift_check'):
+        drift = drift_report(reference_summary, data_processor.summary, disease_predictor.feature_columns,
+                             RETRAIN_PSI_THRESHOLD, RETRAIN_KS_THRESHOLD)
+    if drift['drifted']:
+        return {'decision': 'full', 'reason': f"drift in {', '.join(drift['drifted'])}", 'drift': drift}
+    return {'decision': 'forecast_only', 'reason': 'data changed without drift', 'drift': drift}
+
+def _live_snapshot() -> Dict[str, Any]:
+    """Compact state pushed to /subscribe clients: risk levels and forecast summaries"""
+    risks = {}
+    for prediction in _iter_all_predictions():
+        risks.setdefault(prediction['district'], {})[prediction['disease']] = {
+            'riskLevel': prediction['risk_level'],
+            'probability': round(float(prediction['probability']), 3)
+        }
+    
+    forecasts = {}
+    for district in ALL_DISTRICTS:
+        summary = forecast_engine.predict(district=district, days=30).get('summary', {})
+        forecasts[district] = {
+            'total_predicted_cases': summary.get('total_predicted_cases'),
+            'highest_risk_disease': summary.get('highest_risk_disease'),
+            'risk_assessment': summary.get('risk_assessment')
+        }
+    
+    return {'risks': risks, 'forecasts': forecasts}
+
+live_updates = LiveUpdates(
+    _live_snapshot,
+    buffer_size=int(os.getenv('LIVE_UPDATES_BUFFER', 16)),
+    max_clients=int(os.getenv('LIVE_UPDATES_MAX_CLIENTS', 1000))
+)
+
+def _flush_ingest() -> Optional[int]:
+    """Append one micro-batch to the dataset and fold it into the forecast models
+    
+    Returns the number of monthly forecast observations applied, or None if
+    nothing was applied here.
+    """
+    with ingest_buffer.flush_lock:
+        batch = ingest_buffer.take_batch()
+        if batch is None or master_link is not None:
+            # A pre-fork worker's records reach the dataset through the
+            # master, which reads them back from the log
+            return None
+        return _apply_ingest_batch(batch)
+
+def apply_logged_ingest() -> Optional[int]:
+    """Apply the records any worker logged since the last replay or read
+    
+    The pre-fork master's ingest flush (see production_server.py). Returns
+    the number of forecast observations applied, or None if nothing new
+    was logged.
+    """
+    with ingest_buffer.flush_lock:
+        batch = ingest_buffer.read_new_records()
+        if batch is None:
+            return None
+        applied = _apply_ingest_batch(batch)
+    _mark_models_updated()
+    return applied
+
+def remove_replaced_state():
+    """Delete model and history files replaced since the workers were forked
+    
+    The pre-fork master calls this once every worker was forked from its
+    current state.
+    """
+    if forecast_model_store is not None:
+        forecast_model_store.remove_replaced()
+    if data_processor.history is not None:
+        data_processor.history.remove_replaced()
+
+def _apply_ingest_batch(batch: pd.DataFrame) -> int:
+    """Append a batch to the dataset and fold it into the forecast models; call with flush_lock held"""
+    try:
+        with stage_timer("ingest_flush"):
+            records = data_processor.append_records(batch)
+            applied = forecast_engine.update_models(records)
+            forecast_engine.pin_districts(ALL_DISTRICTS)
+    except Exception:
+        INGEST_FLUSHES.inc('error')
+        raise
+    INGEST_FLUSHES.inc('success')
+    logger.info(f"Flushed {len(records)} ingested records ({applied} forecast observations applied)")
+    return applied
+
+async def _ingest_flush_loop():
+    """Flush the ingest buffer every interval, or sooner when a batch fills up"""
+    while True:
+        await ingest_buffer.wait_for_batch()
+        try:
+            applied = await run_in_threadpool(_flush_ingest)
+        except Exception as e:
+            # The batch stays in the log and is restored by the next refresh
+            logger.error(f"Error flushing ingested records: {str(e)}")
+            continue
+        if applied is None:
+            continue
+        _mark_models_updated()
+        if applied:
+            live_updates.schedule_publish()
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize ML models on startup"""
     try:
-        logger.info("Initializing AI models...")
+        if not models_initialized:
+            await run_in_threadpool(initialize_models)
+        else:
+            logger.info(f"Worker {os.getpid()} using preloaded AI models")
         
-        # Load and process CSV data
-        csv_data = data_processor.load_csv_data()
-        logger.info(f"Loaded {len(csv_data)} records from CSV files")
+        # Baseline snapshot for the first post-refresh diff
+        live_updates.schedule_publish()
         
-        # Train models
-        disease_predictor.train_models(csv_data)
-        forecast_engine.train_models(csv_data)
-        
-        logger.info("AI models initialized successfully!")
+        global ingest_flush_task
+        ingest_flush_task = asyncio.ensure_future(_ingest_flush_loop())
         
     except Exception as e:
         logger.error(f"Error initializing models: {str(e)}")
@@ -96,7 +454,13 @@ async def root():
             "predict": "/predict",
             "refresh": "/refresh",
             "health": "/health",
-            "models": "/models/info"
+            "models": "/models/info",
+            "regions": "/regions",
+            "region_forecast": "/forecast/region",
+            "metrics": "/metrics",
+            "subscribe": "/subscribe",
+            "ingest": "/ingest",
+            "analytics": "/analytics"
         }
     }
 
@@ -106,10 +470,98 @@ async def health_check():
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "models_loaded": disease_predictor.is_trained() and forecast_engine.is_trained()
+        "worker_pid": os.getpid(),
+        "models_loaded": disease_predictor.is_trained() and forecast_engine.is_trained(),
+        "admission": admission_control.get_info()
     }
 
-@app.get("/models/info")
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: pipeline stage timings, request latency and model/data gauges"""
+    return Response(REGISTRY.render(), media_type=REGISTRY.CONTENT_TYPE)
+
+def _require_profiling_admin(request: Request):
+    """Profiling endpoints are hidden unless enabled and need the admin token"""
+    if not profiler.enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+    token = request.headers.get("x-admin-token") or request.query_params.get("admin_token")
+    if not profiler.is_admin(token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+@app.get("/debug/profile")
+async def get_profiling_status(request: Request):
+    """Active profiling session and the captured profiles available for download"""
+    _require_profiling_admin(request)
+    return profiler.status()
+
+@app.post("/debug/profile")
+async def start_profiling(session_request: ProfileSessionRequest, request: Request):
+    """Profile the next N requests or a timed window (cprofile or sample mode)
+    
+    With trace_memory=true, tracemalloc snapshots are also taken around
+    load_csv_data and train_models while the session is active.
+    """
+    _require_profiling_admin(request)
+    requests = session_request.requests
+    if requests is None and session_request.seconds is None:
+        requests = 1
+    try:
+        return profiler.start_session(
+            session_request.mode,
+            requests=requests,
+            seconds=session_request.seconds,
+            trace_memory=session_request.trace_memory
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@app.delete("/debug/profile")
+async def stop_profiling(request: Request):
+    """Stop the active profiling session, keeping what was captured"""
+    _require_profiling_admin(request)
+    return {"session": profiler.stop_session()}
+
+@app.get("/debug/profile/{profile_id}")
+async def download_profile(profile_id: str, request: Request, format: Optional[str] = None):
+    """Download a capture: pstats or text (cprofile), collapsed stacks or text (sample), text (memory)"""
+    _require_profiling_admin(request)
+    capture = profiler.get(profile_id)
+    if capture is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    try:
+        content = capture.render(format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    fmt = format or capture.summary()['formats'][0]
+    if fmt == 'pstats':
+        return Response(content, media_type="application/octet-stream", headers={
+            "Content-Disposition": f'attachment; filename="{profile_id}.pstats"'
+        })
+    return Response(content, media_type="text/plain; charset=utf-8")
+
+@app.get("/subscribe")
+async def subscribe(request: Request):
+    """Server-Sent Events stream of prediction changes after each model swap
+    
+    Sends a `snapshot` event on connect, then a `diff` event with the changed
+    district/disease risk levels and forecast summaries after every retrain.
+    A `resync` event means the client fell behind and should refetch.
+    """
+    try:
+        subscriber = live_updates.subscribe()
+    except TooManySubscribers as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    return StreamingResponse(
+        live_updates.stream(subscriber, request.headers.get("last-event-id")),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/models/info", dependencies=[Depends(conditional_cache)])
 async def models_info():
     """Get information about loaded models"""
     return {
@@ -122,113 +574,309 @@ async def models_info():
             "models": forecast_engine.get_model_info()
         },
         "data_processor": {
-            "csv_files_loaded": data_processor.get_csv_info()
-        }
+            "csv_files_loaded": data_processor.get_csv_info(),
+            "parse_report": data_processor.get_parse_report(),
+            "fingerprint": data_processor.fingerprint,
+            "trained_fingerprint": trained_fingerprint,
+            "summary": data_processor.summary.to_dict(),
+            "rollups": data_processor.rollups.get_info() if data_processor.rollups is not None else None,
+            "history": data_processor.history.get_info() if data_processor.history is not None else None
+        },
+        "district_graph": district_graph.get_info()
     }
 
 @app.post("/predict", response_model=List[PredictionResponse])
-async def predict_disease_outbreaks(request: PredictionRequest):
-    """Generate AI predictions for disease outbreaks"""
+async def predict_disease_outbreaks(request: PredictionRequest, http_request: Request,
+                                    admission: Admission = Depends(admission_control.gate('predict', degrade=True))):
+    """Generate AI predictions for disease outbreaks
+    
+    Past an X-Request-Timeout deadline, the last materialized predictions
+    are returned with `stale: true`.
+    """
+    district = region_hierarchy.canonical_district(request.district.strip())
     try:
+        set_metrics_district(http_request, request.district)
+        if admission.expired:
+            stale = _stale_predictions('predict', [district], request.disease, admission)
+            return FastJSONResponse(prediction_records(stale), headers=STALE_HEADERS)
         logger.info(f"Generating predictions for district: {request.district}")
         
-        # Get predictions from ML models
-        predictions = disease_predictor.predict(
-            district=request.district,
+        # Get predictions from ML models, shared with identical in-flight requests
+        predictions = await prediction_flights.do(
+            (district, request.disease, request.timeframe_days,
+             request.include_environmental, request.include_population),
+            disease_predictor.predict,
+            timeout=admission.timeout(SINGLE_FLIGHT_TIMEOUT),
+            district=district,
             disease=request.disease,
             timeframe_days=request.timeframe_days,
             include_environmental=request.include_environmental,
             include_population=request.include_population
         )
         
-        # Convert to response format
-        response_predictions = []
-        for pred in predictions:
-            response_predictions.append(PredictionResponse(
-                id=f"pred-{datetime.now().strftime('%Y%m%d%H%M%S')}-{len(response_predictions)}",
-                district=pred["district"],
-                disease=pred["disease"],
-                riskLevel=pred["risk_level"],
-                probability=pred["probability"],
-                confidence=pred["confidence"],
-                timeframe=pred["timeframe"],
-                factors=pred["factors"],
-                environmentalData=pred["environmental_data"],
-                populationData=pred["population_data"],
-                historicalTrend=pred["historical_trend"],
-                recommendations=pred["recommendations"],
-                createdAt=datetime.now().isoformat(),
-                updatedAt=datetime.now().isoformat(),
-                modelVersion="v2.1"
-            ))
+        # Convert to response format; records already match PredictionResponse,
+        # so encode them directly instead of re-validating through response_model
+        response_predictions = prediction_records(predictions)
         
         logger.info(f"Generated {len(response_predictions)} predictions")
-        return response_predictions
+        return FastJSONResponse(response_predictions)
         
+    except HTTPException:
+        raise
+    except SingleFlightTimeout as e:
+        if admission.deadline is None:
+            raise HTTPException(status_code=504, detail=str(e))
+        stale = _stale_predictions('predict', [district], request.disease, admission)
+        return FastJSONResponse(prediction_records(stale), headers=STALE_HEADERS)
     except Exception as e:
         logger.error(f"Error generating predictions: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/refresh", response_model=RefreshResponse)
-async def refresh_predictions():
-    """Refresh all predictions with latest data"""
+@app.post("/ingest", status_code=202)
+async def ingest_records(request: Request):
+    """Bulk ingest of case/environment reports
+    
+    Body is a JSON array of records or CSV with a header row (Content-Type
+    text/csv); fields use the CSV column names or their snake_case forms.
+    Accepted records are durably logged and reach the dataset with the next
+    micro-batch flush.
+    """
+    body = await request.body()
     try:
-        logger.info("Refreshing predictions...")
-        
-        # Reload CSV data
-        csv_data = data_processor.load_csv_data()
+        result = await run_in_threadpool(ingest_buffer.ingest, body, request.headers.get("content-type", ""))
+    except IngestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except IngestBackpressure as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(max(1, round(ingest_buffer.flush_interval)))}
+        )
+    
+    result["pending"] = ingest_buffer.pending()
+    return result
+
+def refresh_models(force: bool = False) -> Dict[str, Any]:
+    """Reload the data and retrain as it calls for
+    
+    Returns the retrain decision with the number of records and the data
+    fingerprint. Runs in the pre-fork master for every worker's /refresh.
+    """
+    with ingest_buffer.flush_lock:
+        # Reload CSV data and ingested records
+        csv_data = _load_training_data()
+        decision = _retrain_decision(force)
         
         # Retrain models with latest data
-        disease_predictor.train_models(csv_data)
-        forecast_engine.train_models(csv_data)
+        if decision['decision'] == 'full':
+            with profiler.memory_snapshot("disease_predictor.train_models"):
+                disease_predictor.train_models(csv_data)
+        if decision['decision'] != 'skip':
+            with profiler.memory_snapshot("forecast_engine.train_models"):
+                forecast_engine.train_models(csv_data)
+            _record_training(full=decision['decision'] == 'full')
+    if decision['decision'] != 'skip':
+        _mark_models_updated()
+    return {'decision': decision, 'records': len(csv_data), 'fingerprint': data_processor.fingerprint}
+
+@app.post("/refresh", response_model=RefreshResponse, dependencies=[Depends(admission_control.gate('refresh'))])
+async def refresh_predictions(force: bool = False):
+    """Refresh all predictions with latest data
+    
+    Retrains only as much as the data calls for (see _retrain_decision);
+    ?force=true always retrains both models.
+    """
+    try:
+        logger.info("Refreshing predictions...")
+        start = time.perf_counter()
+        
+        if master_link is not None:
+            # Pre-fork worker: the master retrains, then re-forks every worker from its state
+            result = await run_in_threadpool(master_link.request, 'refresh', force=force)
+        else:
+            # The flush lock is a threading.Lock, so it is taken off the event loop
+            result = await run_in_threadpool(refresh_models, force)
+        decision = result['decision']
         
-        logger.info("Predictions refreshed successfully!")
+        REFRESH_DURATION.set(time.perf_counter() - start)
+        if decision['decision'] != 'skip' and master_link is None:
+            live_updates.schedule_publish()
+        REFRESHES_TOTAL.inc('success')
+        REFRESH_DECISIONS.inc(decision['decision'])
+        logger.info(f"Predictions refreshed: {decision['decision']} ({decision['reason']})")
         
         return RefreshResponse(
             success=True,
-            message="Predictions refreshed successfully",
-            predictions_updated=len(csv_data),
-            timestamp=datetime.now().isoformat()
+            message="Predictions refreshed successfully" if decision['decision'] != 'skip'
+                    else "Data unchanged, models kept",
+            predictions_updated=result['records'] if decision['decision'] != 'skip' else 0,
+            timestamp=datetime.now().isoformat(),
+            fingerprint=result['fingerprint'],
+            **decision
         )
         
     except Exception as e:
+        REFRESHES_TOTAL.inc('error')
         logger.error(f"Error refreshing predictions: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/predictions/all")
-async def get_all_predictions():
-    """Get predictions for all districts"""
+async def get_all_predictions(request: Request, stream: bool = False, etag: str = Depends(conditional_cache),
+                              admission: Admission = Depends(admission_control.gate('predictions_all', degrade=True))):
+    """Get predictions for all districts
+    
+    Each prediction carries `spillover`: risk score and latest cases of
+    neighbouring districts, averaged by border weight. With ?stream=true (or
+    Accept: application/x-ndjson) predictions are sent as NDJSON, one per
+    line, as each district is evaluated; spillover needs every district
+    first, so streamed predictions omit it. Past an X-Request-Timeout
+    deadline, the last materialized predictions are returned with
+    `stale: true`.
+    """
     try:
-        # Get predictions for all districts
-        all_predictions = []
-        districts = ["Imphal East", "Imphal West", "Bishnupur", "Senapati", "Churachandpur"]
-        
-        for district in districts:
-            predictions = disease_predictor.predict(
-                district=district,
-                timeframe_days=30,
-                include_environmental=True,
-                include_population=True
+        if admission.expired:
+            return _stale_all_predictions(request, stream, admission)
+        if _wants_stream(request, stream):
+            return StreamingResponse(
+                _ndjson_stream(_iter_all_predictions()),
+                media_type=NDJSON_MEDIA_TYPE,
+                headers=conditional_cache.headers(etag)
             )
-            all_predictions.extend(predictions)
         
-        return all_predictions
+        # Get predictions for all districts
+        return await all_prediction_flights.do(
+            'all', lambda: district_graph.add_spillover(list(_iter_all_predictions())),
+            timeout=admission.timeout(SINGLE_FLIGHT_TIMEOUT)
+        )
         
+    except HTTPException:
+        raise
+    except SingleFlightTimeout as e:
+        if admission.deadline is None:
+            raise HTTPException(status_code=504, detail=str(e))
+        return _stale_all_predictions(request, stream, admission)
     except Exception as e:
         logger.error(f"Error getting all predictions: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _stale_all_predictions(request: Request, stream: bool, admission: Admission) -> Response:
+    stale = _stale_predictions('predictions_all', ALL_DISTRICTS, None, admission)
+    if _wants_stream(request, stream):
+        return StreamingResponse(_ndjson_stream(stale), media_type=NDJSON_MEDIA_TYPE, headers=STALE_HEADERS)
+    return FastJSONResponse(district_graph.add_spillover(stale), headers=STALE_HEADERS)
+
+@app.get("/regions", dependencies=[Depends(conditional_cache)])
+async def get_regions():
+    """Get the district -> state -> Northeast hierarchy used for regional forecasts"""
+    return region_hierarchy.get_hierarchy()
+
+@app.get("/analytics", dependencies=[Depends(conditional_cache)])
+async def get_analytics(granularity: str = "month", start: Optional[str] = None, end: Optional[str] = None,
+                        region: Optional[str] = None, districts: Optional[str] = None,
+                        diseases: Optional[str] = None, group_by: str = "district,disease,bucket"):
+    """Cases and environmental means by district, disease and week/month/season
+    
+    Answered from DataProcessor's rollup cube, built by the first query
+    after a load. `start`/`end` select buckets
+    by their first day; `districts`, `diseases` and `group_by` are
+    comma-separated, and `region` selects the districts of a state.
+    """
+    try:
+        district_list = None
+        if districts:
+            district_list = [region_hierarchy.canonical_district(d.strip()) for d in districts.split(',') if d.strip()]
+        elif region:
+            region_info = region_hierarchy.resolve(region)
+            if region_info is None:
+                raise HTTPException(status_code=404, detail=f"Unknown region: {region}")
+            district_list = region_info['districts']
+        disease_list = [d.strip().title() for d in diseases.split(',') if d.strip()] if diseases else None
+        dimensions = [d.strip() for d in group_by.split(',') if d.strip()]
+        
+        rollups = await run_in_threadpool(data_processor.get_rollups)
+        with stage_timer('analytics_query'):
+            rows = rollups.query(
+                granularity, start=start, end=end, districts=district_list, diseases=disease_list, group_by=dimensions
+            )
+        return {
+            'granularity': granularity,
+            'start': start,
+            'end': end,
+            'districts': district_list,
+            'diseases': disease_list,
+            'group_by': dimensions,
+            'rows': rows
+        }
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error answering analytics query: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/forecast/region", dependencies=[Depends(conditional_cache)])
+async def get_region_forecast(region: Optional[str] = None, districts: Optional[str] = None,
+                              days: int = Query(30, ge=1, le=FORECAST_MAX_DAYS),
+                              admission: Admission = Depends(admission_control.gate(_forecast_route))):
+    """Get an aggregated forecast for a named region or a comma-separated district set"""
+    try:
+        if districts:
+            district_list = [region_hierarchy.canonical_district(d.strip()) for d in districts.split(',') if d.strip()]
+            region_info = {'name': region or 'custom', 'level': 'custom', 'districts': district_list}
+        elif region:
+            region_info = region_hierarchy.resolve(region)
+            if region_info is None:
+                raise HTTPException(status_code=404, detail=f"Unknown region: {region}")
+        else:
+            raise HTTPException(status_code=400, detail="Provide a region name or a districts list")
+        
+        forecast = await region_forecast_flights.do(
+            (tuple(region_info['districts']), days),
+            forecast_engine.predict_region, region_info['districts'], days=days,
+            timeout=admission.timeout(SINGLE_FLIGHT_TIMEOUT)
+        )
+        return {'region': region_info['name'], 'level': region_info['level'], **forecast}
+        
+    except HTTPException:
+        raise
+    except SingleFlightTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error getting regional forecast: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/forecast/{district}")
-async def get_forecast(district: str, days: int = 30):
-    """Get detailed forecast for a specific district"""
+async def get_forecast(request: Request, district: str, days: int = Query(30, ge=1, le=FORECAST_MAX_DAYS),
+                       stream: bool = False,
+                       etag: str = Depends(conditional_cache),
+                       admission: Admission = Depends(admission_control.gate(_forecast_route))):
+    """Get detailed forecast for a specific district
+    
+    With ?stream=true (or Accept: application/x-ndjson) the forecast is sent
+    as NDJSON: a header line with the summary, then one line per disease.
+    """
     try:
-        forecast = forecast_engine.predict(district=district, days=days)
+        district = region_hierarchy.canonical_district(district.strip())
+        if _wants_stream(request, stream):
+            return StreamingResponse(
+                _ndjson_stream(forecast_engine.iter_forecast(district, days)),
+                media_type=NDJSON_MEDIA_TYPE,
+                headers=conditional_cache.headers(etag)
+            )
+        
+        forecast = await forecast_flights.do((district, days), forecast_engine.predict, district=district, days=days,
+                                             timeout=admission.timeout(SINGLE_FLIGHT_TIMEOUT))
         return forecast
         
+    except SingleFlightTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting forecast for {district}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    from start_service import main
+    # Running the module directly never reloaded; start_service.py does by default
+    main(reload=False)
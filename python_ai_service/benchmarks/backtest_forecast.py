@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Rolling-origin backtest of ForecastEngine
+
+Trains on records up to each origin month, forecasts 1..H months ahead for
+every district-disease pair and scores the forecasts against the monthly
+case totals actually recorded. Folds and district shards run in a process
+pool. Reports MAE/MAPE per horizon next to training and inference cost, so
+forecasting changes can be compared on accuracy and speed offline.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the service directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from ml_models.backtest import Backtester
+from ml_models.data_processor import DataProcessor
+
+DEFAULT_OUTPUT = Path(__file__).parent / "results" / "backtest_results.json"
+
+
+def load_data(args):
+    if args.synthetic_rows:
+        from bench_pipeline import write_dataset
+        scratch = tempfile.mkdtemp(prefix='backtest-')
+        write_dataset(Path(scratch), args.synthetic_rows, args.districts)
+        return DataProcessor(csv_dir=Path(scratch)).load_csv_data()
+    return DataProcessor(csv_dir=args.csv_dir).load_csv_data()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--csv-dir', type=Path, help='CSV directory (default: the service data directory)')
+    parser.add_argument('--synthetic-rows', type=int, help='Backtest on synthetic records instead, as bench_pipeline.py writes them')
+    parser.add_argument('--districts', type=int, default=50, help='Districts in the synthetic data')
+    parser.add_argument('--horizons', type=int, nargs='+', default=[1, 2, 3], help='Months ahead to score')
+    parser.add_argument('--min-train-months', type=int, default=6, help='History before the first origin')
+    parser.add_argument('--step', type=int, default=1, help='Months between origins')
+    parser.add_argument('--max-folds', type=int, help='Keep only the latest origins')
+    parser.add_argument('--workers', type=int, help='Pool processes (default: CPU count; 1 runs in-process)')
+    parser.add_argument('--shards', type=int, help='District shards per fold (default: enough to fill the pool)')
+    parser.add_argument('--per-pair-training', action='store_true',
+                        help='Fit each pair with scikit-learn instead of the batched solver')
+    parser.add_argument('--output', type=Path, default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    data = load_data(args)
+
+    backtester = Backtester(
+        horizons=args.horizons,
+        min_train_months=args.min_train_months,
+        step=args.step,
+        max_folds=args.max_folds,
+        workers=args.workers,
+        shards=args.shards,
+        engine_options={'batched_training': not args.per_pair_training}
+    )
+    report = backtester.run(data)
+    report['rows'] = len(data)
+
+    print(f"{report['folds']} folds x {report['shards']} shards on {report['workers']} workers, {len(data)} rows",
+          file=sys.stderr)
+    print(f"{'horizon':>8} {'forecasts':>10} {'MAE':>9} {'MAPE %':>8} {'naive MAE':>10}", file=sys.stderr)
+    for row in report['metrics']:
+        print(f"{row['horizon_months']:>7}m {row['forecasts']:>10} {row['mae'] if row['mae'] is not None else '-':>9} "
+              f"{row['mape'] if row['mape'] is not None else '-':>8} "
+              f"{row['naive_mae'] if row['naive_mae'] is not None else '-':>10}", file=sys.stderr)
+    cost = report['cost']
+    print(f"train {cost['train_seconds']}s ({cost['train_ms_per_model']} ms/model), "
+          f"inference {cost['inference_seconds']}s ({cost['inference_ms_per_forecast']} ms/forecast), "
+          f"wall {cost['wall_seconds']}s, speedup x{cost['parallel_speedup']}", file=sys.stderr)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps({'output': str(args.output), 'metrics': report['metrics'], 'cost': cost}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
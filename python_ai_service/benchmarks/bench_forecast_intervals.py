@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark for forecast prediction intervals
+
+Times ForecastEngine._simulate_intervals for one district forecast block
+(diseases x days) at several sample counts and checks the result against
+the latency budget documented in benchmarks/README.md.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the service directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from ml_models.forecast_engine import ForecastEngine
+
+# Budget for one district at the default settings (5 diseases, 90 days, 500 samples)
+DEFAULT_BUDGET_MS = 25.0
+
+
+def time_intervals(samples: int, diseases: int, days: int, repeats: int) -> float:
+    """Median milliseconds to simulate intervals for one forecast block"""
+    engine = ForecastEngine(interval_samples=samples)
+    rng = np.random.default_rng(0)
+    point_forecasts = rng.uniform(0, 100, (diseases, days))
+    residual_pools = [rng.normal(0, 5, 13) for _ in range(diseases)]
+
+    engine._simulate_intervals(point_forecasts, residual_pools)  # warm up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        engine._simulate_intervals(point_forecasts, residual_pools)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--samples', type=int, nargs='+', default=[100, 500, 1000, 2000])
+    parser.add_argument('--diseases', type=int, default=5)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                        help='Latency budget for 500 samples')
+    args = parser.parse_args()
+
+    results = []
+    for samples in args.samples:
+        ms = time_intervals(samples, args.diseases, args.days, args.repeats)
+        results.append({'samples': samples, 'diseases': args.diseases, 'days': args.days, 'median_ms': round(ms, 3)})
+        print(f"{samples:>6} samples x {args.diseases} diseases x {args.days} days: {ms:8.2f} ms")
+
+    print(json.dumps(results, indent=2))
+
+    at_default = [r for r in results if r['samples'] == 500]
+    if at_default and at_default[0]['median_ms'] > args.budget_ms:
+        print(f"❌ Over budget: {at_default[0]['median_ms']:.2f} ms > {args.budget_ms:.2f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Online update benchmark for ForecastEngine.update_models
+
+Trains on the older months of a synthetic dataset, folds the newer months
+in with update_models, and compares the result with a refit on all of it:
+coefficients, in-sample mse/r2 and fitted values must agree, and the update
+must be faster than the refit. Times both, best of --repeat runs.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add the service directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from ml_models.forecast_engine import ForecastEngine
+
+
+def synthetic_records(rows: int, districts: int, months: int, seed: int = 0) -> pd.DataFrame:
+    """Daily records with seasonal weather and cases that depend on it"""
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, months * 30, rows), unit='D')
+    season = np.sin(2 * np.pi * dates.month.to_numpy() / 12)
+    temperature = 26 + 5 * season + rng.normal(0, 2, rows)
+    rainfall = np.maximum(120 * (1 + season) + rng.normal(0, 30, rows), 0)
+    return pd.DataFrame({
+        'district': rng.choice([f"District {i:03d}" for i in range(districts)], rows),
+        'disease': rng.choice(['Cholera', 'Dengue', 'Malaria'], rows),
+        'date': dates,
+        'temperature': temperature,
+        'humidity': 65 + 10 * np.cos(2 * np.pi * dates.month.to_numpy() / 12) + rng.normal(0, 5, rows),
+        'rainfall': rainfall,
+        'water_quality': rng.uniform(1, 10, rows),
+        'cases': rng.poisson(np.maximum(20 + 0.8 * temperature + 0.05 * rainfall, 1))
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--districts', type=int, default=5)
+    parser.add_argument('--months', type=int, default=48)
+    parser.add_argument('--new-months', type=int, default=6, help='Trailing months applied as an update')
+    parser.add_argument('--tolerance', type=float, default=1e-6,
+                        help='Largest fitted-value difference allowed, relative to the largest case count')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    data = synthetic_records(args.rows, args.districts, args.months)
+    cutoff = (data['date'].max() - pd.DateOffset(months=args.new_months)) + pd.offsets.MonthEnd(0)
+    old, new = data[data['date'] <= cutoff], data[data['date'] > cutoff]
+
+    update_seconds = refit_seconds = float('inf')
+    for _ in range(args.repeat):
+        updated = ForecastEngine(interval_samples=0)
+        updated.train_models(old.copy())
+        start = time.perf_counter()
+        applied = updated.update_models(new.copy(), fold_open_month=True)
+        update_seconds = min(update_seconds, time.perf_counter() - start)
+
+        refit = ForecastEngine(interval_samples=0)
+        start = time.perf_counter()
+        refit.train_models(data.copy())
+        refit_seconds = min(refit_seconds, time.perf_counter() - start)
+
+    worst = {'pair': None, 'fitted_difference': 0.0, 'mse_difference': 0.0, 'r2_difference': 0.0}
+    for model_key, model in refit.models.items():
+        history = refit.forecast_data[model_key]
+        X = refit._polynomial_features(np.nan_to_num(history[refit.feature_columns].to_numpy(dtype=float), nan=0))
+        online = updated.models[model_key]
+        difference = np.max(np.abs((X @ online['coef'] + online['intercept']) - (X @ model['coef'] + model['intercept'])))
+        scale = max(float(history['cases'].max()), 1.0)
+        if difference / scale > worst['fitted_difference']:
+            worst.update(pair=model_key, fitted_difference=float(difference / scale))
+        worst['mse_difference'] = max(worst['mse_difference'], abs(online['mse'] - model['mse']) / max(model['mse'], 1.0))
+        worst['r2_difference'] = max(worst['r2_difference'], abs(online['r2'] - model['r2']))
+
+    print(json.dumps({
+        'pairs': len(refit.models),
+        'observations_applied': applied,
+        'update_seconds': round(update_seconds, 4),
+        'refit_seconds': round(refit_seconds, 4),
+        'worst': worst
+    }, indent=2))
+
+    if max(worst['fitted_difference'], worst['mse_difference'], worst['r2_difference']) > args.tolerance:
+        print(f"❌ Online update differs from a refit by more than {args.tolerance:g}")
+        sys.exit(1)
+    if update_seconds >= refit_seconds:
+        print(f"❌ Online update ({update_seconds:.4f}s) is not faster than a refit ({refit_seconds:.4f}s)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Scale benchmark for the data/ML pipeline
+
+Runs DataProcessor.load_csv_data (CSV read + _clean_data),
+DiseasePredictor.train_models/predict and ForecastEngine.train_models/predict
+on synthetic CSV datasets over a grid of row and district counts. Each case
+runs in a fresh process so peak RSS is not inflated by earlier cases.
+
+Wall time, peak RSS and throughput per stage are written to a JSON results
+file and compared against a stored baseline; the script exits non-zero when
+a stage regresses beyond the tolerance.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any
+
+import numpy as np
+import pandas as pd
+
+# Add the service directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+BENCHMARK_DIR = Path(__file__).parent
+DEFAULT_OUTPUT = BENCHMARK_DIR / "results" / "pipeline_results.json"
+DEFAULT_BASELINE = BENCHMARK_DIR / "pipeline_baseline.json"
+
+PRESETS = {
+    'quick': {'rows': [1_000, 10_000], 'districts': [5, 50, 500]},
+    'standard': {'rows': [1_000, 10_000, 100_000], 'districts': [5, 50, 500]},
+    'large': {'rows': [1_000, 10_000, 100_000, 1_000_000], 'districts': [5, 50, 500]},
+    'full': {'rows': [1_000, 10_000, 100_000, 1_000_000, 10_000_000], 'districts': [5, 50, 500]},
+}
+STAGES = ['load_csv_data', 'disease_train', 'disease_predict', 'forecast_train', 'forecast_predict']
+DISEASES = ["Cholera", "Dengue", "Malaria", "Typhoid", "Diarrhea"]
+HEALTH_FILES = [
+    "hyper_realistic_health_data.csv",
+    "monsoon_jun-jul2024.csv",
+    "postmonsoon_aug-oct2024.csv",
+    "pre_monsoon_health_data_1000.csv",
+    "winter_health_data_1000.csv",
+    "winter_health_data_Nov-Jan.csv"
+]
+
+# Stages shorter than this are too noisy to call a regression on
+MIN_REGRESSION_SECONDS = 0.1
+MIN_REGRESSION_RSS_MB = 32.0
+
+
+def district_names(count: int) -> List[str]:
+    return [f"District {i:03d}" for i in range(count)]
+
+
+def write_dataset(csv_dir: Path, rows: int, districts: int, seed: int = 0):
+    """Synthetic health records in the raw CSV layout, split across the health files"""
+    rng = np.random.default_rng(seed)
+    names = np.array(district_names(districts))
+    days = rng.integers(0, 730, rows)
+    month = ((days // 30) % 12) + 1
+    season = np.sin(2 * np.pi * (month - 3) / 12)
+
+    frame = pd.DataFrame({
+        'District': names[rng.integers(0, districts, rows)],
+        'Disease': np.array(DISEASES)[rng.integers(0, len(DISEASES), rows)],
+        'Cases': rng.poisson(15 + 10 * season.clip(0)),
+        'Temperature': np.round(27 + 5 * season + rng.normal(0, 2, rows), 2),
+        'Humidity': np.round(rng.uniform(40, 90, rows), 2),
+        'Rainfall': np.round((200 + 200 * season + rng.normal(0, 50, rows)).clip(0), 2),
+        'Water Quality': np.round(rng.uniform(1, 10, rows), 2),
+        'Population Density': np.round(rng.uniform(50, 200, rows), 2),
+        'Vaccination Rate': np.round(rng.uniform(0.3, 0.9, rows), 3),
+        'Date': (pd.Timestamp('2023-01-01') + pd.to_timedelta(days, unit='D')).strftime('%Y-%m-%d'),
+    })
+
+    csv_dir.mkdir(parents=True, exist_ok=True)
+    for file_name, part in zip(HEALTH_FILES, np.array_split(np.arange(rows), len(HEALTH_FILES))):
+        frame.iloc[part].to_csv(csv_dir / file_name, index=False)
+
+
+class RSSMonitor:
+    """Tracks peak resident set size while a stage runs"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.page_size = os.sysconf('SC_PAGE_SIZE')
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def current(self) -> int:
+        try:
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * self.page_size
+        except OSError:
+            # No /proc: fall back to the process high-water mark
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def __enter__(self) -> 'RSSMonitor':
+        self.peak = self.current()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.current())
+        return False
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.current())
+
+
+def run_stage(function, items: int, item_name: str = 'rows', repeats: int = 1) -> Dict[str, Any]:
+    """Time one stage (best of `repeats`), with peak RSS and the pipeline stage timers it triggered"""
+    from ml_models.metrics import STAGE_DURATION
+
+    before = STAGE_DURATION.totals()
+    walls = []
+    with RSSMonitor() as monitor:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            function()
+            walls.append(time.perf_counter() - start)
+    wall = min(walls)
+
+    breakdown = {
+        labels[0]: round((total - before.get(labels, 0.0)) / repeats, 6)
+        for labels, total in STAGE_DURATION.totals().items()
+        if total - before.get(labels, 0.0) > 0
+    }
+    return {
+        'wall_seconds': round(wall, 6),
+        'peak_rss_mb': round(monitor.peak / 2**20, 1),
+        f'{item_name}_per_second': round(items / wall, 1) if wall > 0 else None,
+        'stage_breakdown_seconds': breakdown,
+    }
+
+
+def run_case(csv_dir: str, rows: int, districts: int, stages: List[str], predict_calls: int,
+             predict_repeats: int, csv_engine: str) -> Dict[str, Any]:
+    """Run the pipeline stages for one dataset (called in a fresh process)"""
+    logging.disable(logging.WARNING)
+    np.random.seed(0)
+
+    from ml_models.data_processor import DataProcessor
+    from ml_models.disease_predictor import DiseasePredictor
+    from ml_models.forecast_engine import ForecastEngine
+
+    processor = DataProcessor(csv_dir=Path(csv_dir), csv_engine=csv_engine)
+    predictor = DiseasePredictor()
+    engine = ForecastEngine()
+    targets = district_names(districts)[:predict_calls]
+    state = {}
+    results = {}
+
+    def load():
+        state['data'] = processor.load_csv_data()
+
+    def forecast_predict():
+        # Cold forecast cache: every call fits the cached horizon for its district
+        engine.forecast_cache.clear()
+        for district in targets:
+            engine.predict(district, 30)
+
+    # Training stages need the loaded frame even when load is not reported
+    if 'load_csv_data' in stages:
+        results['load_csv_data'] = run_stage(load, rows)
+    else:
+        load()
+
+    if 'disease_train' in stages or 'disease_predict' in stages:
+        train = run_stage(lambda: predictor.train_models(state['data']), rows)
+        if 'disease_train' in stages:
+            results['disease_train'] = train
+    if 'disease_predict' in stages:
+        results['disease_predict'] = run_stage(
+            lambda: [predictor.predict(district) for district in targets], len(targets), 'calls', predict_repeats
+        )
+
+    if 'forecast_train' in stages or 'forecast_predict' in stages:
+        train = run_stage(lambda: engine.train_models(state['data']), rows)
+        if 'forecast_train' in stages:
+            results['forecast_train'] = train
+    if 'forecast_predict' in stages:
+        results['forecast_predict'] = run_stage(forecast_predict, len(targets), 'calls', predict_repeats)
+
+    return {
+        'loaded_rows': len(state['data']),
+        'disease_models_trained': predictor.is_trained(),
+        'forecast_models': len(engine.models),
+        'stages': results,
+    }
+
+
+def _case_worker(queue, *args):
+    try:
+        queue.put(('ok', run_case(*args)))
+    except Exception as e:
+        queue.put(('error', f"{type(e).__name__}: {e}"))
+
+
+def run_case_isolated(csv_dir: Path, *args) -> Dict[str, Any]:
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_case_worker, args=(queue, str(csv_dir)) + args)
+    process.start()
+    status, payload = queue.get()
+    process.join()
+    if status != 'ok':
+        raise RuntimeError(payload)
+    return payload
+
+
+def case_grid(rows: List[int], districts: List[int]) -> List[tuple]:
+    """Row/district pairs, skipping datasets too sparse to fit every district-disease series"""
+    return [(r, d) for r in rows for d in districts if r >= d * len(DISEASES) * 4]
+
+
+def environment() -> Dict[str, Any]:
+    import sklearn
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'scikit_learn': sklearn.__version__,
+    }
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float,
+            rss_tolerance: float) -> List[Dict[str, Any]]:
+    """Stage-level differences against the baseline; `regression` marks the ones that fail"""
+    baseline_cases = {case['case']: case for case in baseline.get('results', [])}
+    comparisons = []
+
+    for case in results:
+        reference = baseline_cases.get(case['case'])
+        if reference is None:
+            continue
+        for stage, current in case['stages'].items():
+            previous = reference['stages'].get(stage)
+            if previous is None:
+                continue
+            wall_ratio = current['wall_seconds'] / max(previous['wall_seconds'], 1e-9)
+            rss_ratio = current['peak_rss_mb'] / max(previous['peak_rss_mb'], 1e-9)
+            slower = (wall_ratio > 1 + tolerance and
+                      current['wall_seconds'] - previous['wall_seconds'] > MIN_REGRESSION_SECONDS)
+            larger = (rss_ratio > 1 + rss_tolerance and
+                      current['peak_rss_mb'] - previous['peak_rss_mb'] > MIN_REGRESSION_RSS_MB)
+            comparisons.append({
+                'case': case['case'],
+                'stage': stage,
+                'wall_seconds': current['wall_seconds'],
+                'baseline_wall_seconds': previous['wall_seconds'],
+                'wall_ratio': round(wall_ratio, 3),
+                'peak_rss_mb': current['peak_rss_mb'],
+                'baseline_peak_rss_mb': previous['peak_rss_mb'],
+                'rss_ratio': round(rss_ratio, 3),
+                'regression': slower or larger,
+            })
+    return comparisons
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='quick')
+    parser.add_argument('--rows', type=int, nargs='+', help='Row counts (overrides the preset)')
+    parser.add_argument('--districts', type=int, nargs='+', help='District counts (overrides the preset)')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--predict-calls', type=int, default=20, help='Districts predicted per predict stage')
+    parser.add_argument('--predict-repeats', type=int, default=5, help='Predict stages report the best of this many runs')
+    parser.add_argument('--csv-engine', choices=['auto', 'c', 'pyarrow'], default='auto',
+                        help='CSV parser for load_csv_data (auto: pyarrow when installed)')
+    parser.add_argument('--output', type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='Write these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed wall time increase (0.25 = 25%%)')
+    parser.add_argument('--rss-tolerance', type=float, default=0.25, help='Allowed peak RSS increase')
+    parser.add_argument('--data-dir', type=Path, help='Keep generated CSVs here instead of a temp directory')
+    args = parser.parse_args()
+
+    rows = args.rows or PRESETS[args.preset]['rows']
+    districts = args.districts or PRESETS[args.preset]['districts']
+    results = []
+
+    with tempfile.TemporaryDirectory(prefix='pipeline-bench-') as scratch:
+        data_root = args.data_dir or Path(scratch)
+        for row_count, district_count in case_grid(rows, districts):
+            name = f"rows={row_count},districts={district_count}"
+            csv_dir = data_root / f"rows{row_count}_districts{district_count}"
+            if not (csv_dir / HEALTH_FILES[0]).exists():
+                write_dataset(csv_dir, row_count, district_count)
+
+            print(f"{name} ...", file=sys.stderr, flush=True)
+            case = run_case_isolated(
+                csv_dir, row_count, district_count, args.stages, args.predict_calls, args.predict_repeats,
+                args.csv_engine
+            )
+            results.append({'case': name, 'rows': row_count, 'districts': district_count, **case})
+            for stage, timing in case['stages'].items():
+                print(f"  {stage:<17} {timing['wall_seconds']:>9.3f}s  {timing['peak_rss_mb']:>8.1f} MB",
+                      file=sys.stderr, flush=True)
+
+    report = {'environment': environment(), 'results': results}
+
+    if args.baseline.exists() and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        report['baseline'] = {'path': str(args.baseline), 'environment': baseline.get('environment')}
+        report['comparison'] = compare(results, baseline, args.tolerance, args.rss_tolerance)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    regressions = [item for item in report.get('comparison', []) if item['regression']]
+    print(json.dumps({
+        'output': str(args.output),
+        'cases': len(results),
+        'compared_stages': len(report.get('comparison', [])),
+        'regressions': regressions,
+    }, indent=2))
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Serialization benchmark for POST /predict responses
+
+Compares the previous response path (one PredictionResponse per prediction,
+datetime.now() per field, then response_model validation and JSON encoding)
+with the fast path (plain records encoded directly), per 1k predictions.
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+import numpy as np
+from pydantic import TypeAdapter
+
+# Add the service directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app import PredictionResponse
+from ml_models.disease_predictor import DiseasePredictor
+from serialization import dumps, orjson, prediction_records
+
+RESPONSE_ADAPTER = TypeAdapter(List[PredictionResponse])
+
+
+def legacy_path(predictions) -> bytes:
+    """Pydantic objects, response_model validation, then json.dumps"""
+    response_predictions = []
+    for pred in predictions:
+        response_predictions.append(PredictionResponse(
+            id=f"pred-{datetime.now().strftime('%Y%m%d%H%M%S')}-{len(response_predictions)}",
+            district=pred["district"],
+            disease=pred["disease"],
+            riskLevel=pred["risk_level"],
+            probability=pred["probability"],
+            confidence=pred["confidence"],
+            timeframe=pred["timeframe"],
+            factors=pred["factors"],
+            environmentalData=pred["environmental_data"],
+            populationData=pred["population_data"],
+            historicalTrend=pred["historical_trend"],
+            recommendations=pred["recommendations"],
+            createdAt=datetime.now().isoformat(),
+            updatedAt=datetime.now().isoformat(),
+            modelVersion="v2.1"
+        ))
+    validated = RESPONSE_ADAPTER.validate_python(response_predictions, from_attributes=True)
+    content = RESPONSE_ADAPTER.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(predictions) -> bytes:
+    return dumps(prediction_records(predictions))
+
+
+def time_path(path, predictions, repeats: int) -> float:
+    """Median milliseconds for one call"""
+    path(predictions)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        path(predictions)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--predictions', type=int, default=1000)
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    predictor = DiseasePredictor()
+    predictions = []
+    while len(predictions) < args.predictions:
+        predictions.extend(predictor._generate_mock_predictions("Senapati", None, 30))
+    predictions = predictions[:args.predictions]
+
+    # Same wire format apart from the timestamps
+    legacy = json.loads(legacy_path(predictions[:10]))
+    fast = json.loads(fast_path(predictions[:10]))
+    for record in legacy + fast:
+        for field in ('id', 'createdAt', 'updatedAt'):
+            record.pop(field)
+    assert legacy == fast, "fast path changed the response format"
+
+    scale = 1000 / args.predictions
+    legacy_ms = time_path(legacy_path, predictions, args.repeats) * scale
+    fast_ms = time_path(fast_path, predictions, args.repeats) * scale
+
+    print(json.dumps({
+        'encoder': 'orjson' if orjson else 'json',
+        'legacy_ms_per_1k': round(legacy_ms, 3),
+        'fast_ms_per_1k': round(fast_ms, 3),
+        'speedup': round(legacy_ms / fast_ms, 2)
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
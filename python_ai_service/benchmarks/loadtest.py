@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+HTTP load test for the AI prediction service
+
+Drives a weighted mix of routes against a running service (--url) or the
+FastAPI app in-process, with either arrival model:
+
+- closed loop: N virtual users, each sending its next request when the
+  previous one returns (plus optional think time)
+- open loop: requests arrive as a Poisson process at a fixed rate whether or
+  not earlier ones have finished; latency is measured from the scheduled
+  arrival, so queueing delay is not hidden (no coordinated omission)
+
+Several concurrency levels or rates can be swept in one run. Throughput,
+p50/p95/p99/max latency and error rates per route are written as JSON.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+import httpx
+import numpy as np
+
+# Add the service directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+DISTRICTS = ["Imphal East", "Imphal West", "Bishnupur", "Senapati", "Churachandpur"]
+
+# name -> (method, path, builds the request's path/body for a district)
+ROUTES = {
+    'predict': lambda district: ('POST', '/predict', {'district': district, 'timeframe_days': 30}),
+    'predict_all': lambda district: ('GET', '/predictions/all', None),
+    'forecast': lambda district: ('GET', f'/forecast/{district}?days=30', None),
+    'health': lambda district: ('GET', '/health', None),
+    'refresh': lambda district: ('POST', '/refresh', None),
+}
+DEFAULT_MIX = 'predict=5,predict_all=2,forecast=3,health=1'
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """'predict=5,forecast=3' -> route weights"""
+    weights = {}
+    for part in mix.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ROUTES:
+            raise ValueError(f"Unknown route '{name}', expected one of {sorted(ROUTES)}")
+        weights[name] = float(weight or 1)
+    if not any(weight > 0 for weight in weights.values()):
+        raise ValueError("Route mix needs at least one positive weight")
+    return weights
+
+
+class Recorder:
+    """Latency samples and errors per route for one load step"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.requests = {}
+        self.errors = {}
+        self.started = None
+        self.finished = None
+
+    def record(self, route: str, seconds: Optional[float], error: Optional[str] = None):
+        """`seconds` is None for requests that were never sent"""
+        self.requests[route] = self.requests.get(route, 0) + 1
+        if seconds is not None:
+            self.latencies.setdefault(route, []).append(seconds)
+        if error is not None:
+            self.errors.setdefault(route, {})
+            self.errors[route][error] = self.errors[route].get(error, 0) + 1
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = max(self.finished - self.started, 1e-9)
+        routes = {route: self._stats(count, self.latencies.get(route, []), self.errors.get(route, {}), elapsed)
+                  for route, count in sorted(self.requests.items())}
+        all_samples = [s for samples in self.latencies.values() for s in samples]
+        all_errors = {}
+        for errors in self.errors.values():
+            for error, count in errors.items():
+                all_errors[error] = all_errors.get(error, 0) + count
+        return {
+            'duration_seconds': round(elapsed, 3),
+            'overall': self._stats(sum(self.requests.values()), all_samples, all_errors, elapsed),
+            'routes': routes,
+        }
+
+    def _stats(self, count: int, samples: List[float], errors: Dict[str, int], elapsed: float) -> Dict[str, Any]:
+        error_count = sum(errors.values())
+        stats = {
+            'requests': count,
+            'errors': error_count,
+            'error_rate': round(error_count / count, 4) if count else 0.0,
+            'throughput_rps': round(len(samples) / elapsed, 2),
+            'error_types': errors,
+        }
+        if samples:
+            latencies_ms = np.asarray(samples) * 1000
+            p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+            stats.update({
+                'p50_ms': round(float(p50), 3),
+                'p95_ms': round(float(p95), 3),
+                'p99_ms': round(float(p99), 3),
+                'max_ms': round(float(latencies_ms.max()), 3),
+                'mean_ms': round(float(latencies_ms.mean()), 3),
+            })
+        return stats
+
+
+class LoadTest:
+    def __init__(self, client: httpx.AsyncClient, mix: Dict[str, float], timeout: float, seed: int = 0):
+        self.client = client
+        self.routes = list(mix)
+        self.weights = [mix[name] for name in self.routes]
+        self.timeout = timeout
+        self.random = random.Random(seed)
+
+    def _next_request(self):
+        route = self.random.choices(self.routes, self.weights)[0]
+        return route, ROUTES[route](self.random.choice(DISTRICTS))
+
+    async def _send(self, recorder: Optional[Recorder], route: str, request, scheduled: float):
+        method, path, body = request
+        error = None
+        try:
+            response = await self.client.request(method, path, json=body, timeout=self.timeout)
+            if response.status_code >= 400:
+                error = f"HTTP {response.status_code}"
+        except Exception as e:
+            error = type(e).__name__
+        if recorder is not None:
+            recorder.record(route, time.perf_counter() - scheduled, error)
+
+    async def closed_loop(self, users: int, duration: float, warmup: float, think_time: float) -> Recorder:
+        """`users` clients each keep exactly one request in flight"""
+        recorder = Recorder()
+        start = time.perf_counter()
+        measure_from = start + warmup
+        deadline = measure_from + duration
+
+        async def user():
+            while True:
+                now = time.perf_counter()
+                if now >= deadline:
+                    return
+                route, request = self._next_request()
+                await self._send(recorder if now >= measure_from else None, route, request, now)
+                if think_time > 0:
+                    await asyncio.sleep(self.random.expovariate(1.0 / think_time))
+
+        recorder.started = measure_from
+        await asyncio.gather(*(user() for _ in range(users)))
+        recorder.finished = max(time.perf_counter(), measure_from + 1e-9)
+        return recorder
+
+    async def open_loop(self, rate: float, duration: float, warmup: float, max_in_flight: int) -> Recorder:
+        """Poisson arrivals at `rate` req/s, independent of response times"""
+        recorder = Recorder()
+        start = time.perf_counter()
+        measure_from = start + warmup
+        deadline = measure_from + duration
+        in_flight = set()
+        scheduled = start
+
+        recorder.started = measure_from
+        while True:
+            scheduled += self.random.expovariate(rate)
+            if scheduled >= deadline:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            measured = recorder if scheduled >= measure_from else None
+            route, request = self._next_request()
+            if len(in_flight) >= max_in_flight:
+                # The generator itself is saturated; count it rather than queue unboundedly
+                if measured is not None:
+                    measured.record(route, None, 'dropped')
+                continue
+            task = asyncio.ensure_future(self._send(measured, route, request, scheduled))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+
+        if in_flight:
+            await asyncio.gather(*in_flight)
+        recorder.finished = time.perf_counter()
+        return recorder
+
+
+def in_process_client() -> httpx.AsyncClient:
+    """Client bound to the app itself; models are trained up front since no lifespan runs"""
+    import logging
+    logging.disable(logging.WARNING)
+    import app as service
+    service.initialize_models()
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=service.app), base_url='http://loadtest')
+
+
+async def run(args) -> Dict[str, Any]:
+    mix = parse_mix(args.mix)
+    client = httpx.AsyncClient(base_url=args.url) if args.url else in_process_client()
+    target = 'in-process (shares the event loop and CPU with the generator)' if not args.url else args.url
+    steps = []
+
+    async with client:
+        load_test = LoadTest(client, mix, args.timeout, args.seed)
+        if args.rate:
+            for rate in args.rate:
+                recorder = await load_test.open_loop(rate, args.duration, args.warmup, args.max_in_flight)
+                steps.append({'model': 'open', 'offered_rps': rate, **recorder.summary()})
+                print_step(steps[-1])
+        else:
+            for users in args.concurrency:
+                recorder = await load_test.closed_loop(users, args.duration, args.warmup, args.think_time)
+                steps.append({'model': 'closed', 'users': users, **recorder.summary()})
+                print_step(steps[-1])
+
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'target': target,
+        'mix': mix,
+        'duration_seconds': args.duration,
+        'warmup_seconds': args.warmup,
+        'think_time_seconds': args.think_time if not args.rate else None,
+        'steps': steps,
+    }
+
+
+def print_step(step: Dict[str, Any]):
+    label = f"{step['offered_rps']} rps offered" if step['model'] == 'open' else f"{step['users']} users"
+    overall = step['overall']
+    print(f"{label}: {overall['throughput_rps']} rps, p50 {overall.get('p50_ms', 0):.1f} ms, "
+          f"p99 {overall.get('p99_ms', 0):.1f} ms, errors {overall['error_rate']:.2%}", file=sys.stderr)
+    for route, stats in step['routes'].items():
+        print(f"  {route:<12} {stats['requests']:>6} req  p50 {stats.get('p50_ms', 0):>8.1f}  "
+              f"p95 {stats.get('p95_ms', 0):>8.1f}  p99 {stats.get('p99_ms', 0):>8.1f}  "
+              f"max {stats.get('max_ms', 0):>8.1f} ms  err {stats['error_rate']:.2%}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='Base URL of a running service; omit to load the app in-process')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f"Route weights (routes: {', '.join(ROUTES)})")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 5, 10, 20],
+                        help='Closed loop: virtual users per step')
+    parser.add_argument('--rate', type=float, nargs='+', help='Open loop: offered requests/s per step')
+    parser.add_argument('--duration', type=float, default=20.0, help='Measured seconds per step')
+    parser.add_argument('--warmup', type=float, default=2.0, help='Unmeasured seconds before each step')
+    parser.add_argument('--think-time', type=float, default=0.0, help='Closed loop: mean pause between requests')
+    parser.add_argument('--max-in-flight', type=int, default=1000, help='Open loop: requests beyond this are dropped')
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=Path, help='Write the JSON report here as well as stdout')
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
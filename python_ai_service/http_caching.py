@@ -0,0 +1,73 @@
+"""
+Conditional HTTP caching for read endpoints
+
+Read responses only change when data is reloaded or models are retrained,
+so their ETag is derived from the model/data version plus the request
+(path, query parameters and whether NDJSON was requested). ConditionalCache
+is a FastAPI dependency: it runs before the endpoint body, so a matching
+If-None-Match is answered with 304 before any model evaluation.
+
+Tags are weak (W/"..."): predictions are semantically equivalent for a
+given model version, not byte-identical (ids and timestamps differ).
+"""
+
+import hashlib
+from typing import Callable, Dict, Optional
+
+from fastapi import HTTPException, Request, Response
+
+from ml_models.metrics import REGISTRY
+
+CONDITIONAL_REQUESTS = REGISTRY.counter(
+    'http_conditional_requests_total',
+    'Read requests by conditional cache outcome (not_modified answered with 304)',
+    ('outcome',)
+)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against one tag"""
+    if not if_none_match:
+        return False
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if (candidate[2:] if candidate.startswith('W/') else candidate) == opaque:
+            return True
+    return False
+
+
+class ConditionalCache:
+    """FastAPI dependency adding ETag/Cache-Control and answering 304s"""
+
+    def __init__(self, version: Callable[[], str], max_age: int = 0):
+        self.version = version
+        self.max_age = max_age
+
+    def etag(self, request: Request) -> str:
+        wants_stream = 'application/x-ndjson' in request.headers.get('accept', '')
+        query = '&'.join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+        key = f"{self.version()}|{request.url.path}|{query}|{int(wants_stream)}"
+        return 'W/"' + hashlib.blake2b(key.encode('utf-8'), digest_size=12).hexdigest() + '"'
+
+    def headers(self, etag: str) -> Dict[str, str]:
+        return {
+            'ETag': etag,
+            'Cache-Control': f"private, max-age={self.max_age}, must-revalidate",
+            'Vary': 'Accept',
+        }
+
+    def __call__(self, request: Request, response: Response) -> str:
+        etag = self.etag(request)
+        headers = self.headers(etag)
+        if etag_matches(request.headers.get('if-none-match'), etag):
+            CONDITIONAL_REQUESTS.inc('not_modified')
+            raise HTTPException(status_code=304, headers=headers)
+
+        CONDITIONAL_REQUESTS.inc('full')
+        # Applied to dict/list returns; endpoints returning a Response add
+        # headers(etag) themselves
+        response.headers.update(headers)
+        return etag
@@ -0,0 +1,73 @@
+"""
+Request metrics for the AI prediction service
+
+A plain ASGI middleware (no per-request Request/Response objects) that
+records latency and request counts per route template and district into
+the shared metrics registry served at /metrics. District labels go through
+a resolver that maps unknown names to "other", so arbitrary client input
+cannot grow the label set.
+"""
+
+import time
+from typing import Callable, Optional
+from urllib.parse import parse_qs
+
+from ml_models.metrics import REGISTRY
+
+REQUEST_DURATION = REGISTRY.histogram(
+    'http_request_duration_seconds',
+    'HTTP request latency by route and district',
+    ('method', 'route', 'district')
+)
+REQUESTS_TOTAL = REGISTRY.counter(
+    'http_requests_total',
+    'HTTP requests by route and status code',
+    ('method', 'route', 'status')
+)
+
+
+def set_metrics_district(request, district: str):
+    """Label the current request's metrics with a district taken from its body"""
+    request.state.metrics_district = district
+
+
+class MetricsMiddleware:
+    def __init__(self, app, known_district: Optional[Callable[[str], Optional[str]]] = None):
+        self.app = app
+        # Canonical name of a known district, None otherwise
+        self.known_district = known_district
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            route = scope.get("route")
+            route_path = route.path if route is not None else "unmatched"
+            method = scope["method"]
+            REQUEST_DURATION.observe(elapsed, method, route_path, self._district(scope))
+            REQUESTS_TOTAL.inc(method, route_path, str(status[0]))
+
+    def _district(self, scope) -> str:
+        district = scope.get("path_params", {}).get("district")
+        if district is None:
+            district = scope.get("state", {}).get("metrics_district")
+        if district is None and b"district" in scope.get("query_string", b""):
+            district = parse_qs(scope["query_string"].decode("latin-1")).get("district", [None])[0]
+        if not district:
+            return ""
+        if self.known_district is None:
+            return "other"
+        return self.known_district(district) or "other"
@@ -0,0 +1,269 @@
+"""
+Micro-batched bulk ingest of live case/environment reports
+
+POST /ingest accepts a JSON array of records or a CSV body with a header row.
+Valid records are appended to a durable NDJSON log (one write per request)
+and to an in-memory columnar buffer; a background flusher turns the buffer
+into one DataFrame per micro-batch and appends it to DataProcessor's dataset
+and indexes. Request handling never touches the dataset itself, so ingest
+traffic does not block predictions.
+
+On startup and /refresh the log is replayed on top of the CSV files, so
+ingested records survive restarts and are included in full retrains. In
+pre-fork production mode the master, which owns the dataset, reads what its
+workers logged since its last replay instead of workers flushing their own
+buffers.
+"""
+
+import asyncio
+import csv
+import io
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from ml_models.data_processor import COLUMN_MAPPING
+from ml_models.metrics import REGISTRY, stage_timer
+from serialization import dumps, orjson
+
+logger = logging.getLogger(__name__)
+
+INGEST_RECORDS = REGISTRY.counter(
+    'ingest_records_total',
+    'Records received by /ingest, by outcome',
+    ('outcome',)
+)
+INGEST_FLUSHES = REGISTRY.counter(
+    'ingest_flushes_total',
+    'Micro-batches flushed into the dataset, by outcome',
+    ('outcome',)
+)
+INGEST_PENDING = REGISTRY.gauge('ingest_pending_records', 'Accepted records waiting for the next flush')
+
+NUMERIC_COLUMNS = ('cases', 'temperature', 'humidity', 'rainfall', 'water_quality',
+                   'population_density', 'vaccination_rate')
+INGEST_COLUMNS = ('district', 'disease', 'date') + NUMERIC_COLUMNS
+
+# Report at most this many rejected records back to the client
+MAX_REPORTED_ERRORS = 20
+
+
+class IngestError(ValueError):
+    """The request body could not be parsed at all"""
+
+
+class IngestBackpressure(Exception):
+    """Too many records are waiting to be flushed"""
+
+
+def _canonical(name: str) -> str:
+    name = str(name).strip()
+    return COLUMN_MAPPING.get(name, name.lower())
+
+
+def _validate(raw: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Canonical record with numeric fields as floats, or the reason it was rejected"""
+    record = {}
+    for key, value in raw.items():
+        column = _canonical(key)
+        if column in INGEST_COLUMNS:
+            record[column] = value
+
+    for column in ('district', 'date'):
+        value = record.get(column)
+        if value is None or not str(value).strip():
+            return None, f"missing {column}"
+        record[column] = str(value).strip()
+
+    disease = record.get('disease')
+    record['disease'] = str(disease).strip() if disease not in (None, '') else None
+
+    for column in NUMERIC_COLUMNS:
+        value = record.get(column)
+        if value is None or value == '':
+            record[column] = None
+            continue
+        try:
+            record[column] = float(value)
+        except (TypeError, ValueError):
+            return None, f"invalid {column}: {value!r}"
+    return record, None
+
+
+def parse_body(body: bytes, content_type: str) -> Iterable[Dict[str, Any]]:
+    """Raw records from a JSON array (or {"records": [...]}) or a CSV body"""
+    if 'csv' in content_type:
+        try:
+            reader = csv.DictReader(io.StringIO(body.decode('utf-8-sig')))
+            if not reader.fieldnames:
+                raise IngestError("CSV body needs a header row")
+            return list(reader)
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise IngestError(f"Invalid CSV body: {str(e)}")
+
+    try:
+        payload = orjson.loads(body) if orjson is not None else json.loads(body)
+    except ValueError as e:
+        raise IngestError(f"Invalid JSON body: {str(e)}")
+    if isinstance(payload, dict):
+        payload = payload.get('records')
+    if not isinstance(payload, list):
+        raise IngestError("Expected a JSON array of records or an object with a 'records' array")
+    return payload
+
+
+class IngestBuffer:
+    """Columnar buffer of accepted records in front of an append-only log
+
+    `lock` guards the buffer and the log together, so a record is either in
+    the buffer or already in the dataset whenever the log is replayed.
+    `flush_lock` serializes whatever applies a batch with replays of the log.
+    """
+
+    def __init__(self, log_path: Optional[Path] = None, batch_size: int = 5000,
+                 flush_interval: float = 1.0, max_pending: int = 100000, fsync: bool = True):
+        self.log_path = Path(log_path) if log_path else None
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.fsync = fsync
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self._columns = {column: [] for column in INGEST_COLUMNS}
+        self._pending = 0
+        self._log_fd = None
+        self._wakeup = None
+        # Bytes of the log replayed or read into the dataset so far
+        self.log_offset = 0
+        INGEST_PENDING.set_function(lambda: self._pending)
+
+    def pending(self) -> int:
+        return self._pending
+
+    def ingest(self, body: bytes, content_type: str) -> Dict[str, Any]:
+        """Parse a request body and accept its records"""
+        with stage_timer('ingest_parse'):
+            records = parse_body(body, content_type)
+        return self.accept(records)
+
+    def accept(self, records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Validate records, log the valid ones durably and buffer them for the next flush"""
+        valid, errors, rejected = [], [], 0
+        with stage_timer('ingest_validate'):
+            for position, raw in enumerate(records):
+                record, error = _validate(raw) if isinstance(raw, dict) else (None, "not an object")
+                if record is None:
+                    rejected += 1
+                    if len(errors) < MAX_REPORTED_ERRORS:
+                        errors.append({'index': position, 'error': error})
+                    continue
+                valid.append(record)
+
+        if valid:
+            with self.lock:
+                if self._pending + len(valid) > self.max_pending:
+                    raise IngestBackpressure(
+                        f"{self._pending} records are waiting to be flushed (limit {self.max_pending})"
+                    )
+                self._write_log(valid)
+                for column, values in self._columns.items():
+                    values.extend(record.get(column) for record in valid)
+                self._pending += len(valid)
+            if self._pending >= self.batch_size:
+                self._notify()
+
+        INGEST_RECORDS.inc('accepted', amount=len(valid))
+        INGEST_RECORDS.inc('rejected', amount=rejected)
+        return {'accepted': len(valid), 'rejected': rejected, 'errors': errors}
+
+    def take_batch(self) -> Optional[pd.DataFrame]:
+        """Swap out the buffered records as one DataFrame, or None if empty"""
+        with self.lock:
+            if not self._pending:
+                return None
+            columns = self._columns
+            self._columns = {column: [] for column in INGEST_COLUMNS}
+            self._pending = 0
+        return pd.DataFrame(columns)
+
+    def replay_log(self) -> pd.DataFrame:
+        """Every logged record, dropping the buffer since those records are in the log too
+
+        Callers hold flush_lock and rebuild the dataset from scratch with the
+        result, so nothing is lost or applied twice.
+        """
+        with self.lock:
+            self._columns = {column: [] for column in INGEST_COLUMNS}
+            self._pending = 0
+            self.log_offset = 0
+            if self.log_path is None or not self.log_path.exists():
+                return pd.DataFrame(columns=list(INGEST_COLUMNS))
+            records, self.log_offset = self._read_log(0)
+        logger.info(f"Replayed {len(records)} ingested records from {self.log_path}")
+        return pd.DataFrame.from_records(records, columns=list(INGEST_COLUMNS))
+
+    def read_new_records(self) -> Optional[pd.DataFrame]:
+        """Records other processes logged since the last replay or read, or None
+
+        Callers hold flush_lock and append the result to the dataset.
+        """
+        if self.log_path is None or not self.log_path.exists():
+            return None
+        if self.log_path.stat().st_size <= self.log_offset:
+            return None
+        records, self.log_offset = self._read_log(self.log_offset)
+        if not records:
+            return None
+        return pd.DataFrame.from_records(records, columns=list(INGEST_COLUMNS))
+
+    def _read_log(self, start: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Complete lines of the log from byte `start`, and the offset after the last one"""
+        loads = orjson.loads if orjson is not None else json.loads
+        with open(self.log_path, 'rb') as log:
+            log.seek(start)
+            data = log.read()
+        # A line still being written is left for the next read
+        end = data.rfind(b"\n") + 1
+        records = []
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                records.append(loads(line))
+            except ValueError:
+                # A torn write from a crash; the lines around it are intact
+                logger.warning(f"Skipping an unreadable line in {self.log_path}")
+        return records, start + end
+
+    def _write_log(self, records: List[Dict[str, Any]]):
+        if self.log_path is None:
+            return
+        if self._log_fd is None:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            self._log_fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        with stage_timer('ingest_log_write'):
+            # One write per request keeps lines whole with several workers appending
+            os.write(self._log_fd, b"\n".join(dumps(record) for record in records) + b"\n")
+            if self.fsync:
+                os.fsync(self._log_fd)
+
+    def _notify(self):
+        if self._wakeup is not None:
+            self._wakeup[0].call_soon_threadsafe(self._wakeup[1].set)
+
+    async def wait_for_batch(self):
+        """Return once a full batch is buffered or the flush interval has passed"""
+        if self._wakeup is None:
+            self._wakeup = (asyncio.get_running_loop(), asyncio.Event())
+        event = self._wakeup[1]
+        if self._pending < self.batch_size:
+            try:
+                await asyncio.wait_for(event.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+        event.clear()
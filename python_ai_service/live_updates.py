@@ -0,0 +1,188 @@
+"""
+Server-Sent Events push of prediction changes after a model swap
+
+After startup training and every /refresh, one compact snapshot is taken:
+the risk level per district/disease and a forecast summary per district.
+It is diffed against the previous snapshot and the diff is encoded once as
+an SSE frame, then fanned out to every connected client.
+
+Each client has a bounded queue. A client that falls behind (its queue is
+full) has its backlog replaced with a single `resync` event telling it to
+refetch full state, so one slow reader never holds memory for the rest.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from ml_models.metrics import REGISTRY, stage_timer
+from serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+LIVE_UPDATE_CLIENTS = REGISTRY.gauge('live_update_clients', 'Connected /subscribe clients')
+LIVE_UPDATE_EVENTS = REGISTRY.counter(
+    'live_update_events_total',
+    'Events published to /subscribe clients, counted once per fan-out',
+    ('event',)
+)
+LIVE_UPDATE_LAGGED = REGISTRY.counter(
+    'live_update_lagged_total',
+    'Times a slow client overflowed its buffer and was told to resync'
+)
+
+
+class TooManySubscribers(Exception):
+    pass
+
+
+def sse_frame(event: str, data: Dict[str, Any], event_id: Optional[int] = None) -> bytes:
+    """Encode one SSE event; JSON is single-line, so one data field suffices"""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\n".encode('utf-8') + b"data: " + dumps(data) + b"\n\n"
+
+
+def diff_snapshots(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """Risk level and forecast summary changes between two snapshots"""
+    risk_changes = []
+    for district, diseases in current['risks'].items():
+        before = previous['risks'].get(district, {})
+        for disease, risk in diseases.items():
+            old = before.get(disease)
+            if old is None or old['riskLevel'] != risk['riskLevel']:
+                risk_changes.append({
+                    'district': district,
+                    'disease': disease,
+                    'riskLevel': risk['riskLevel'],
+                    'previousRiskLevel': old['riskLevel'] if old else None,
+                    'probability': risk['probability'],
+                })
+    for district, diseases in previous['risks'].items():
+        for disease, old in diseases.items():
+            if disease not in current['risks'].get(district, {}):
+                risk_changes.append({
+                    'district': district,
+                    'disease': disease,
+                    'riskLevel': None,
+                    'previousRiskLevel': old['riskLevel'],
+                    'probability': None,
+                })
+
+    forecast_changes = []
+    for district, summary in current['forecasts'].items():
+        old = previous['forecasts'].get(district)
+        if old != summary:
+            forecast_changes.append({'district': district, **summary, 'previous': old})
+
+    return {'risk_changes': risk_changes, 'forecast_changes': forecast_changes}
+
+
+class _Subscriber:
+    def __init__(self, buffer_size: int):
+        self.queue = asyncio.Queue(maxsize=buffer_size)
+
+    def offer(self, frame: bytes, resync_frame: bytes):
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            # Drop the backlog; the client refetches full state instead
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(resync_frame)
+            LIVE_UPDATE_LAGGED.inc()
+
+
+class LiveUpdates:
+    """Snapshot/diff after each model swap, fanned out to SSE subscribers"""
+
+    def __init__(self, snapshot: Callable[[], Dict[str, Any]], buffer_size: int = 16,
+                 max_clients: int = 1000, heartbeat: float = 15.0):
+        self.snapshot = snapshot
+        self.buffer_size = buffer_size
+        self.max_clients = max_clients
+        self.heartbeat = heartbeat
+        self.version = 0
+        self.state = None
+        self.subscribers = set()
+        self._snapshot_frame = None
+        self._publish_lock = None
+        self._tasks = set()
+        LIVE_UPDATE_CLIENTS.set_function(lambda: len(self.subscribers))
+
+    def schedule_publish(self):
+        """Publish from a background task so the caller's response is not delayed"""
+        task = asyncio.ensure_future(self.publish())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def publish(self):
+        """Take a snapshot and push its diff against the previous one to all clients"""
+        if self._publish_lock is None:
+            self._publish_lock = asyncio.Lock()
+
+        async with self._publish_lock:
+            try:
+                state = await run_in_threadpool(self._take_snapshot)
+            except Exception as e:
+                logger.error(f"Error taking live update snapshot: {str(e)}")
+                return
+
+            previous, previous_version = self.state, self.version
+            self.version += 1
+            self.state = state
+            self._snapshot_frame = sse_frame('snapshot', {'version': self.version, **state}, self.version)
+
+            if previous is None:
+                return
+
+            with stage_timer('live_update_diff'):
+                changes = diff_snapshots(previous, state)
+            if not changes['risk_changes'] and not changes['forecast_changes']:
+                return
+
+            frame = sse_frame('diff', {
+                'version': self.version,
+                'previous_version': previous_version,
+                'generated_at': datetime.now().isoformat(),
+                **changes
+            }, self.version)
+            resync = self._resync_frame()
+            for subscriber in list(self.subscribers):
+                subscriber.offer(frame, resync)
+            LIVE_UPDATE_EVENTS.inc('diff')
+            logger.info(
+                f"Pushed update v{self.version} to {len(self.subscribers)} clients: "
+                f"{len(changes['risk_changes'])} risk and {len(changes['forecast_changes'])} forecast changes"
+            )
+
+    def _take_snapshot(self) -> Dict[str, Any]:
+        with stage_timer('live_update_snapshot'):
+            return self.snapshot()
+
+    def _resync_frame(self) -> bytes:
+        return sse_frame('resync', {'version': self.version, 'reason': 'client fell behind'}, self.version)
+
+    def subscribe(self) -> _Subscriber:
+        """New subscriber, registered once its stream starts"""
+        if len(self.subscribers) >= self.max_clients:
+            raise TooManySubscribers(f"Live update subscriber limit ({self.max_clients}) reached")
+        return _Subscriber(self.buffer_size)
+
+    async def stream(self, subscriber: _Subscriber, last_event_id: Optional[str] = None) -> AsyncIterator[bytes]:
+        """SSE body for one client; a reconnect that is already current skips the snapshot"""
+        self.subscribers.add(subscriber)
+        try:
+            yield b"retry: 5000\n\n"
+            if self._snapshot_frame is not None and last_event_id != str(self.version):
+                yield self._snapshot_frame
+            while True:
+                try:
+                    frame = await asyncio.wait_for(subscriber.queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    frame = b": keepalive\n\n"
+                yield frame
+        finally:
+            self.subscribers.discard(subscriber)
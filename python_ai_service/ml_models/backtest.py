@@ -0,0 +1,204 @@
+import logging
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .forecast_engine import ForecastEngine
+
+logger = logging.getLogger(__name__)
+
+# Columns ForecastEngine trains on; only these are shipped to pool workers
+BACKTEST_COLUMNS = ['district', 'disease', 'date', 'cases', 'temperature', 'humidity', 'rainfall', 'water_quality']
+
+# Raw records and monthly actuals, set once per pool worker by _init_worker
+_worker_state = None
+
+
+def _init_worker(data: pd.DataFrame, actuals: Dict[Tuple[str, str, pd.Timestamp], float]):
+    global _worker_state
+    logging.disable(logging.INFO)
+    _worker_state = (data, actuals)
+
+
+def _run_fold(origin: pd.Timestamp, districts: Optional[List[str]], horizons: Tuple[int, ...],
+              engine_options: Dict[str, Any]) -> Dict[str, Any]:
+    """Train on records up to `origin`, forecast `horizons` months ahead and score against actuals"""
+    data, actuals = _worker_state
+    train = data[data['date'] <= origin]
+    if districts is not None:
+        train = train[train['district'].isin(districts)]
+
+    engine = ForecastEngine(**{'interval_samples': 0, **engine_options})
+    start = time.perf_counter()
+    engine.train_models(train.copy())
+    train_seconds = time.perf_counter() - start
+
+    # Daily forecasts from the day after the origin, as the service forecasts
+    # from today; each horizon is read at its month end
+    targets = [origin + pd.offsets.MonthEnd(h) for h in horizons]
+    dates = pd.date_range(origin + pd.Timedelta(days=1), targets[-1], freq='D')
+    positions = dates.get_indexer(targets)
+
+    start = time.perf_counter()
+    forecasts = {key: engine._generate_forecast(model, dates)[positions] for key, model in engine.models.items()}
+    inference_seconds = time.perf_counter() - start
+
+    horizon, predicted, actual, naive = [], [], [], []
+    for key, model in engine.models.items():
+        last = model['last_data']
+        for h, target, value in zip(horizons, targets, forecasts[key]):
+            observed = actuals.get((last['district'], last['disease'], target))
+            if observed is None:
+                continue
+            horizon.append(h)
+            predicted.append(value)
+            actual.append(observed)
+            naive.append(last['cases'])
+
+    return {
+        'origin': origin.date().isoformat(),
+        'train_rows': len(train),
+        'models': len(engine.models),
+        'train_seconds': train_seconds,
+        'inference_seconds': inference_seconds,
+        'horizon': np.array(horizon, dtype=int),
+        'predicted': np.array(predicted, dtype=float),
+        'actual': np.array(actual, dtype=float),
+        'naive': np.array(naive, dtype=float)
+    }
+
+
+class Backtester:
+    """Rolling-origin evaluation of ForecastEngine over every district-disease pair.
+
+    For each origin month t, models are trained on records up to the end of
+    t and forecast `horizons` months ahead; forecasts are scored against the
+    monthly case totals actually recorded. Each fold is split into district
+    shards and every fold x shard runs as one task in a process pool, so
+    batched training still fits a shard's pairs together.
+    """
+
+    def __init__(self, horizons: Sequence[int] = (1, 2, 3), min_train_months: int = 6, step: int = 1,
+                 max_folds: Optional[int] = None, workers: Optional[int] = None, shards: Optional[int] = None,
+                 engine_options: Optional[Dict[str, Any]] = None):
+        self.horizons = tuple(sorted(horizons))
+        self.min_train_months = min_train_months
+        self.step = step
+        self.max_folds = max_folds
+        self.workers = workers or os.cpu_count() or 1
+        self.shards = shards
+        self.engine_options = engine_options or {}
+
+    def origins(self, months: pd.DatetimeIndex) -> List[pd.Timestamp]:
+        """Month ends with enough history before them and the first horizon after them"""
+        if not len(months):
+            return []
+        first, last = months.min(), months.max()
+        origins = pd.date_range(first + pd.offsets.MonthEnd(self.min_train_months - 1),
+                                last - pd.offsets.MonthEnd(self.horizons[0]), freq='M')[::self.step]
+        origins = list(origins)
+        if self.max_folds:
+            origins = origins[-self.max_folds:]
+        return origins
+
+    def run(self, data: pd.DataFrame) -> Dict[str, Any]:
+        """Backtest on raw records in DataProcessor's layout"""
+        data = data[[column for column in BACKTEST_COLUMNS if column in data.columns]].copy()
+        data['date'] = pd.to_datetime(data['date'])
+
+        monthly = ForecastEngine()._prepare_time_series_data(data.copy())
+        if monthly.empty:
+            raise ValueError("No district-disease time series to backtest")
+        actuals = dict(zip(zip(monthly['district'], monthly['disease'], monthly['date']), monthly['cases']))
+
+        origins = self.origins(pd.DatetimeIndex(monthly['date'].unique()))
+        if not origins:
+            raise ValueError(f"Need at least {self.min_train_months + self.horizons[0]} months of data")
+
+        districts = sorted(monthly['district'].unique())
+        shards = self.shards or math.ceil(self.workers / len(origins))
+        shards = max(1, min(shards, len(districts)))
+        district_shards = [districts[i::shards] for i in range(shards)] if shards > 1 else [None]
+        tasks = [(origin, shard) for origin in origins for shard in district_shards]
+        logger.info(f"Backtesting {len(origins)} folds x {shards} shards on {self.workers} workers")
+
+        start = time.perf_counter()
+        if self.workers == 1:
+            _init_worker(data, actuals)
+            folds = [_run_fold(origin, shard, self.horizons, self.engine_options) for origin, shard in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+                                     initializer=_init_worker, initargs=(data, actuals)) as pool:
+                futures = [pool.submit(_run_fold, origin, shard, self.horizons, self.engine_options)
+                           for origin, shard in tasks]
+                folds = [future.result() for future in futures]
+        wall_seconds = time.perf_counter() - start
+
+        return {
+            'horizons': self.horizons,
+            'folds': len(origins),
+            'shards': shards,
+            'workers': self.workers,
+            'engine_options': self.engine_options,
+            'metrics': self._score(folds),
+            'cost': self._cost(folds, wall_seconds),
+            'per_fold': self._per_fold(folds)
+        }
+
+    def _score(self, folds: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """MAE and MAPE per horizon; MAPE leaves out months with zero actual cases"""
+        horizon = np.concatenate([fold['horizon'] for fold in folds])
+        predicted = np.concatenate([fold['predicted'] for fold in folds])
+        actual = np.concatenate([fold['actual'] for fold in folds])
+        naive = np.concatenate([fold['naive'] for fold in folds])
+
+        metrics = []
+        for h in self.horizons:
+            mask = horizon == h
+            nonzero = mask & (actual > 0)
+            metrics.append({
+                'horizon_months': h,
+                'forecasts': int(mask.sum()),
+                'mae': round(float(np.abs(predicted[mask] - actual[mask]).mean()), 3) if mask.any() else None,
+                'mape': round(float((np.abs(predicted[nonzero] - actual[nonzero]) / actual[nonzero]).mean() * 100), 2)
+                        if nonzero.any() else None,
+                'mape_forecasts': int(nonzero.sum()),
+                # Last observed month carried forward, for reference
+                'naive_mae': round(float(np.abs(naive[mask] - actual[mask]).mean()), 3) if mask.any() else None
+            })
+        return metrics
+
+    def _cost(self, folds: List[Dict[str, Any]], wall_seconds: float) -> Dict[str, Any]:
+        train_seconds = sum(fold['train_seconds'] for fold in folds)
+        inference_seconds = sum(fold['inference_seconds'] for fold in folds)
+        models = sum(fold['models'] for fold in folds)
+        return {
+            'wall_seconds': round(wall_seconds, 3),
+            'train_seconds': round(train_seconds, 3),
+            'inference_seconds': round(inference_seconds, 3),
+            'models_trained': models,
+            'train_ms_per_model': round(train_seconds * 1000 / max(models, 1), 4),
+            'inference_ms_per_forecast': round(inference_seconds * 1000 / max(models, 1), 4),
+            # Task time over wall time; the pool's speedup, less start-up and pickling
+            'parallel_speedup': round((train_seconds + inference_seconds) / max(wall_seconds, 1e-9), 2)
+        }
+
+    def _per_fold(self, folds: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        per_fold = {}
+        for fold in folds:
+            entry = per_fold.setdefault(fold['origin'], {
+                'origin': fold['origin'], 'train_rows': 0, 'models': 0, 'train_seconds': 0.0, 'inference_seconds': 0.0
+            })
+            for key in ('train_rows', 'models', 'train_seconds', 'inference_seconds'):
+                entry[key] += fold[key]
+        return [
+            {**entry, 'train_seconds': round(entry['train_seconds'], 4),
+             'inference_seconds': round(entry['inference_seconds'], 4)}
+            for entry in per_fold.values()
+        ]
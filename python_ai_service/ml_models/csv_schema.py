@@ -0,0 +1,253 @@
+import csv
+import importlib.util
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Optional speedup; imported on first use so the C engine does not pay for it
+PYARROW_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+
+# Dtypes a column is parsed as; 'int' columns are read as floats and narrowed
+# to int64 when every value is whole, which is what type inference gives
+PARSE_DTYPES = {'str': object, 'float': 'float64', 'int': 'float64', 'bool': 'bool'}
+ARROW_TYPES = {'str': 'string', 'date': 'string', 'float': 'float64', 'int': 'float64', 'bool': 'bool'}
+
+# pandas' default missing-value markers, so both engines agree on what is NA
+NA_VALUES = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+             '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null']
+
+
+class CsvSchema:
+    """Declared layout of one kind of source CSV.
+
+    `columns` maps each expected header to its type ('str', 'float', 'int',
+    'bool' or 'date'); 'date' columns are parsed with `date_format`.
+    `domains` lists the allowed values of categorical columns. A file whose
+    header lacks any declared column is not parsed with this schema.
+    """
+
+    def __init__(self, name: str, columns: Dict[str, str], date_format: str = 'ISO8601',
+                 domains: Optional[Dict[str, set]] = None):
+        self.name = name
+        self.columns = columns
+        self.date_format = date_format
+        self.domains = domains or {}
+
+    def matches(self, header: List[str]) -> bool:
+        return set(self.columns) <= set(header)
+
+    def dtypes(self, as_text: Tuple[str, ...] = ()) -> Dict[str, Any]:
+        return {
+            column: object if column in as_text or kind == 'date' else PARSE_DTYPES[kind]
+            for column, kind in self.columns.items()
+        }
+
+    def arrow_types(self, as_text: Tuple[str, ...] = ()) -> Dict[str, Any]:
+        import pyarrow as pa
+        return {
+            column: pa.string() if column in as_text else pa.type_for_alias(ARROW_TYPES[kind])
+            for column, kind in self.columns.items()
+        }
+
+
+HEALTH_RECORD_COLUMNS = {
+    'Record_ID': 'str',
+    'Submission_Date': 'str',
+    'Submission_Time': 'str',
+    'ASHA_ID': 'str',
+    'Location_ID': 'str',
+    'Patient_ID': 'str',
+    'Age_Group': 'str',
+    'Gender': 'str',
+    'Symptoms': 'str',
+    'Diagnosis_Syndrome': 'str',
+    'Dehydration_Status': 'str',
+    'Outcome': 'str',
+}
+
+HEALTH_RECORD_SCHEMA = CsvSchema('health_record', HEALTH_RECORD_COLUMNS, domains={
+    'Age_Group': {'<5', '5-14', '15-45', '46-60', '>60'},
+    'Gender': {'M', 'F'},
+    # 'None' is read as missing, as pandas always has
+    'Dehydration_Status': {'Some', 'Severe'},
+    'Outcome': {'Recovered', 'Referred', 'Under Treatment'},
+})
+
+RAINFALL_SCHEMA = CsvSchema('rainfall', {
+    'Record_ID': 'str',
+    'Submission_Date': 'str',
+    'Location_ID': 'str',
+    'Rainfall_mm': 'float',
+    'Diagnosis_Syndrome': 'str',
+    'Symptoms': 'str',
+})
+
+WATER_QUALITY_SCHEMA = CsvSchema('water_quality', {
+    'Water_Test_ID': 'str',
+    'Location_ID': 'str',
+    'Test_Date': 'str',
+    'Source_Type': 'str',
+    'pH': 'float',
+    'Turbidity_NTU': 'float',
+    'TDS_mgL': 'float',
+    'Hardness_mgL': 'float',
+    'Chloride_mgL': 'float',
+    'Nitrate_mgL': 'float',
+    'Arsenic_mgL': 'float',
+    'Fluoride_mgL': 'float',
+    'Ecoli_Presence': 'bool',
+    'Test_By': 'str',
+}, domains={
+    'Test_By': {'IoT_Sensor', 'ASHA_Worker'},
+})
+
+# Files already in the standardized layout (see COLUMN_MAPPING); only the
+# core columns are required, the rest are typed when present
+CASE_REPORT_SCHEMA = CsvSchema('case_report', {
+    'District': 'str',
+    'Disease': 'str',
+    'Cases': 'int',
+    'Date': 'date',
+})
+CASE_REPORT_OPTIONAL = {
+    'Temperature': 'float',
+    'Humidity': 'float',
+    'Rainfall': 'float',
+    'Water Quality': 'float',
+    'Population Density': 'float',
+    'Vaccination Rate': 'float',
+    'Risk Level': 'str',
+}
+
+# Source file -> schemas tried in order against its header
+SOURCE_SCHEMAS = {
+    "hyper_realistic_health_data.csv": [HEALTH_RECORD_SCHEMA, CASE_REPORT_SCHEMA],
+    "monsoon_jun-jul2024.csv": [HEALTH_RECORD_SCHEMA, CASE_REPORT_SCHEMA],
+    "postmonsoon_aug-oct2024.csv": [HEALTH_RECORD_SCHEMA, CASE_REPORT_SCHEMA],
+    "pre_monsoon_health_data_1000.csv": [HEALTH_RECORD_SCHEMA, CASE_REPORT_SCHEMA],
+    "winter_health_data_1000.csv": [HEALTH_RECORD_SCHEMA, CASE_REPORT_SCHEMA],
+    "winter_health_data_Nov-Jan.csv": [HEALTH_RECORD_SCHEMA, CASE_REPORT_SCHEMA],
+    "rainfall_health_data_2024-2025.csv": [RAINFALL_SCHEMA, CASE_REPORT_SCHEMA],
+    "water_quality_report_2024-2025.csv": [WATER_QUALITY_SCHEMA, CASE_REPORT_SCHEMA],
+}
+
+
+def resolve_engine(engine: Optional[str]) -> str:
+    """'auto' picks pyarrow when it is installed, the C parser otherwise"""
+    if engine in (None, '', 'auto'):
+        return 'pyarrow' if PYARROW_AVAILABLE else 'c'
+    if engine == 'pyarrow' and not PYARROW_AVAILABLE:
+        logger.warning("pyarrow is not installed, parsing CSV files with the C engine")
+        return 'c'
+    return engine
+
+
+def read_csv_with_schema(path: Path, schemas: List[CsvSchema],
+                         engine: str = 'c') -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Parse a CSV in one typed pass and drop rows that break its schema.
+
+    Returns the frame and a report with the schema used, row counts and the
+    reasons rows were rejected. Files matching none of the schemas are read
+    with type inference, as before schemas existed.
+    """
+    with open(path, newline='', encoding='utf-8') as f:
+        header = next(csv.reader(f), [])
+    schema = next((schema for schema in schemas if schema.matches(header)), None)
+
+    if schema is None:
+        logger.warning(f"{path.name} matches no declared schema, parsing with type inference")
+        df = pd.read_csv(path)
+        return df, {'schema': None, 'engine': 'c', 'rows': len(df), 'rejected': 0, 'reasons': {}}
+
+    if schema is CASE_REPORT_SCHEMA:
+        schema = CsvSchema(schema.name, {
+            **schema.columns,
+            **{column: kind for column, kind in CASE_REPORT_OPTIONAL.items() if column in header}
+        }, schema.date_format, schema.domains)
+
+    numeric = tuple(column for column, kind in schema.columns.items() if kind in ('float', 'int', 'bool'))
+    try:
+        df = _parse(path, schema, engine)
+        as_text = ()
+    except (ValueError, TypeError):
+        # A value that is not a number: read those columns as text and reject the rows
+        as_text = numeric
+        df = _parse(path, schema, engine, as_text)
+
+    rejected = pd.Series(False, index=df.index)
+    reasons = {}
+
+    def reject(column: str, mask: pd.Series, reason: str):
+        nonlocal rejected
+        count = int((mask & ~rejected).sum())
+        if count:
+            reasons[f"{column}: {reason}"] = count
+            rejected = rejected | mask
+
+    for column in as_text:
+        raw = df[column]
+        if schema.columns[column] == 'bool':
+            parsed = raw.map({'True': True, 'False': False, 'true': True, 'false': False})
+        else:
+            parsed = pd.to_numeric(raw, errors='coerce')
+        reject(column, raw.notna() & parsed.isna(), f"not a {schema.columns[column]}")
+        df[column] = parsed
+
+    for column, kind in schema.columns.items():
+        if kind == 'date':
+            parsed = pd.to_datetime(df[column], format=schema.date_format, errors='coerce')
+            reject(column, df[column].notna() & parsed.isna(), f"not a {schema.date_format} date")
+            df[column] = parsed
+
+    for column, domain in schema.domains.items():
+        reject(column, df[column].notna() & ~df[column].isin(domain), "outside the declared domain")
+
+    if rejected.any():
+        df = df[~rejected].reset_index(drop=True)
+    for column in as_text:
+        if schema.columns[column] == 'bool' and df[column].notna().all():
+            df[column] = df[column].astype('bool')
+
+    for column, kind in schema.columns.items():
+        # Whole-number columns without gaps come back as int64, as inference gives
+        if kind == 'int' and df[column].notna().all() and np.all(np.mod(df[column].to_numpy(), 1) == 0):
+            df[column] = df[column].astype('int64')
+
+    return df, {
+        'schema': schema.name,
+        'engine': engine,
+        'rows': len(df),
+        'rejected': int(rejected.sum()),
+        'reasons': reasons
+    }
+
+
+def _parse(path: Path, schema: CsvSchema, engine: str, as_text: Tuple[str, ...] = ()) -> pd.DataFrame:
+    if engine == 'pyarrow':
+        return _parse_arrow(path, schema, as_text)
+    return pd.read_csv(path, dtype=schema.dtypes(as_text), engine='c')
+
+
+def _parse_arrow(path: Path, schema: CsvSchema, as_text: Tuple[str, ...]) -> pd.DataFrame:
+    """Parse with pyarrow's multithreaded reader, declared columns typed up front"""
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    table = pa_csv.read_csv(path, convert_options=pa_csv.ConvertOptions(
+        column_types=schema.arrow_types(as_text),
+        null_values=NA_VALUES,
+        strings_can_be_null=True,
+        true_values=['True', 'TRUE', 'true'],
+        false_values=['False', 'FALSE', 'false']
+    ))
+    df = table.to_pandas()
+    for column, field in zip(table.column_names, table.schema):
+        if pa.types.is_string(field.type) and table.column(column).null_count:
+            # Missing strings come back as None; the C parser gives NaN
+            df[column] = df[column].where(df[column].notna(), np.nan)
+    return df
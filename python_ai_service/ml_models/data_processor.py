@@ -2,120 +2,144 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import os
+import hashlib
+import threading
+
+from .metrics import REGISTRY, stage_timer
+from .csv_schema import PYARROW_AVAILABLE, SOURCE_SCHEMAS, read_csv_with_schema, resolve_engine
+from .data_summary import DataSummary, chain_fingerprint, frame_fingerprint
+from .history_store import HistoryStore
+from .rollup_cube import RollupCube
 
 logger = logging.getLogger(__name__)
 
+CSV_FILE_RECORDS = REGISTRY.gauge('csv_file_records', 'Records loaded from each CSV file', ('file',))
+CSV_FILE_REJECTED = REGISTRY.gauge('csv_file_rejected_rows', 'Rows of each CSV file that failed its schema', ('file',))
+
+# Raw CSV headers -> standardized column names
+COLUMN_MAPPING = {
+    'District': 'district',
+    'Disease': 'disease', 
+    'Cases': 'cases',
+    'Temperature': 'temperature',
+    'Humidity': 'humidity',
+    'Rainfall': 'rainfall',
+    'Water Quality': 'water_quality',
+    'Population Density': 'population_density',
+    'Vaccination Rate': 'vaccination_rate',
+    'Date': 'date',
+    'Risk Level': 'risk_level'
+}
+
+NUMERIC_COLUMNS = ['cases', 'temperature', 'humidity', 'rainfall', 'water_quality', 'population_density', 'vaccination_rate']
+
 class DataProcessor:
-    def __init__(self):
+    def __init__(self, csv_dir: Optional[Path] = None, csv_engine: str = 'auto',
+                 history_dir: Optional[Path] = None, partition_history_by_district: bool = False):
+        # CSV files live in the repository's "New folder" unless overridden
+        self.csv_dir = Path(csv_dir) if csv_dir is not None else Path(__file__).parent.parent.parent / "New folder"
         self.csv_data = None
         self.processed_data = None
         self.csv_files_info = {}
+        # 'c', 'pyarrow', or 'auto' for pyarrow when installed
+        self.csv_engine = csv_engine
+        self.parse_report = {}
+        # District -> row positions in csv_data, kept current by load and append
+        self.district_index = {}
+        # Content hash and running column summaries of csv_data, likewise
+        self.fingerprint = None
+        self.summary = DataSummary()
+        # Week/month/season aggregates per district and disease, for /analytics;
+        # None until get_rollups builds them from csv_data
+        self.rollups = None
+        self._rollups_lock = threading.Lock()
+        # Month-partitioned parquet copy of csv_data for windowed reads
+        self.history = None
+        if history_dir is not None:
+            if PYARROW_AVAILABLE:
+                self.history = HistoryStore(history_dir, partition_by_district=partition_history_by_district)
+            else:
+                logger.warning("pyarrow is not installed, date-range reads will scan the data in memory")
         
     def load_csv_data(self) -> pd.DataFrame:
         """Load and combine all CSV files"""
         try:
-            # Get the path to CSV files (assuming they're in the parent directory)
-            csv_dir = Path(__file__).parent.parent.parent / "New folder"
+            csv_dir = self.csv_dir
             
             if not csv_dir.exists():
                 logger.warning(f"CSV directory not found: {csv_dir}")
-                return self._generate_sample_data()
+                return self._load_sample_data()
             
             all_dataframes = []
+            self.parse_report = {}
+            # Fingerprint of the source bytes, far cheaper than hashing the frame
+            source_digest = hashlib.blake2b(digest_size=16)
+            engine = resolve_engine(self.csv_engine)
             
-            # Load health data CSV files
-            health_files = [
-                "hyper_realistic_health_data.csv",
-                "monsoon_jun-jul2024.csv", 
-                "postmonsoon_aug-oct2024.csv",
-                "pre_monsoon_health_data_1000.csv",
-                "winter_health_data_1000.csv",
-                "winter_health_data_Nov-Jan.csv"
-            ]
-            
-            for file_name in health_files:
+            # Health records, then rainfall and water quality data, each
+            # parsed against its declared schema
+            for file_name, schemas in SOURCE_SCHEMAS.items():
                 file_path = csv_dir / file_name
                 if file_path.exists():
                     try:
-                        df = pd.read_csv(file_path)
-                        df['source_file'] = file_name
-                        all_dataframes.append(df)
-                        self.csv_files_info[file_name] = len(df)
-                        logger.info(f"Loaded {file_name}: {len(df)} records")
-                    except Exception as e:
-                        logger.error(f"Error loading {file_name}: {str(e)}")
-            
-            # Load environmental data
-            env_files = [
-                "rainfall_health_data_2024-2025.csv",
-                "water_quality_report_2024-2025.csv"
-            ]
-            
-            for file_name in env_files:
-                file_path = csv_dir / file_name
-                if file_path.exists():
-                    try:
-                        df = pd.read_csv(file_path)
+                        with stage_timer('csv_read'):
+                            df, report = read_csv_with_schema(file_path, schemas, engine)
+                        source_digest.update(file_name.encode('utf-8') + b'\0' + file_path.read_bytes())
                         df['source_file'] = file_name
                         all_dataframes.append(df)
                         self.csv_files_info[file_name] = len(df)
+                        self.parse_report[file_name] = report
+                        CSV_FILE_RECORDS.set(len(df), file_name)
+                        CSV_FILE_REJECTED.set(report['rejected'], file_name)
+                        if report['rejected']:
+                            logger.warning(f"Rejected {report['rejected']} rows of {file_name}: {report['reasons']}")
                         logger.info(f"Loaded {file_name}: {len(df)} records")
                     except Exception as e:
                         logger.error(f"Error loading {file_name}: {str(e)}")
             
             if not all_dataframes:
                 logger.warning("No CSV files found, generating sample data")
-                return self._generate_sample_data()
+                return self._load_sample_data()
             
             # Combine all dataframes
             self.csv_data = pd.concat(all_dataframes, ignore_index=True)
             
             # Clean and standardize data
-            self.csv_data = self._clean_data(self.csv_data)
+            with stage_timer('clean_data'):
+                self.csv_data = self._clean_data(self.csv_data)
+            self._build_indexes()
+            self._summarize(source_digest.hexdigest())
+            self._write_history()
             
             logger.info(f"Total records loaded: {len(self.csv_data)}")
             return self.csv_data
             
         except Exception as e:
             logger.error(f"Error loading CSV data: {str(e)}")
-            return self._generate_sample_data()
+            return self._load_sample_data()
     
     def _clean_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """Clean and standardize the data"""
         try:
             # Standardize column names
-            column_mapping = {
-                'District': 'district',
-                'Disease': 'disease', 
-                'Cases': 'cases',
-                'Temperature': 'temperature',
-                'Humidity': 'humidity',
-                'Rainfall': 'rainfall',
-                'Water Quality': 'water_quality',
-                'Population Density': 'population_density',
-                'Vaccination Rate': 'vaccination_rate',
-                'Date': 'date',
-                'Risk Level': 'risk_level'
-            }
-            
-            df = df.rename(columns=column_mapping)
+            df = df.rename(columns=COLUMN_MAPPING, copy=False)
             
-            # Convert date columns
+            # Convert date columns; schema-parsed ones are already datetimes
             date_columns = ['date', 'Date', 'created_at', 'timestamp']
             for col in date_columns:
-                if col in df.columns:
+                if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
                     try:
                         df[col] = pd.to_datetime(df[col], errors='coerce')
                     except:
                         pass
             
             # Fill missing values
-            numeric_columns = ['cases', 'temperature', 'humidity', 'rainfall', 'water_quality', 'population_density', 'vaccination_rate']
-            for col in numeric_columns:
+            for col in NUMERIC_COLUMNS:
                 if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
+                    if not pd.api.types.is_numeric_dtype(df[col]):
+                        df[col] = pd.to_numeric(df[col], errors='coerce')
                     df[col] = df[col].fillna(df[col].median())
             
             # Standardize district names
@@ -132,6 +156,14 @@ class DataProcessor:
             logger.error(f"Error cleaning data: {str(e)}")
             return df
     
+    def _load_sample_data(self) -> pd.DataFrame:
+        """Use generated sample data as the dataset"""
+        self.csv_data = self._generate_sample_data()
+        self._build_indexes()
+        self._summarize(frame_fingerprint(self.csv_data))
+        self._write_history()
+        return self.csv_data
+    
     def _generate_sample_data(self) -> pd.DataFrame:
         """Generate sample data if CSV files are not available"""
         logger.info("Generating sample data...")
@@ -157,12 +189,153 @@ class DataProcessor:
         
         return pd.DataFrame(sample_data)
     
+    def append_records(self, records: pd.DataFrame) -> pd.DataFrame:
+        """Clean newly arrived records and append them to the dataset
+        
+        The combined frame is built first and swapped in with one assignment,
+        so readers see either the old or the new dataset. Returns the cleaned
+        records.
+        """
+        with stage_timer('clean_data'):
+            records = self._clean_data(records.copy())
+        if 'source_file' not in records.columns:
+            records['source_file'] = 'ingest'
+        
+        if self.csv_data is None or self.csv_data.empty:
+            combined = records.reset_index(drop=True)
+        else:
+            combined = pd.concat([self.csv_data, records], ignore_index=True)
+        
+        offset = len(combined) - len(records)
+        index = {district: positions.copy() for district, positions in self.district_index.items()}
+        if 'district' in records.columns:
+            for district, positions in records.reset_index(drop=True).groupby('district', sort=False).indices.items():
+                positions = positions + offset
+                index[district] = np.concatenate([index[district], positions]) if district in index else positions
+        
+        with self._rollups_lock:
+            # A cube built from the combined frame must not get the batch twice
+            self.csv_data = combined
+            if self.rollups is not None:
+                with stage_timer('rollup_cube'):
+                    self.rollups.add(records)
+        self.district_index = index
+        self.fingerprint = chain_fingerprint(self.fingerprint, records)
+        self.summary = self.summary.merge(DataSummary.from_frame(records, NUMERIC_COLUMNS))
+        if self.history is not None and self.history.current:
+            try:
+                with stage_timer('history_write'):
+                    self.history.append(records, self.fingerprint)
+            except Exception as e:
+                logger.error(f"Error appending to the history store, reading from memory until the next load: {str(e)}")
+        self.csv_files_info['ingest'] = self.csv_files_info.get('ingest', 0) + len(records)
+        return records
+    
+    def _build_indexes(self):
+        if self.csv_data is not None and 'district' in self.csv_data.columns:
+            self.district_index = dict(self.csv_data.groupby('district', sort=False).indices)
+        else:
+            self.district_index = {}
+        with self._rollups_lock:
+            self.rollups = None
+    
+    def get_rollups(self) -> RollupCube:
+        """The rollup cube, built from csv_data on first use after a load
+        
+        Loads that never serve /analytics skip the build; once built, the
+        cube is kept current by append_records.
+        """
+        if self.csv_data is None:
+            self.load_csv_data()
+        
+        with self._rollups_lock:
+            if self.rollups is None:
+                with stage_timer('rollup_cube'):
+                    self.rollups = RollupCube.from_frame(self.csv_data)
+            return self.rollups
+    
+    def _summarize(self, fingerprint: str):
+        with stage_timer('summarize_data'):
+            self.fingerprint = fingerprint
+            self.summary = DataSummary.from_frame(self.csv_data, NUMERIC_COLUMNS)
+    
+    def _write_history(self):
+        if self.history is None:
+            return
+        if 'date' not in self.csv_data.columns:
+            # Partitions are by month, so undated data is served from memory
+            self.history.current = False
+            logger.info("Data has no date column, not writing the history store")
+            return
+        try:
+            with stage_timer('history_write'):
+                self.history.write(self.csv_data, self.fingerprint)
+        except Exception as e:
+            logger.error(f"Error writing the history store, reading from memory instead: {str(e)}")
+    
+    def read_history(self, start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None,
+                     districts: Optional[List[str]] = None, diseases: Optional[List[str]] = None,
+                     columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Records dated within [start, end] for the given districts and diseases, oldest first
+        
+        Served from the history store's partitions when it is current, from
+        csv_data otherwise.
+        """
+        if self.csv_data is None:
+            self.load_csv_data()
+        
+        with stage_timer('history_read'):
+            if self.history is not None and self.history.current:
+                return self.history.read(start, end, districts, diseases, columns)
+            
+            if districts is not None:
+                positions = [self.district_index[district] for district in districts if district in self.district_index]
+                df = self.csv_data.iloc[np.sort(np.concatenate(positions)) if positions else []]
+            else:
+                df = self.csv_data
+            mask = np.ones(len(df), dtype=bool)
+            if 'date' in df.columns:
+                if start is not None:
+                    mask &= (df['date'] >= pd.Timestamp(start)).to_numpy()
+                if end is not None:
+                    mask &= (df['date'] <= pd.Timestamp(end)).to_numpy()
+            if diseases is not None and 'disease' in df.columns:
+                mask &= df['disease'].isin(diseases).to_numpy()
+            if columns is not None:
+                df = df[[column for column in columns if column in df.columns]]
+            df = df[mask]
+            if 'date' in df.columns:
+                df = df.sort_values('date', kind='stable', ignore_index=True)
+            return df.copy()
+    
+    def get_recent_district_data(self, district: str, months: int = 6,
+                                 columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """A district's records from the `months` months up to the newest record
+        
+        The window ends at the newest record rather than today, so data that
+        has stopped updating still has a recent window.
+        """
+        if self.csv_data is None:
+            self.load_csv_data()
+        
+        if self.history is not None and self.history.current:
+            latest = self.history.latest_date()
+        elif 'date' in self.csv_data.columns:
+            latest = self.csv_data['date'].max()
+        else:
+            latest = None
+        if latest is None or pd.isna(latest):
+            return self.read_history(districts=[district], columns=columns)
+        return self.read_history(latest - pd.DateOffset(months=months), latest, [district], columns=columns)
+    
     def get_district_data(self, district: str) -> pd.DataFrame:
         """Get data for a specific district"""
         if self.csv_data is None:
             self.load_csv_data()
         
-        return self.csv_data[self.csv_data['district'] == district].copy()
+        if 'district' not in self.csv_data.columns:
+            return self.csv_data.iloc[0:0].copy()
+        return self.csv_data.iloc[self.district_index.get(district, np.array([], dtype=np.int64))].copy()
     
     def get_disease_data(self, disease: str) -> pd.DataFrame:
         """Get data for a specific disease"""
@@ -199,6 +372,10 @@ class DataProcessor:
         """Get information about loaded CSV files"""
         return self.csv_files_info.copy()
     
+    def get_parse_report(self) -> Dict[str, Dict[str, Any]]:
+        """Schema, parser engine and rejected row counts per CSV file"""
+        return {file_name: dict(report) for file_name, report in self.parse_report.items()}
+    
     def get_data_summary(self) -> Dict[str, Any]:
         """Get summary statistics of the data"""
         if self.csv_data is None:
@@ -212,5 +389,6 @@ class DataProcessor:
                 'start': self.csv_data['date'].min().isoformat() if 'date' in self.csv_data.columns else None,
                 'end': self.csv_data['date'].max().isoformat() if 'date' in self.csv_data.columns else None
             },
-            'csv_files': self.csv_files_info
+            'csv_files': self.csv_files_info,
+            'parse_report': self.get_parse_report()
         }
@@ -0,0 +1,190 @@
+import hashlib
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Probabilities the quantile sketch is kept at (percentiles)
+SKETCH_PROBS = np.linspace(0, 1, 101)
+
+# Reference bins for PSI; empty bins are floored so the log stays finite
+PSI_BINS = 10
+PSI_EPSILON = 1e-4
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """Content hash of a frame: column names, dtypes and every value"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update('|'.join(f"{column}:{dtype}" for column, dtype in df.dtypes.items()).encode('utf-8'))
+    if len(df):
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def chain_fingerprint(previous: Optional[str], df: pd.DataFrame) -> str:
+    """Fingerprint after appending `df` to data fingerprinted as `previous`"""
+    return hashlib.blake2b(f"{previous}|{frame_fingerprint(df)}".encode('utf-8'), digest_size=16).hexdigest()
+
+
+class ColumnSummary:
+    """Count, mean, variance, range and a percentile sketch of one numeric column.
+
+    Summaries merge without the underlying values: moments combine exactly
+    (Chan et al.) and sketches combine through their mixture CDF, so a
+    summary can be kept current as batches are appended.
+    """
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0,
+                 quantiles: Optional[np.ndarray] = None):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.quantiles = quantiles
+
+    @classmethod
+    def from_values(cls, values: np.ndarray) -> 'ColumnSummary':
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return cls()
+        return cls(len(values), float(values.mean()), float(((values - values.mean()) ** 2).sum()),
+                   np.quantile(values, SKETCH_PROBS))
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def cdf(self, x: np.ndarray) -> np.ndarray:
+        """Approximate CDF from the sketch, by linear interpolation"""
+        quantiles, probs = np.unique(self.quantiles, return_index=True)
+        # Ties collapse to their highest probability, so steps stay steps
+        probs = np.append(SKETCH_PROBS[probs[1:] - 1], 1.0)
+        return np.interp(x, quantiles, probs, left=0.0, right=1.0)
+
+    def merge(self, other: 'ColumnSummary') -> 'ColumnSummary':
+        if not other.count:
+            return self
+        if not self.count:
+            return other
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        mean = self.mean + delta * other.count / count
+        m2 = self.m2 + other.m2 + delta ** 2 * self.count * other.count / count
+
+        grid = np.union1d(self.quantiles, other.quantiles)
+        mixture = (self.count * self.cdf(grid) + other.count * other.cdf(grid)) / count
+        quantiles = np.interp(SKETCH_PROBS, mixture, grid)
+        return ColumnSummary(count, mean, m2, quantiles)
+
+    def to_dict(self) -> Dict[str, Any]:
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'mean': round(self.mean, 4),
+            'variance': round(self.variance, 4),
+            'min': round(float(self.quantiles[0]), 4),
+            'p50': round(float(self.quantiles[50]), 4),
+            'max': round(float(self.quantiles[-1]), 4),
+        }
+
+
+class DataSummary:
+    """Running summaries of a dataset: numeric columns plus category counts"""
+
+    def __init__(self, rows: int = 0, columns: Optional[Dict[str, ColumnSummary]] = None,
+                 categories: Optional[Dict[str, Dict[str, int]]] = None):
+        self.rows = rows
+        self.columns = columns or {}
+        self.categories = categories or {}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, numeric_columns: Iterable[str],
+                   category_columns: Iterable[str] = ('district', 'disease')) -> 'DataSummary':
+        columns = {
+            column: ColumnSummary.from_values(pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float))
+            for column in numeric_columns if column in df.columns
+        }
+        categories = {
+            column: {str(key): int(count) for key, count in df[column].value_counts().items()}
+            for column in category_columns if column in df.columns
+        }
+        return cls(len(df), columns, categories)
+
+    def merge(self, other: 'DataSummary') -> 'DataSummary':
+        columns = dict(self.columns)
+        for column, summary in other.columns.items():
+            columns[column] = columns[column].merge(summary) if column in columns else summary
+        categories = {column: dict(counts) for column, counts in self.categories.items()}
+        for column, counts in other.categories.items():
+            merged = categories.setdefault(column, {})
+            for key, count in counts.items():
+                merged[key] = merged.get(key, 0) + count
+        return DataSummary(self.rows + other.rows, columns, categories)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'rows': self.rows,
+            'columns': {column: summary.to_dict() for column, summary in self.columns.items()},
+            'categories': {column: len(counts) for column, counts in self.categories.items()}
+        }
+
+
+def _psi(expected: np.ndarray, actual: np.ndarray) -> float:
+    expected = np.maximum(expected, PSI_EPSILON)
+    actual = np.maximum(actual, PSI_EPSILON)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def column_drift(reference: ColumnSummary, current: ColumnSummary) -> Dict[str, float]:
+    """PSI over the reference's deciles and KS distance between two sketches"""
+    grid = np.union1d(reference.quantiles, current.quantiles)
+    ks = float(np.max(np.abs(reference.cdf(grid) - current.cdf(grid))))
+
+    edges = np.unique(reference.quantiles[::len(SKETCH_PROBS) // PSI_BINS])
+    bins_reference = np.diff(np.concatenate([[0.0], reference.cdf(edges[1:-1]), [1.0]]))
+    bins_current = np.diff(np.concatenate([[0.0], current.cdf(edges[1:-1]), [1.0]]))
+    return {'psi': round(_psi(bins_reference, bins_current), 4), 'ks': round(ks, 4)}
+
+
+def category_drift(reference: Dict[str, int], current: Dict[str, int]) -> Dict[str, Any]:
+    """PSI between category shares; categories new since the reference are listed"""
+    keys = sorted(set(reference) | set(current))
+    expected = np.array([reference.get(key, 0) for key in keys], dtype=float)
+    actual = np.array([current.get(key, 0) for key in keys], dtype=float)
+    return {
+        'psi': round(_psi(expected / max(expected.sum(), 1), actual / max(actual.sum(), 1)), 4),
+        'new': [key for key in keys if key not in reference][:20]
+    }
+
+
+def drift_report(reference: DataSummary, current: DataSummary, feature_columns: List[str],
+                 psi_threshold: float, ks_threshold: float) -> Dict[str, Any]:
+    """Drift of each feature column and category between two summaries
+
+    `drifted` lists what crossed a threshold: PSI or KS for numeric feature
+    columns, PSI for category shares.
+    """
+    features, drifted = {}, []
+    for column in feature_columns:
+        before, after = reference.columns.get(column), current.columns.get(column)
+        if before is None or after is None or not before.count or not after.count:
+            continue
+        features[column] = column_drift(before, after)
+        if features[column]['psi'] > psi_threshold or features[column]['ks'] > ks_threshold:
+            drifted.append(column)
+
+    categories = {}
+    for column, counts in current.categories.items():
+        categories[column] = category_drift(reference.categories.get(column, {}), counts)
+        if categories[column]['psi'] > psi_threshold:
+            drifted.append(column)
+
+    return {
+        'features': features,
+        'categories': categories,
+        'drifted': drifted,
+        'thresholds': {'psi': psi_threshold, 'ks': ks_threshold}
+    }
@@ -10,10 +10,17 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 import os
 
+from .metrics import stage_timer
+
 logger = logging.getLogger(__name__)
 
 class DiseasePredictor:
-    def __init__(self):
+    def __init__(self, data_processor=None):
+        # DataProcessor serving each district's recent records; synthetic without one
+        self.data_processor = data_processor
+        # Last model predictions per district and disease, with when they were
+        # made; served marked stale when a fresh prediction cannot be made
+        self.materialized = {}
         self.models = {}
         self.scalers = {}
         self.label_encoders = {}
@@ -29,7 +36,8 @@ class DiseasePredictor:
             logger.info("Training disease prediction models...")
             
             # Prepare training data
-            X, y = self._prepare_training_data(data)
+            with stage_timer('prepare_training_data'):
+                X, y = self._prepare_training_data(data)
             
             if X.empty or y.empty:
                 logger.warning("No training data available")
@@ -52,7 +60,8 @@ class DiseasePredictor:
                 random_state=42,
                 class_weight='balanced'
             )
-            rf_model.fit(X_train_scaled, y_train)
+            with stage_timer('rf_fit'):
+                rf_model.fit(X_train_scaled, y_train)
             
             # Train Gradient Boosting
             gb_model = GradientBoostingClassifier(
@@ -61,7 +70,8 @@ class DiseasePredictor:
                 max_depth=6,
                 random_state=42
             )
-            gb_model.fit(X_train_scaled, y_train)
+            with stage_timer('gb_fit'):
+                gb_model.fit(X_train_scaled, y_train)
             
             # Evaluate models
             rf_score = accuracy_score(y_test, rf_model.predict(X_test_scaled))
@@ -172,21 +182,24 @@ class DiseasePredictor:
                 if disease_data.empty:
                     continue
                 
-                # Get latest environmental and population data
-                latest_data = disease_data.iloc[-1]
+                # Get latest environmental and population data; partial
+                # ingested records carry the last known values forward
+                latest_data = disease_data.ffill().iloc[-1]
                 
                 # Prepare features for prediction
-                features = self._prepare_prediction_features(latest_data)
+                with stage_timer('feature_prep'):
+                    features = self._prepare_prediction_features(latest_data)
                 
                 if features is None:
                     continue
                 
                 # Make prediction
-                features_scaled = self.scalers['main'].transform([features])
-                
-                # Use ensemble prediction
-                rf_pred = self.models['random_forest'].predict_proba(features_scaled)[0]
-                gb_pred = self.models['gradient_boosting'].predict_proba(features_scaled)[0]
+                with stage_timer('predict_proba'):
+                    features_scaled = self.scalers['main'].transform([features])
+                    
+                    # Use ensemble prediction
+                    rf_pred = self.models['random_forest'].predict_proba(features_scaled)[0]
+                    gb_pred = self.models['gradient_boosting'].predict_proba(features_scaled)[0]
                 
                 # Average predictions
                 ensemble_pred = (rf_pred + gb_pred) / 2
@@ -198,6 +211,10 @@ class DiseasePredictor:
                 probability = float(ensemble_pred[risk_idx])
                 confidence = float(np.max(ensemble_pred))
                 
+                with stage_timer('factor_generation'):
+                    factors = self._generate_factors(latest_data, risk_level)
+                    recommendations = self._generate_recommendations(dis, risk_level, latest_data)
+                
                 # Generate prediction details
                 prediction = {
                     'district': district,
@@ -206,7 +223,7 @@ class DiseasePredictor:
                     'probability': probability,
                     'confidence': confidence,
                     'timeframe': f"{timeframe_days} days",
-                    'factors': self._generate_factors(latest_data, risk_level),
+                    'factors': factors,
                     'environmental_data': {
                         'temperature': float(latest_data.get('temperature', 25)),
                         'humidity': float(latest_data.get('humidity', 60)),
@@ -219,21 +236,44 @@ class DiseasePredictor:
                         'mobility': float(np.random.uniform(0.4, 0.8))  # Synthetic mobility data
                     },
                     'historical_trend': self._generate_historical_trend(disease_data),
-                    'recommendations': self._generate_recommendations(dis, risk_level, latest_data)
+                    'recommendations': recommendations
                 }
                 
                 predictions.append(prediction)
             
+            self._materialize(district, predictions)
             return predictions
             
         except Exception as e:
             logger.error(f"Error generating predictions: {str(e)}")
-            return self._generate_mock_predictions(district, disease, timeframe_days)
+            stale = self.stale_predictions(district, disease)
+            return stale if stale else self._generate_mock_predictions(district, disease, timeframe_days)
+    
+    def _materialize(self, district: str, predictions: List[Dict[str, Any]]):
+        materialized_at = datetime.now().isoformat()
+        # Swapped in whole so concurrent readers never see a partial update
+        entries = dict(self.materialized.get(district, {}))
+        for prediction in predictions:
+            entries[prediction['disease']] = (prediction, materialized_at)
+        self.materialized[district] = entries
+    
+    def stale_predictions(self, district: str, disease: Optional[str] = None) -> List[Dict[str, Any]]:
+        """The last model predictions for a district, marked stale; empty if there are none"""
+        entries = self.materialized.get(district, {})
+        if disease is not None:
+            entries = {disease: entries[disease]} if disease in entries else {}
+        return [
+            {**prediction, 'stale': True, 'materialized_at': materialized_at}
+            for prediction, materialized_at in entries.values()
+        ]
     
     def _get_recent_district_data(self, district: str) -> pd.DataFrame:
         """Get recent data for a district (last 6 months)"""
-        # This would typically query a database or recent CSV data
-        # For now, we'll generate synthetic recent data
+        if self.data_processor is not None:
+            columns = ['district', 'disease', 'date', 'cases'] + self.feature_columns
+            return self.data_processor.get_recent_district_data(district, months=6, columns=columns)
+        
+        # Without a data source, generate synthetic recent data
         return pd.DataFrame({
             'district': [district] * 10,
             'disease': ['Cholera', 'Dengue', 'Malaria', 'Typhoid', 'Diarrhea'] * 2,
@@ -252,7 +292,7 @@ class DiseasePredictor:
         try:
             features = []
             for col in self.feature_columns:
-                if col in data:
+                if col in data and pd.notna(data[col]):
                     features.append(float(data[col]))
                 else:
                     # Use default values if data is missing
@@ -397,5 +437,6 @@ class DiseasePredictor:
             'trained': self.is_trained_flag,
             'models': list(self.models.keys()) if self.models else [],
             'feature_columns': self.feature_columns,
-            'scalers': list(self.scalers.keys()) if self.scalers else []
+            'scalers': list(self.scalers.keys()) if self.scalers else [],
+            'materialized_districts': len(self.materialized)
         }
@@ -0,0 +1,165 @@
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from .metrics import stage_timer
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+
+# Risk level -> severity used for the neighbour-weighted risk score
+RISK_WEIGHTS = {'Low': 0.0, 'Medium': 0.5, 'High': 1.0}
+
+
+class DistrictGraph:
+    """Sparse district adjacency with distance-decay weights.
+
+    Districts are neighbours when their GADM boundaries share a vertex; the
+    edge weight is exp(-distance / decay_km) between district centroids, so
+    a long shared border with a far-away centroid counts for less. Stored as
+    a CSR matrix, so spillover over every district is one sparse product
+    whose cost grows with the number of borders, not districts squared.
+    """
+
+    def __init__(self, region_hierarchy, geojson_path: Optional[Path] = None,
+                 decay_km: float = 50.0, precision: int = 3):
+        self.region_hierarchy = region_hierarchy
+        self.geojson_path = geojson_path or region_hierarchy.geojson_path
+        self.decay_km = decay_km
+        self.precision = precision
+        self.districts = []
+        self.index = {}
+        self.centroids = np.empty((0, 2))
+        self.weights = sparse.csr_matrix((0, 0))
+        self._load()
+
+    def _load(self):
+        """Build the adjacency matrix from shared boundary vertices"""
+        try:
+            with open(self.geojson_path, encoding='utf-8') as f:
+                features = json.load(f)['features']
+
+            owners = {}
+            centroids = []
+            for feature in features:
+                district = self.region_hierarchy.canonical_district(feature['properties']['NAME_2'])
+                if district in self.index:
+                    continue
+                position = len(self.districts)
+                self.index[district] = position
+                self.districts.append(district)
+
+                points = np.array([
+                    point[:2]
+                    for polygon in self._polygons(feature['geometry'])
+                    for ring in polygon
+                    for point in ring
+                ], dtype=float)
+                centroids.append(points.mean(axis=0))
+                for vertex in set(map(tuple, np.round(points, self.precision))):
+                    owners.setdefault(vertex, set()).add(position)
+
+            self.centroids = np.array(centroids)
+            pairs = {
+                (a, b)
+                for shared in owners.values() if len(shared) > 1
+                for a in shared for b in shared if a != b
+            }
+            self.weights = self._weight_matrix(pairs)
+            logger.info(f"Built district graph: {len(self.districts)} districts, {len(pairs) // 2} borders")
+
+        except Exception as e:
+            logger.warning(f"Could not build district graph from {self.geojson_path}: {str(e)}")
+            self.weights = sparse.csr_matrix((len(self.districts), len(self.districts)))
+
+    def _polygons(self, geometry: Dict[str, Any]) -> List:
+        if geometry['type'] == 'Polygon':
+            return [geometry['coordinates']]
+        return geometry['coordinates']
+
+    def _weight_matrix(self, pairs) -> sparse.csr_matrix:
+        n = len(self.districts)
+        if not pairs:
+            return sparse.csr_matrix((n, n))
+        rows, cols = np.array(sorted(pairs)).T
+        distance = self._haversine(self.centroids[rows], self.centroids[cols])
+        return sparse.csr_matrix((np.exp(-distance / self.decay_km), (rows, cols)), shape=(n, n))
+
+    def _haversine(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """Great-circle km between (lon, lat) rows"""
+        lon1, lat1, lon2, lat2 = map(np.radians, (a[:, 0], a[:, 1], b[:, 0], b[:, 1]))
+        h = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(h))
+
+    def neighbors(self, district: str) -> List[Tuple[str, float]]:
+        """Neighbouring districts and edge weights, strongest first"""
+        position = self.index.get(self.region_hierarchy.canonical_district(district))
+        if position is None:
+            return []
+        row = self.weights.getrow(position)
+        return sorted(
+            ((self.districts[col], round(float(weight), 4)) for col, weight in zip(row.indices, row.data)),
+            key=lambda item: -item[1]
+        )
+
+    def add_spillover(self, predictions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Attach neighbour-weighted risk and case pressure to each prediction
+
+        Predictions are materialized into district x disease arrays of risk
+        score, latest cases and presence; one sparse product gives every
+        weighted neighbour sum at once. Values are averages over neighbours
+        that have a prediction for the same disease, so districts outside
+        the predicted set do not dilute the signal.
+        """
+        if not predictions:
+            return predictions
+
+        with stage_timer('spillover'):
+            diseases = {}
+            rows, cols = [], []
+            for prediction in predictions:
+                rows.append(self.index.get(self.region_hierarchy.canonical_district(prediction['district']), -1))
+                cols.append(diseases.setdefault(prediction['disease'], len(diseases)))
+            rows, cols = np.array(rows), np.array(cols)
+            known = rows >= 0
+
+            n, d = len(self.districts), len(diseases)
+            values = np.zeros((n, 3 * d))
+            values[rows[known], cols[known]] = [
+                RISK_WEIGHTS.get(str(p['risk_level']), 0.0) * float(p['probability'])
+                for p, k in zip(predictions, known) if k
+            ]
+            values[rows[known], d + cols[known]] = [
+                self._latest_cases(p) for p, k in zip(predictions, known) if k
+            ]
+            values[rows[known], 2 * d + cols[known]] = 1.0
+
+            totals = self.weights @ values
+            risk, cases, weight = totals[:, :d], totals[:, d:2 * d], totals[:, 2 * d:]
+
+            for prediction, row, col in zip(predictions, rows, cols):
+                if row < 0 or weight[row, col] == 0:
+                    prediction['spillover'] = {'risk': 0.0, 'case_pressure': 0.0}
+                    continue
+                prediction['spillover'] = {
+                    'risk': round(float(risk[row, col] / weight[row, col]), 4),
+                    'case_pressure': round(float(cases[row, col] / weight[row, col]), 2)
+                }
+
+        return predictions
+
+    def _latest_cases(self, prediction: Dict[str, Any]) -> float:
+        cases = prediction.get('historical_trend', {}).get('cases') or [0]
+        return float(cases[-1])
+
+    def get_info(self) -> Dict[str, Any]:
+        return {
+            'districts': len(self.districts),
+            'borders': int(self.weights.nnz // 2),
+            'decay_km': self.decay_km
+        }
@@ -4,18 +4,39 @@ from sklearn.linear_model import LinearRegression
 from sklearn.preprocessing import PolynomialFeatures
 from sklearn.metrics import mean_squared_error, r2_score
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator
 from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+from .metrics import stage_timer
+from .forecast_store import ForecastModelStore
+
 logger = logging.getLogger(__name__)
 
 class ForecastEngine:
-    def __init__(self):
+    def __init__(self, batched_training: bool = True, max_horizon: int = 90,
+                 interval_samples: int = 500,
+                 interval_levels: tuple = (0.8, 0.95), model_store: Optional[ForecastModelStore] = None):
         self.models = {}
         self.is_trained_flag = False
         self.forecast_data = {}
+        # With a store, models and histories are read through its LRU
+        self.model_store = model_store
+        if model_store is not None:
+            self.models = model_store.models
+            self.forecast_data = model_store.histories
+        self.batched_training = batched_training
+        self.max_horizon = max_horizon
+        self.model_version = 0
+        self.forecast_cache = {}
+        self.interval_samples = interval_samples
+        self.interval_levels = interval_levels
+        self._rng = np.random.default_rng()
+        self.feature_columns = ['month', 'temperature', 'humidity', 'rainfall', 'water_quality']
+        # Newest month passed to update_models, whose records are held until it closes
+        self.open_month = None
+        self.open_month_records = []
         
     def train_models(self, data: pd.DataFrame):
         """Train forecasting models"""
@@ -23,37 +44,133 @@ class ForecastEngine:
             logger.info("Training forecast models...")
             
             # Prepare time series data
-            time_series_data = self._prepare_time_series_data(data)
+            with stage_timer('forecast_prepare'):
+                time_series_data = self._prepare_time_series_data(data)
             
             if time_series_data.empty:
                 logger.warning("No time series data available for training")
                 return
             
-            # Train models for each district-disease combination
-            for district in time_series_data['district'].unique():
-                district_data = time_series_data[time_series_data['district'] == district]
+            # The data trained on includes whatever ingest held back for the open month
+            self.open_month = None
+            self.open_month_records = []
+            
+            if self.batched_training:
+                # Solve every district-disease regression together
+                with stage_timer('forecast_fit'):
+                    self._train_models_batched(time_series_data)
+            else:
+                # Train models for each district-disease combination
+                for district in time_series_data['district'].unique():
+                    district_data = time_series_data[time_series_data['district'] == district]
                 
-                for disease in district_data['disease'].unique():
-                    disease_data = district_data[district_data['disease'] == disease]
+                    for disease in district_data['disease'].unique():
+                        disease_data = district_data[district_data['disease'] == disease]
                     
-                    if len(disease_data) < 3:  # Need at least 3 data points
-                        continue
+                        if len(disease_data) < 3:  # Need at least 3 data points
+                            continue
                     
-                    # Train forecasting model
-                    model_key = f"{district}_{disease}"
-                    model = self._train_forecast_model(disease_data)
+                        # Train forecasting model
+                        model_key = f"{district}_{disease}"
+                        with stage_timer('forecast_fit'):
+                            model = self._train_forecast_model(disease_data)
                     
-                    if model:
-                        self.models[model_key] = model
-                        self.forecast_data[model_key] = disease_data
+                        if model:
+                            self._save_model(model_key, model, disease_data)
             
             self.is_trained_flag = len(self.models) > 0
+            self.model_version += 1
+            self.forecast_cache.clear()
             logger.info(f"Forecast models trained for {len(self.models)} district-disease combinations")
             
         except Exception as e:
             logger.error(f"Error training forecast models: {str(e)}")
             raise e
     
+    def _train_models_batched(self, time_series_data: pd.DataFrame):
+        """Fit every district-disease model at once with batched least squares.
+        
+        Reproduces the per-pair PolynomialFeatures + LinearRegression path:
+        each pair's design matrix is centered on its own means and solved for
+        the minimum-norm least-squares coefficients. Pairs are bucketed by
+        series length so each bucket is a single stacked pseudo-inverse, which
+        keeps the cost proportional to the total number of rows.
+        """
+        codes = time_series_data.groupby(['district', 'disease'], sort=False).ngroup().to_numpy()
+        order = np.argsort(codes, kind='stable')
+        ts = time_series_data.iloc[order].reset_index(drop=True)
+        codes = codes[order]
+        
+        X = np.nan_to_num(ts[self.feature_columns].to_numpy(dtype=float), nan=0)
+        y = np.nan_to_num(ts['cases'].to_numpy(dtype=float), nan=0)
+        X_poly = self._polynomial_features(X)
+        
+        sizes = np.bincount(codes)
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        
+        # Per-pair centering, as LinearRegression does with fit_intercept=True
+        X_mean = np.add.reduceat(X_poly, starts, axis=0) / sizes[:, None]
+        y_mean = np.add.reduceat(y, starts) / sizes
+        X_centered = X_poly - X_mean[codes]
+        y_centered = y - y_mean[codes]
+        
+        coefs = np.zeros((len(sizes), X_poly.shape[1]))
+        valid = sizes >= 3  # Need at least 3 data points
+        for size in np.unique(sizes[valid]):
+            groups = np.flatnonzero(valid & (sizes == size))
+            rows = starts[groups][:, None] + np.arange(size)
+            pinv = np.linalg.pinv(X_centered[rows], rcond=np.finfo(float).eps)
+            coefs[groups] = np.einsum('gfs,gs->gf', pinv, y_centered[rows])
+        intercepts = y_mean - np.einsum('gf,gf->g', X_mean, coefs)
+        
+        # In-sample performance per pair
+        residuals = y - (np.einsum('nf,nf->n', X_poly, coefs[codes]) + intercepts[codes])
+        ss_res = np.bincount(codes, weights=residuals ** 2)
+        ss_tot = np.bincount(codes, weights=y_centered ** 2)
+        mse = ss_res / sizes
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r2 = np.where(ss_tot > 0, 1 - ss_res / ss_tot, np.where(ss_res == 0, 1.0, 0.0))
+        
+        # Trend from first-half vs second-half means, via prefix sums
+        y_cumsum = np.concatenate(([0.0], np.cumsum(y)))
+        half = sizes // 2
+        first_half = (y_cumsum[starts + half] - y_cumsum[starts]) / np.maximum(half, 1)
+        second_half = (y_cumsum[starts + sizes] - y_cumsum[starts + half]) / (sizes - half)
+        trends = np.select(
+            [second_half > first_half * 1.1, second_half < first_half * 0.9],
+            ['increasing', 'decreasing'],
+            default='stable'
+        )
+        
+        last_rows = ts.iloc[starts + sizes - 1].to_dict('records')
+        for group in np.flatnonzero(valid):
+            start, end = starts[group], starts[group] + sizes[group]
+            last_data = last_rows[group]
+            model_key = f"{last_data['district']}_{last_data['disease']}"
+            self._save_model(model_key, {
+                'coef': coefs[group],
+                'intercept': float(intercepts[group]),
+                'mse': float(mse[group]),
+                'r2': float(r2[group]),
+                'last_data': last_data,
+                'trend': str(trends[group]),
+                'residuals': residuals[start:end]
+            }, ts.iloc[start:end])
+    
+    def _save_model(self, model_key: str, model: Optional[Dict[str, Any]], history: pd.DataFrame):
+        """Store a pair's model (None while it has too little history) and its monthly history"""
+        if self.model_store is not None:
+            self.model_store.put(model_key, model, history)
+            return
+        if model is not None:
+            self.models[model_key] = model
+        self.forecast_data[model_key] = history
+    
+    def _polynomial_features(self, X: np.ndarray) -> np.ndarray:
+        """Degree-2 polynomial expansion in PolynomialFeatures column order"""
+        rows, cols = np.triu_indices(X.shape[1])
+        return np.hstack([X, X[:, rows] * X[:, cols]])
+    
     def _prepare_time_series_data(self, data: pd.DataFrame) -> pd.DataFrame:
         """Prepare time series data for forecasting"""
         try:
@@ -68,35 +185,68 @@ class ForecastEngine:
             # Sort by date
             data = data.sort_values('date')
             
-            # Group by district and disease, aggregate by month
-            time_series_data = []
-            
-            for (district, disease), group in data.groupby(['district', 'disease']):
-                # Aggregate by month
-                monthly_data = group.set_index('date').resample('M').agg({
-                    'cases': 'sum' if 'cases' in group.columns else lambda x: np.random.randint(1, 20),
-                    'temperature': 'mean',
-                    'humidity': 'mean',
-                    'rainfall': 'sum',
-                    'water_quality': 'mean'
-                }).reset_index()
-                
-                monthly_data['district'] = district
-                monthly_data['disease'] = disease
-                monthly_data['month'] = monthly_data['date'].dt.month
-                monthly_data['year'] = monthly_data['date'].dt.year
-                
-                time_series_data.append(monthly_data)
-            
-            if time_series_data:
-                return pd.concat(time_series_data, ignore_index=True)
-            else:
-                return pd.DataFrame()
+            # Aggregate every district-disease pair by month
+            return self._aggregate_monthly(data)
                 
         except Exception as e:
             logger.error(f"Error preparing time series data: {str(e)}")
             return pd.DataFrame()
     
+    def _aggregate_monthly(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Monthly totals and means for all district-disease pairs in one groupby.
+        
+        Matches resampling each pair on its own: months without records
+        between a pair's first and last month are kept, with zero sums and
+        missing means.
+        """
+        monthly = data.groupby(
+            ['district', 'disease', pd.Grouper(key='date', freq='M')]
+        ).agg(
+            cases=('cases', 'sum'),
+            temperature=('temperature', 'mean'),
+            humidity=('humidity', 'mean'),
+            rainfall=('rainfall', 'sum'),
+            water_quality=('water_quality', 'mean')
+        ).reset_index()
+        
+        if monthly.empty:
+            return pd.DataFrame()
+        
+        # Rows are sorted by pair then month; lay each pair out on a gap-free month range
+        month_index = (monthly['date'].dt.year * 12 + monthly['date'].dt.month - 1).to_numpy()
+        pair = monthly.groupby(['district', 'disease'], sort=False).ngroup().to_numpy()
+        starts = np.flatnonzero(np.diff(pair, prepend=-1))
+        ends = np.append(starts[1:], len(pair))
+        first_month = month_index[starts]
+        span = month_index[ends - 1] - first_month + 1
+        offsets = np.cumsum(span) - span
+        
+        full_pair = np.repeat(np.arange(len(starts)), span)
+        full_month = first_month[full_pair] + np.arange(span.sum()) - offsets[full_pair]
+        positions = offsets[pair] + month_index - first_month[pair]
+        
+        dates = pd.to_datetime(pd.DataFrame({
+            'year': full_month // 12,
+            'month': full_month % 12 + 1,
+            'day': 1
+        })) + pd.offsets.MonthEnd(0)
+        
+        result = pd.DataFrame({'date': dates})
+        for col in ['cases', 'temperature', 'humidity', 'rainfall', 'water_quality']:
+            values = monthly[col].to_numpy()
+            if col in ('cases', 'rainfall'):
+                filled = np.zeros(len(full_month), dtype=values.dtype)
+            else:
+                filled = np.full(len(full_month), np.nan)
+            filled[positions] = values
+            result[col] = filled
+        
+        result['district'] = monthly['district'].to_numpy()[starts][full_pair]
+        result['disease'] = monthly['disease'].to_numpy()[starts][full_pair]
+        result['month'] = result['date'].dt.month
+        result['year'] = result['date'].dt.year
+        return result
+    
     def _train_forecast_model(self, data: pd.DataFrame) -> Optional[Dict[str, Any]]:
         """Train a forecasting model for a specific district-disease combination"""
         try:
@@ -104,7 +254,7 @@ class ForecastEngine:
                 return None
             
             # Prepare features and target
-            X = data[['month', 'temperature', 'humidity', 'rainfall', 'water_quality']].values
+            X = data[self.feature_columns].values
             y = data['cases'].values
             
             # Handle missing values
@@ -125,12 +275,13 @@ class ForecastEngine:
             r2 = r2_score(y, y_pred)
             
             return {
-                'model': model,
-                'poly_features': poly_features,
+                'coef': model.coef_,
+                'intercept': float(model.intercept_),
                 'mse': mse,
                 'r2': r2,
                 'last_data': data.iloc[-1].to_dict(),
-                'trend': self._calculate_trend(y)
+                'trend': self._calculate_trend(y),
+                'residuals': y - y_pred
             }
             
         except Exception as e:
@@ -153,6 +304,246 @@ class ForecastEngine:
         else:
             return 'stable'
     
+    def update_models(self, data: pd.DataFrame, fold_open_month: bool = False) -> int:
+        """Fold newly arrived records into the forecast models without retraining.
+        
+        Records of the newest month passed in so far are held back until a
+        later month arrives, since that month may still be incomplete: once
+        folded, a month's totals are fixed and later records for it are
+        skipped. `fold_open_month` folds it right away, for batches known to
+        complete it. Records are aggregated by month like in training, in one
+        groupby for the whole batch. Each model keeps a triangular factor of its data, so
+        months after its last known month are folded in and the coefficients
+        re-solved, giving the same model as a refit. Models whose factors
+        have the same shape are folded and solved together as stacked arrays.
+        Months that a model has already seen are skipped; those need
+        train_models. Pairs without a model yet are trained once they reach
+        3 months of data. Returns the number of monthly observations applied.
+        """
+        try:
+            data = self._closed_month_records(data, fold_open_month)
+            if data.empty:
+                return 0
+            
+            with stage_timer('forecast_prepare'):
+                time_series_data = self._prepare_update_data(data)
+            
+            if time_series_data.empty:
+                return 0
+            
+            keys = (time_series_data['district'].astype(str) + '_' + time_series_data['disease'].astype(str)).to_numpy()
+            starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+            ends = np.append(starts[1:], len(keys))
+            keys = keys[starts]
+            
+            # Every pair's stored history followed by its new months, in one frame
+            previous = [self.forecast_data.get(model_key) for model_key in keys]
+            lengths = np.array([0 if history is None else len(history) for history in previous])
+            totals = lengths + ends - starts
+            previous_starts = np.cumsum(lengths) - lengths
+            history_starts = np.cumsum(totals) - totals
+            group = np.repeat(np.arange(len(keys)), totals)
+            within = np.arange(totals.sum()) - history_starts[group]
+            order = np.where(
+                within < lengths[group],
+                previous_starts[group] + within,
+                lengths.sum() + starts[group] + within - lengths[group]
+            )
+            histories = pd.concat(
+                [history for history in previous if history is not None] + [time_series_data], ignore_index=True
+            ).take(order).reset_index(drop=True)
+            rows = self._observation_rows(histories)
+            last_rows = histories.iloc[history_starts + totals - 1].to_dict('records')
+            
+            applied = 0
+            updated, states, blocks = [], [], []
+            for group, model_key in enumerate(keys):
+                start, end = history_starts[group], history_starts[group] + totals[group]
+                history = histories.iloc[start:end]
+                
+                if model_key not in self.models:
+                    model = self._train_forecast_model(history)
+                    self._save_model(model_key, model, history)
+                    if model:
+                        applied += totals[group] - lengths[group]
+                    continue
+                
+                model_data = self.models[model_key]
+                if 'online_state' not in model_data:
+                    # Seed the state with the history the model was trained on
+                    model_data['online_state'] = self._empty_online_state(model_data)
+                else:
+                    start += lengths[group]
+                model_data['last_data'] = last_rows[group]
+                updated.append((model_key, model_data, history))
+                states.append(model_data['online_state'])
+                blocks.append(rows[start:end])
+                applied += totals[group] - lengths[group]
+            
+            with stage_timer('forecast_fit'):
+                self._fold_observations(states, blocks)
+                self._apply_online_states([model_data for _, model_data, _ in updated], states)
+            for model_key, model_data, history in updated:
+                self._save_model(model_key, model_data, history)
+            
+            if applied:
+                self.is_trained_flag = len(self.models) > 0
+                self.model_version += 1
+                self.forecast_cache.clear()
+                logger.info(f"Applied {applied} monthly observations to forecast models")
+            
+            return int(applied)
+            
+        except Exception as e:
+            logger.error(f"Error updating forecast models: {str(e)}")
+            raise e
+    
+    def _closed_month_records(self, data: pd.DataFrame, fold_open_month: bool) -> pd.DataFrame:
+        """Records of closed months among the batch and the held ones; holds the open month's"""
+        if 'date' not in data.columns or data.empty:
+            return data
+        
+        data = data.assign(date=pd.to_datetime(data['date']))
+        months = data['date'].to_numpy(dtype='datetime64[ns]').astype('datetime64[M]')
+        newest = months.max()
+        held = self.open_month_records
+        if self.open_month is not None and not newest > self.open_month:
+            newest = self.open_month
+        elif held:
+            # A later month arrived, so the held month has closed
+            data = pd.concat(held + [data], ignore_index=True)
+            months = data['date'].to_numpy(dtype='datetime64[ns]').astype('datetime64[M]')
+            held = []
+        self.open_month = newest
+        
+        if fold_open_month:
+            self.open_month_records = []
+            return pd.concat(held + [data], ignore_index=True) if held else data
+        
+        is_open = months == newest
+        self.open_month_records = held + [data[is_open]] if is_open.any() else held
+        if is_open.any():
+            logger.info(f"Holding {sum(len(records) for records in self.open_month_records)} "
+                        f"records of {newest} until the month closes")
+        return data[~is_open]
+    
+    def _prepare_update_data(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Monthly rows of a batch after each pair's last known month, sorted by pair then month.
+        
+        Every known pair in the batch gets a placeholder record in its last
+        known month, so the one aggregation also fills the months between
+        its history and the batch with zero cases, as training does.
+        """
+        last_dates = {}
+        if {'district', 'disease', 'date'}.issubset(data.columns):
+            data = data.assign(date=pd.to_datetime(data['date']))
+            pairs = data[['district', 'disease']].dropna().drop_duplicates()
+            for district, disease in pairs.itertuples(index=False, name=None):
+                model_key = f"{district}_{disease}"
+                if model_key in self.models:
+                    last_dates[model_key] = (district, disease, pd.Timestamp(self.models[model_key]['last_data']['date']))
+                elif model_key in self.forecast_data:
+                    last_dates[model_key] = (district, disease, self.forecast_data[model_key]['date'].iloc[-1])
+        
+        if last_dates:
+            placeholders = pd.DataFrame(list(last_dates.values()), columns=['district', 'disease', 'date'])
+            placeholders['cases'] = 0
+            data = pd.concat([data, placeholders], ignore_index=True)
+        
+        time_series_data = self._prepare_time_series_data(data)
+        if time_series_data.empty:
+            return time_series_data
+        
+        keys = time_series_data['district'].astype(str) + '_' + time_series_data['disease'].astype(str)
+        last_date = keys.map({model_key: last[2] for model_key, last in last_dates.items()})
+        seen = (time_series_data['date'] <= last_date).to_numpy()
+        for model_key in last_dates.keys() - set(keys[~seen]):
+            logger.warning(f"No new months for {model_key}; already-seen months need a full retrain")
+        return time_series_data[~seen].reset_index(drop=True)
+    
+    def _observation_rows(self, history: pd.DataFrame) -> np.ndarray:
+        """Monthly observations as the online state factors them: [1, X_poly, y]"""
+        X = np.nan_to_num(history[self.feature_columns].to_numpy(dtype=float), nan=0)
+        y = np.nan_to_num(history['cases'].to_numpy(dtype=float), nan=0)
+        return np.column_stack([np.ones(len(y)), self._polynomial_features(X), y])
+    
+    def _empty_online_state(self, model_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Online least squares state for a model, before any observations.
+        
+        The state is the R factor of the QR decomposition of [1, X_poly, y]
+        over all data seen. Its Gram matrix equals that of the data, so new
+        rows are folded in by re-factoring R with them stacked below, and
+        the least squares fit is re-solved from R without the squared
+        condition number of the normal equations.
+        """
+        return {
+            'R': np.zeros((0, len(model_data['coef']) + 2)),
+            'n': 0,
+            'y_prefix': [0.0]
+        }
+    
+    def _fold_observations(self, states: List[Dict[str, Any]], blocks: List[np.ndarray]):
+        """Fold blocks of observation rows into their online states, one stacked QR per height"""
+        stacked = [np.vstack([state['R'], block]) for state, block in zip(states, blocks)]
+        buckets = {}
+        for position, matrix in enumerate(stacked):
+            buckets.setdefault(matrix.shape[0], []).append(position)
+        for positions in buckets.values():
+            factors = np.linalg.qr(np.stack([stacked[position] for position in positions]), mode='r')
+            for position, R in zip(positions, factors):
+                states[position]['R'] = R
+        
+        for state, block in zip(states, blocks):
+            state['n'] += len(block)
+            state['y_prefix'].extend((state['y_prefix'][-1] + np.cumsum(block[:, -1])).tolist())
+    
+    def _apply_online_states(self, models: List[Dict[str, Any]], states: List[Dict[str, Any]]):
+        """Refresh models' coefficients, mse, r2 and trend from their online states"""
+        buckets = {}
+        for position, state in enumerate(states):
+            buckets.setdefault(state['R'].shape, []).append(position)
+        
+        for positions in buckets.values():
+            R = np.stack([states[position]['R'] for position in positions])
+            
+            # The first row of R carries the intercept column; the rows below it
+            # factor the centered features and target, as a refit centers them.
+            # The minimum-norm solution matches LinearRegression on rank-deficient data
+            pinv = np.linalg.pinv(R[:, 1:, 1:-1], rcond=np.finfo(float).eps)
+            coefficients = np.einsum('gfk,gk->gf', pinv, R[:, 1:, -1])
+            intercepts = (R[:, 0, -1] - np.einsum('gf,gf->g', R[:, 0, 1:-1], coefficients)) / R[:, 0, 0]
+            
+            # Residuals of the fit and of the mean have the same norms through R
+            solution = np.column_stack([intercepts, coefficients, -np.ones(len(positions))])
+            ss_res = np.sum(np.einsum('gkw,gw->gk', R, solution) ** 2, axis=1)
+            ss_tot = np.sum(R[:, 1:, -1] ** 2, axis=1)
+            
+            for group, position in enumerate(positions):
+                model_data, n = models[position], states[position]['n']
+                model_data.pop('residuals', None)
+                model_data['coef'] = coefficients[group]
+                model_data['intercept'] = float(intercepts[group])
+                model_data['mse'] = float(ss_res[group]) / n
+                if ss_tot[group] > 0:
+                    model_data['r2'] = float(1 - ss_res[group] / ss_tot[group])
+                else:
+                    model_data['r2'] = 1.0 if ss_res[group] == 0 else 0.0
+                model_data['trend'] = self._prefix_trend(states[position]['y_prefix'], n)
+    
+    def _prefix_trend(self, prefix: List[float], n: int) -> str:
+        """_calculate_trend from prefix sums of the target"""
+        if n < 2:
+            return 'stable'
+        half = n // 2
+        first_half = prefix[half] / half
+        second_half = (prefix[n] - prefix[half]) / (n - half)
+        if second_half > first_half * 1.1:
+            return 'increasing'
+        elif second_half < first_half * 0.9:
+            return 'decreasing'
+        else:
+            return 'stable'
+    
     def predict(self, district: str, days: int = 30) -> Dict[str, Any]:
         """Generate forecast for a district"""
         try:
@@ -160,98 +551,352 @@ class ForecastEngine:
                 logger.warning("Forecast models not trained, returning mock forecast")
                 return self._generate_mock_forecast(district, days)
             
-            # Find models for this district
-            district_models = {k: v for k, v in self.models.items() if k.startswith(district)}
+            entry = self._get_cached_forecast(district, days)
             
-            if not district_models:
+            if entry is None:
                 logger.warning(f"No forecast models found for district {district}")
                 return self._generate_mock_forecast(district, days)
             
-            forecasts = {}
-            
-            for model_key, model_data in district_models.items():
-                disease = model_key.split('_')[1]
-                
-                # Generate forecast
-                forecast = self._generate_forecast(model_data, days)
-                forecasts[disease] = forecast
+            forecasts = {
+                disease: self._disease_forecast(entry, i, days)
+                for i, disease in enumerate(entry['diseases'])
+            }
             
             return {
                 'district': district,
                 'forecast_period': f"{days} days",
-                'generated_at': datetime.now().isoformat(),
+                'generated_at': entry['generated_at'],
                 'disease_forecasts': forecasts,
-                'summary': self._generate_forecast_summary(forecasts)
+                'summary': self._summarize_cached_forecast(entry, days)
             }
             
         except Exception as e:
             logger.error(f"Error generating forecast: {str(e)}")
             return self._generate_mock_forecast(district, days)
     
-    def _generate_forecast(self, model_data: Dict[str, Any], days: int) -> Dict[str, Any]:
-        """Generate forecast using trained model"""
+    def iter_forecast(self, district: str, days: int = 30) -> Iterator[Dict[str, Any]]:
+        """Yield a district forecast as a header record, then one record per disease.
+        
+        The header has the same fields as predict() minus disease_forecasts;
+        each disease record is built only when it is consumed, so a streamed
+        response never materializes the whole nested forecast.
+        """
+        entry = self._get_cached_forecast(district, days) if self.is_trained_flag else None
+        
+        if entry is None:
+            forecast = self.predict(district, days)
+            disease_forecasts = forecast.pop('disease_forecasts')
+            yield forecast
+            for disease, disease_forecast in disease_forecasts.items():
+                yield {'disease': disease, **disease_forecast}
+            return
+        
+        yield {
+            'district': district,
+            'forecast_period': f"{days} days",
+            'generated_at': entry['generated_at'],
+            'summary': self._summarize_cached_forecast(entry, days)
+        }
+        for i, disease in enumerate(entry['diseases']):
+            yield {'disease': disease, **self._disease_forecast(entry, i, days)}
+    
+    def _disease_forecast(self, entry: Dict[str, Any], index: int, days: int) -> Dict[str, Any]:
+        """First `days` days of one disease's cached forecast in response form"""
+        forecast = {
+            'dates': entry['dates'][:days],
+            'predicted_cases': entry['predicted_cases'][index, :days].tolist(),
+            **entry['metadata'][index]
+        }
+        if self.interval_samples > 0:
+            forecast['prediction_intervals'] = {
+                label: {
+                    'lower': bounds['lower'][index, :days].tolist(),
+                    'upper': bounds['upper'][index, :days].tolist()
+                }
+                for label, bounds in entry['intervals'].items()
+            }
+        return forecast
+    
+    def predict_region(self, districts: List[str], days: int = 30) -> Dict[str, Any]:
+        """Aggregate cached district forecasts into one regional forecast.
+        
+        Daily cases are summed per disease across districts in one
+        vectorized add over the stacked cached arrays, and totals come from
+        their prefix sums. Districts without trained models are listed
+        rather than filled with mock data.
+        """
+        try:
+            entries = {}
+            missing = []
+            
+            for district in dict.fromkeys(districts):
+                entry = self._get_cached_forecast(district, days) if self.is_trained_flag else None
+                if entry is None:
+                    missing.append(district)
+                else:
+                    entries[district] = entry
+            
+            diseases = list(dict.fromkeys(d for entry in entries.values() for d in entry['diseases']))
+            disease_index = {disease: i for i, disease in enumerate(diseases)}
+            aggregated = np.zeros((len(diseases), max(days, 0)))
+            series_totals = np.zeros(0)
+            confidences = []
+            
+            if entries:
+                rows = np.array([disease_index[d] for entry in entries.values() for d in entry['diseases']])
+                cases = np.vstack([entry['predicted_cases'][:, :days] for entry in entries.values()])
+                np.add.at(aggregated, rows, cases)
+                series_totals = aggregated.sum(axis=1) if days > 0 else np.zeros(len(diseases))
+                confidences = [m['confidence'] for entry in entries.values() for m in entry['metadata']]
+                reporting = np.bincount(rows, minlength=len(diseases))
+                dates = next(iter(entries.values()))['dates'][:days]
+            else:
+                reporting = np.zeros(0, dtype=int)
+                dates = [date.isoformat() for date in pd.date_range(start=pd.Timestamp(datetime.now().date()), periods=max(days, 0), freq='D')]
+            
+            district_totals = {
+                district: int(entry['cumulative_cases'][:, days - 1].sum()) if days > 0 else 0
+                for district, entry in entries.items()
+            }
+            total_cases = float(series_totals.sum())
+            num_series = len(confidences)
+            
+            return {
+                'districts': list(entries),
+                'districts_without_models': missing,
+                'forecast_period': f"{days} days",
+                'generated_at': datetime.now().isoformat(),
+                'dates': dates,
+                'disease_forecasts': {
+                    disease: {
+                        'predicted_cases': aggregated[i].tolist(),
+                        'districts_reporting': int(reporting[i])
+                    }
+                    for i, disease in enumerate(diseases)
+                },
+                'district_totals': district_totals,
+                'summary': {
+                    'total_predicted_cases': int(total_cases),
+                    'highest_risk_disease': diseases[int(np.argmax(series_totals))] if diseases else 'Unknown',
+                    'average_confidence': float(np.mean(confidences)) if confidences else 0.5,
+                    'diseases_forecasted': len(diseases),
+                    'districts_forecasted': len(entries),
+                    'risk_assessment': self._assess_overall_risk(total_cases, num_series)
+                }
+            }
+            
+        except Exception as e:
+            logger.error(f"Error generating regional forecast: {str(e)}")
+            raise e
+    
+    def _get_cached_forecast(self, district: str, days: int) -> Optional[Dict[str, Any]]:
+        """Return the district's cached forecast, covering at least `days` days.
+        
+        One forecast per district is kept for the current model version and
+        calendar day, computed at max_horizon days. Shorter requests are
+        slices of it; longer requests build an extended copy that replaces
+        it. Entries are never changed once cached, since requests running
+        in other threads may be reading them.
+        """
+        today = datetime.now().date()
+        entry = self.forecast_cache.get(district)
+        
+        if entry is None or entry['model_version'] != self.model_version or entry['day'] != today:
+            # Find models for this district
+            model_keys = [k for k in self.models if k.startswith(district)]
+            
+            if not model_keys:
+                return None
+            
+            entry = {
+                'model_version': self.model_version,
+                'day': today,
+                'start': pd.Timestamp(today),
+                'generated_at': datetime.now().isoformat(),
+                'model_keys': model_keys,
+                'diseases': [k.split('_')[1] for k in model_keys],
+                'metadata': [self._forecast_metadata(self.models[k]) for k in model_keys],
+                'dates': [],
+                'predicted_cases': np.empty((len(model_keys), 0)),
+                'cumulative_cases': np.empty((len(model_keys), 0)),
+                'intervals': {
+                    self._interval_label(level): {
+                        'lower': np.empty((len(model_keys), 0)),
+                        'upper': np.empty((len(model_keys), 0))
+                    }
+                    for level in self.interval_levels
+                }
+            }
+            entry = self._extend_cached_forecast(entry, max(days, self.max_horizon))
+            self._store_cached_forecast(district, entry)
+        elif days > len(entry['dates']):
+            entry = self._extend_cached_forecast(entry, days)
+            self._store_cached_forecast(district, entry)
+        
+        return entry
+    
+    def _store_cached_forecast(self, district: str, entry: Dict[str, Any]):
+        """Cache `entry` unless a concurrent request already cached a longer one"""
+        current = self.forecast_cache.get(district)
+        if (current is None or current['model_version'] != entry['model_version'] or current['day'] != entry['day']
+                or len(current['dates']) < len(entry['dates'])):
+            self.forecast_cache[district] = entry
+    
+    def _extend_cached_forecast(self, entry: Dict[str, Any], days: int) -> Dict[str, Any]:
+        """A copy of a cache entry with forecast days appended until it covers `days` days"""
+        offset = len(entry['dates'])
+        new_days = days - offset
+        
+        new_dates = pd.date_range(start=entry['start'] + timedelta(days=offset), periods=new_days, freq='D')
+        new_cases = np.vstack([
+            self._generate_forecast(self.models[model_key], new_dates, offset)
+            for model_key in entry['model_keys']
+        ])
+        
+        previous_total = entry['cumulative_cases'][:, -1:] if offset else 0
+        extended = {
+            **entry,
+            'dates': entry['dates'] + [date.isoformat() for date in new_dates],
+            'predicted_cases': np.hstack([entry['predicted_cases'], new_cases]),
+            'cumulative_cases': np.hstack([
+                entry['cumulative_cases'],
+                previous_total + np.cumsum(new_cases, axis=1)
+            ])
+        }
+        
+        if self.interval_samples > 0:
+            residual_pools = [self._model_residuals(model_key) for model_key in entry['model_keys']]
+            new_intervals = self._simulate_intervals(new_cases, residual_pools)
+            extended['intervals'] = {
+                label: {
+                    side: np.hstack([entry['intervals'][label][side], new_intervals[label][side]])
+                    for side in ('lower', 'upper')
+                }
+                for label in entry['intervals']
+            }
+        return extended
+    
+    def _generate_forecast(self, model_data: Dict[str, Any], future_dates: pd.DatetimeIndex,
+                           offset: int = 0) -> np.ndarray:
+        """Generate forecast using trained model
+        
+        `offset` is the index of the first date within the forecast, so a
+        forecast can be produced in consecutive pieces.
+        """
         try:
-            model = model_data['model']
-            poly_features = model_data['poly_features']
             last_data = model_data['last_data']
             trend = model_data['trend']
             
-            # Generate future dates
-            future_dates = pd.date_range(
-                start=datetime.now(),
-                periods=days,
-                freq='D'
-            )
-            
             # Prepare future features (use last known values with seasonal adjustments)
-            future_features = []
-            for date in future_dates:
-                month = date.month
-                # Use last known environmental values with seasonal variations
-                temp = last_data.get('temperature', 25) + np.sin(2 * np.pi * month / 12) * 5
-                humidity = last_data.get('humidity', 60) + np.cos(2 * np.pi * month / 12) * 10
-                rainfall = last_data.get('rainfall', 100) * (1 + np.sin(2 * np.pi * month / 12) * 0.3)
-                water_quality = last_data.get('water_quality', 5)
-                
-                future_features.append([month, temp, humidity, rainfall, water_quality])
+            month = future_dates.month.to_numpy()
+            temp = last_data.get('temperature', 25) + np.sin(2 * np.pi * month / 12) * 5
+            humidity = last_data.get('humidity', 60) + np.cos(2 * np.pi * month / 12) * 10
+            rainfall = last_data.get('rainfall', 100) * (1 + np.sin(2 * np.pi * month / 12) * 0.3)
+            water_quality = np.full(len(month), last_data.get('water_quality', 5))
             
-            future_features = np.array(future_features)
-            future_features_poly = poly_features.transform(future_features)
+            future_features = np.column_stack([month, temp, humidity, rainfall, water_quality])
+            future_features_poly = self._polynomial_features(future_features)
             
             # Generate predictions
-            predictions = model.predict(future_features_poly)
+            predictions = future_features_poly @ model_data['coef'] + model_data['intercept']
             
-            # Apply trend adjustment
+            # Apply trend adjustment, reaching +/-20% at max_horizon days and held there after
+            day_index = np.minimum(np.arange(offset, offset + len(future_dates)), max(self.max_horizon - 1, 0))
+            trend_step = 0.2 / max(self.max_horizon - 1, 1)
             if trend == 'increasing':
-                trend_multiplier = np.linspace(1, 1.2, days)
+                trend_multiplier = 1 + trend_step * day_index
             elif trend == 'decreasing':
-                trend_multiplier = np.linspace(1, 0.8, days)
+                trend_multiplier = 1 - trend_step * day_index
             else:
-                trend_multiplier = np.ones(days)
+                trend_multiplier = np.ones(len(future_dates))
             
             predictions = predictions * trend_multiplier
-            predictions = np.maximum(predictions, 0)  # Ensure non-negative
-            
-            return {
-                'dates': [date.isoformat() for date in future_dates],
-                'predicted_cases': predictions.tolist(),
-                'trend': trend,
-                'confidence': min(0.9, model_data.get('r2', 0.5) + 0.3),
-                'model_performance': {
-                    'mse': model_data.get('mse', 0),
-                    'r2': model_data.get('r2', 0)
-                }
-            }
+            return np.maximum(predictions, 0)  # Ensure non-negative
             
         except Exception as e:
             logger.error(f"Error generating forecast: {str(e)}")
-            return {
-                'dates': [(datetime.now() + timedelta(days=i)).isoformat() for i in range(days)],
-                'predicted_cases': [np.random.randint(1, 20) for _ in range(days)],
-                'trend': 'stable',
-                'confidence': 0.5,
-                'model_performance': {'mse': 0, 'r2': 0}
+            return np.random.randint(1, 20, len(future_dates)).astype(float)
+    
+    def _model_residuals(self, model_key: str) -> np.ndarray:
+        """In-sample residuals of a model, inflated for the fitted degrees of freedom"""
+        model_data = self.models[model_key]
+        
+        if 'residuals' not in model_data:
+            history = self.forecast_data[model_key]
+            X = np.nan_to_num(history[self.feature_columns].to_numpy(dtype=float), nan=0)
+            y = np.nan_to_num(history['cases'].to_numpy(dtype=float), nan=0)
+            model_data['residuals'] = y - (self._polynomial_features(X) @ model_data['coef'] + model_data['intercept'])
+        
+        residuals = model_data['residuals']
+        n, p = len(residuals), len(model_data['coef']) + 1
+        if n > p:
+            residuals = residuals * np.sqrt(n / (n - p))
+        return residuals
+    
+    def _simulate_intervals(self, point_forecasts: np.ndarray,
+                            residual_pools: List[np.ndarray]) -> Dict[str, Dict[str, np.ndarray]]:
+        """Prediction intervals for a block of point forecasts by simulation.
+        
+        Each sample adds a residual drawn with replacement from the disease's
+        training residuals to the point forecast, then adds Poisson counting
+        noise (normal approximation) around it, so intervals stay meaningful
+        when a model fits its history exactly. Samples, diseases and days are
+        simulated as a single (samples, diseases, days) array.
+        """
+        n_diseases, n_days = point_forecasts.shape
+        counts = np.array([len(residuals) for residuals in residual_pools])
+        pool_width = max(int(counts.max(initial=0)), 1)
+        pool = np.zeros((n_diseases, pool_width))
+        for i, residuals in enumerate(residual_pools):
+            pool[i, :len(residuals)] = residuals
+        
+        picks = (self._rng.random((self.interval_samples, n_diseases, n_days))
+                 * np.maximum(counts, 1)[:, None]).astype(np.intp)
+        picks += (np.arange(n_diseases) * pool_width)[:, None]
+        simulated = np.maximum(point_forecasts + pool.ravel()[picks], 0)
+        simulated += np.sqrt(simulated) * self._rng.standard_normal(simulated.shape)
+        np.maximum(simulated, 0, out=simulated)
+        
+        quantiles = []
+        for level in self.interval_levels:
+            quantiles.extend([(1 - level) / 2, (1 + level) / 2])
+        bounds = np.quantile(simulated, quantiles, axis=0)
+        
+        return {
+            self._interval_label(level): {'lower': bounds[2 * i], 'upper': bounds[2 * i + 1]}
+            for i, level in enumerate(self.interval_levels)
+        }
+    
+    def _interval_label(self, level: float) -> str:
+        """Response key for an interval level, e.g. 0.8 -> '80'"""
+        return f"{level * 100:g}"
+    
+    def _forecast_metadata(self, model_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Per-disease forecast fields that do not depend on the horizon"""
+        return {
+            'trend': model_data.get('trend', 'stable'),
+            'confidence': min(0.9, model_data.get('r2', 0.5) + 0.3),
+            'model_performance': {
+                'mse': model_data.get('mse', 0),
+                'r2': model_data.get('r2', 0)
             }
+        }
+    
+    def _summarize_cached_forecast(self, entry: Dict[str, Any], days: int) -> Dict[str, Any]:
+        """Forecast summary for the first `days` days, read from prefix sums"""
+        if days > 0:
+            totals = entry['cumulative_cases'][:, days - 1]
+        else:
+            totals = np.zeros(len(entry['diseases']))
+        total_cases = totals.sum()
+        
+        return {
+            'total_predicted_cases': int(total_cases),
+            'highest_risk_disease': entry['diseases'][int(np.argmax(totals))],
+            'average_confidence': float(np.mean([m['confidence'] for m in entry['metadata']])),
+            'diseases_forecasted': len(entry['diseases']),
+            'risk_assessment': self._assess_overall_risk(total_cases, len(entry['diseases']))
+        }
     
     def _generate_forecast_summary(self, forecasts: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
         """Generate summary of all disease forecasts"""
@@ -332,6 +977,11 @@ class ForecastEngine:
             'summary': self._generate_forecast_summary(forecasts)
         }
     
+    def pin_districts(self, districts: List[str]):
+        """Keep every model of these districts in memory, loading them now"""
+        if self.model_store is not None:
+            self.model_store.pin(k for k in self.models for district in districts if k.startswith(district))
+    
     def is_trained(self) -> bool:
         """Check if models are trained"""
         return self.is_trained_flag
@@ -342,5 +992,11 @@ class ForecastEngine:
             'trained': self.is_trained_flag,
             'models_count': len(self.models),
             'model_keys': list(self.models.keys()),
-            'forecast_data_count': len(self.forecast_data)
+            'forecast_data_count': len(self.forecast_data),
+            'model_version': self.model_version,
+            'max_horizon': self.max_horizon,
+            'cached_forecasts': len(self.forecast_cache),
+            'open_month': str(self.open_month) if self.open_month is not None else None,
+            'open_month_records': sum(len(records) for records in self.open_month_records),
+            'model_store': self.model_store.get_info() if self.model_store is not None else None
         }
@@ -0,0 +1,210 @@
+import logging
+import os
+import pickle
+import shutil
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+import pandas as pd
+
+from .metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+FORECAST_MODEL_LOADS = REGISTRY.counter('forecast_model_loads_total', 'Forecast models loaded from the model store')
+FORECAST_MODEL_EVICTIONS = REGISTRY.counter(
+    'forecast_model_evictions_total',
+    'Forecast models evicted from memory to stay within the cache budget'
+)
+FORECAST_MODEL_RESIDENT = REGISTRY.gauge('forecast_models_resident', 'Forecast models held in memory, pinned included')
+FORECAST_MODEL_RESIDENT_BYTES = REGISTRY.gauge(
+    'forecast_models_resident_bytes',
+    'Serialized size of the forecast models held in memory'
+)
+
+
+def remove_stale_process_directories(root: Path):
+    """Drop the per-process directories under `root` of processes that are gone"""
+    if not root.exists():
+        return
+    for directory in root.iterdir():
+        if not directory.name.isdigit() or int(directory.name) == os.getpid():
+            continue
+        try:
+            os.kill(int(directory.name), 0)
+        except ProcessLookupError:
+            shutil.rmtree(directory, ignore_errors=True)
+        except PermissionError:
+            pass
+
+
+class _StoreView(Mapping):
+    """Read-only mapping of one part ('model' or 'history') of every stored entry"""
+
+    def __init__(self, store: 'ForecastModelStore', part: int):
+        self._store = store
+        self._part = part
+
+    def __getitem__(self, key: str) -> Any:
+        location = self._store._index.get(key)
+        if location is None or not location[2 + self._part]:
+            raise KeyError(key)
+        return self._store.get(key)[self._part]
+
+    def __iter__(self) -> Iterator[str]:
+        return (key for key, location in list(self._store._index.items()) if location[2 + self._part])
+
+    def __len__(self) -> int:
+        return sum(1 for location in list(self._store._index.values()) if location[2 + self._part])
+
+
+class ForecastModelStore:
+    """Forecast models and their monthly history on disk, with an LRU in front.
+
+    Every entry (model dict and history DataFrame of one district-disease
+    pair) is pickled to its own file when it is saved, and loaded back on
+    first use. The in-memory LRU holds at most `max_entries` entries and
+    `max_bytes` of serialized size (0 means no limit). Pinned
+    entries are loaded up front and never evicted; they count against the
+    budget, so the LRU gets what is left.
+
+    Files are never rewritten: each save writes a new file, so processes
+    forked from the one that trained (see production_server.py) keep
+    reading the master's files while writing their own. Files replaced after
+    a fork are kept until remove_replaced(), since children may still read them.
+    """
+
+    def __init__(self, root: Path, max_entries: int = 0, max_bytes: int = 0):
+        self.root = Path(root)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.models = _StoreView(self, 0)
+        self.histories = _StoreView(self, 1)
+        # key -> (path, size, has model, has history, owning pid, sequence)
+        self._index = {}
+        self._lru = OrderedDict()
+        self._pinned = {}
+        self._resident_bytes = 0
+        self._sequence = 0
+        # Files up to this sequence may be read by forked children
+        self._forked_at = 0
+        self._replaced = []
+        self._lock = threading.RLock()
+        self.directory = self.root / str(os.getpid())
+        remove_stale_process_directories(self.root)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        FORECAST_MODEL_RESIDENT.set_function(lambda: len(self._lru) + len(self._pinned))
+        FORECAST_MODEL_RESIDENT_BYTES.set_function(lambda: self._resident_bytes)
+        os.register_at_fork(after_in_parent=self._mark_forked)
+
+    def _mark_forked(self):
+        self._forked_at = self._sequence
+
+    def put(self, key: str, model: Optional[Dict[str, Any]], history: Optional[pd.DataFrame]):
+        """Write an entry through to disk; the next get() loads it back
+
+        The caller's objects are not kept, since they may be views into
+        larger arrays (batched training slices one frame for every pair).
+        Pinned entries are replaced by their deserialized copy right away.
+        """
+        payload = pickle.dumps((model, history), protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            pid = os.getpid()
+            self._sequence += 1
+            path = self.directory / f"{self._sequence:08d}-{pid}.pkl"
+            with open(path, 'wb') as f:
+                f.write(payload)
+
+            previous = self._index.get(key)
+            if previous is not None and previous[4] == pid:
+                # Only remove files this process wrote; forked workers share the master's
+                if previous[5] <= self._forked_at:
+                    self._replaced.append(previous[0])
+                else:
+                    previous[0].unlink(missing_ok=True)
+            self._index[key] = (path, len(payload), model is not None, history is not None, pid, self._sequence)
+
+            if key in self._pinned:
+                self._resident_bytes += len(payload) - self._pinned[key][1]
+                self._pinned[key] = (pickle.loads(payload), len(payload))
+            else:
+                self._discard(key)
+
+    def remove_replaced(self):
+        """Delete files replaced since the last fork; call once no child can read them"""
+        with self._lock:
+            replaced, self._replaced = self._replaced, []
+        for path in replaced:
+            path.unlink(missing_ok=True)
+
+    def get(self, key: str) -> Optional[Tuple[Optional[Dict[str, Any]], Optional[pd.DataFrame]]]:
+        """(model, history) for a key, loading it from disk if it is not in memory"""
+        with self._lock:
+            if key in self._pinned:
+                return self._pinned[key][0]
+            if key in self._lru:
+                self._lru.move_to_end(key)
+                return self._lru[key][0]
+            if key not in self._index:
+                return None
+            entry, size = self._load(key)
+            self._lru[key] = (entry, size)
+            self._resident_bytes += size
+            self._evict()
+            return entry
+
+    def _load(self, key: str) -> Tuple[Tuple[Any, Any], int]:
+        path, size = self._index[key][:2]
+        with open(path, 'rb') as f:
+            entry = pickle.load(f)
+        FORECAST_MODEL_LOADS.inc()
+        return entry, size
+
+    def pin(self, keys: Iterable[str]):
+        """Keep exactly these entries in memory, loading any that are not resident"""
+        keys = {key for key in keys if key in self._index}
+        with self._lock:
+            for key in [key for key in self._pinned if key not in keys]:
+                self._lru[key] = self._pinned.pop(key)
+            for key in keys:
+                if key in self._pinned:
+                    continue
+                if key in self._lru:
+                    self._pinned[key] = self._lru.pop(key)
+                else:
+                    self._pinned[key] = self._load(key)
+                    self._resident_bytes += self._pinned[key][1]
+            self._evict()
+            pinned_bytes = sum(size for _, size in self._pinned.values())
+        if self.max_bytes and pinned_bytes > self.max_bytes:
+            logger.warning(f"Pinned forecast models ({pinned_bytes} bytes) exceed the cache budget ({self.max_bytes})")
+
+    def _discard(self, key: str):
+        removed = self._lru.pop(key, None)
+        if removed is not None:
+            self._resident_bytes -= removed[1]
+
+    def _evict(self):
+        while self._lru and (
+            (self.max_entries and len(self._lru) + len(self._pinned) > self.max_entries) or
+            (self.max_bytes and self._resident_bytes > self.max_bytes)
+        ):
+            _, (_, size) = self._lru.popitem(last=False)
+            self._resident_bytes -= size
+            FORECAST_MODEL_EVICTIONS.inc()
+
+    def get_info(self) -> Dict[str, Any]:
+        return {
+            'directory': str(self.directory),
+            'stored': len(self._index),
+            'resident': len(self._lru) + len(self._pinned),
+            'pinned': len(self._pinned),
+            'resident_bytes': self._resident_bytes,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'loads': int(FORECAST_MODEL_LOADS.value()),
+            'evictions': int(FORECAST_MODEL_EVICTIONS.value())
+        }
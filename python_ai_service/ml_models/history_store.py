@@ -0,0 +1,302 @@
+import logging
+import os
+import shutil
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .forecast_store import remove_stale_process_directories
+from .metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+HISTORY_PARTITIONS = REGISTRY.counter(
+    'history_partitions_total',
+    'History store partitions considered by reads, by whether they were read or pruned',
+    ('outcome',)
+)
+
+# Columns each partition keeps min/max statistics for, when present
+STATS_COLUMNS = ['date', 'district', 'disease', 'cases', 'temperature', 'humidity', 'rainfall',
+                 'water_quality', 'population_density', 'vaccination_rate']
+
+# Generations kept on disk; the previous one stays for reads still in flight
+KEEP_GENERATIONS = 2
+
+
+class _Partition:
+    """One parquet file: a month (and district) of records with column min/max"""
+
+    def __init__(self, path: Path, month: Optional[pd.Timestamp], district: Optional[str], rows: int,
+                 size: int, stats: Dict[str, tuple], non_null: Dict[str, int]):
+        self.path = path
+        self.month = month
+        self.district = district
+        self.rows = rows
+        self.size = size
+        self.stats = stats
+        self.non_null = non_null
+
+    def may_contain(self, districts: Optional[set], diseases: Optional[set]) -> bool:
+        """False when the statistics rule out every district or disease asked for"""
+        for column, values in (('district', districts), ('disease', diseases)):
+            if values is None:
+                continue
+            low, high = self.stats.get(column, (None, None))
+            if low is None or not any(low <= value <= high for value in values):
+                return False
+        return True
+
+    def covered_by(self, start: Optional[pd.Timestamp], end: Optional[pd.Timestamp],
+                   districts: Optional[set], diseases: Optional[set]) -> bool:
+        """True when the statistics show every row matches, so no row filter is needed"""
+        if start is not None and self.stats['date'][0] < start:
+            return False
+        if end is not None and self.stats['date'][1] > end:
+            return False
+        for column, values in (('district', districts), ('disease', diseases)):
+            if values is None:
+                continue
+            low, high = self.stats.get(column, (None, None))
+            if low is None or low != high or low not in values or self.rows != self.non_null.get(column):
+                return False
+        return True
+
+
+class HistoryStore:
+    """Cleaned records on disk as parquet files partitioned by month, optionally by district too.
+
+    Each partition records the min/max of its date, district, disease and
+    numeric columns. Reads drop partitions whose statistics cannot match the
+    date range and district/disease filters. Partitions the statistics show
+    to match entirely are read as they are; the rest go to pyarrow with the
+    filters pushed down to their row groups. Only the requested columns are
+    decoded, so a read's cost follows its window, not the length of the
+    history.
+
+    `write` replaces the history with a new generation of files and `append`
+    adds files for a batch next to the current ones. Files live in a
+    directory per process, as in ForecastModelStore, so forked workers keep
+    reading what the master wrote; generations that existed at a fork are
+    only removed by remove_replaced().
+    """
+
+    def __init__(self, root: Path, partition_by_district: bool = False):
+        self.root = Path(root)
+        self.partition_by_district = partition_by_district
+        # Fingerprint of the data stored; None until the first write
+        self.fingerprint = None
+        # False once a write fails, so readers go back to memory
+        self.current = False
+        self.schema = None
+        # Partitions and the date range of each, for pruning without a Python loop
+        self._index = ([], np.empty((0, 2), dtype='datetime64[ns]'))
+        self._generations = deque()
+        # Generations forked children may read, and old ones among them waiting for removal
+        self._shared = set()
+        self._replaced = []
+        self._sequence = 0
+        self._lock = threading.Lock()
+        remove_stale_process_directories(self.root)
+        os.register_at_fork(after_in_parent=self._mark_forked)
+
+    def _mark_forked(self):
+        self._shared = set(self._generations)
+
+    def write(self, df: pd.DataFrame, fingerprint: Optional[str] = None):
+        """Replace the stored history with `df`; a no-op when `fingerprint` is already stored"""
+        import pyarrow as pa
+
+        if fingerprint is not None and fingerprint == self.fingerprint and self.current:
+            return
+        with self._lock:
+            self._sequence += 1
+            generation = self.root / str(os.getpid()) / f"gen-{self._sequence:06d}"
+            try:
+                schema = pa.Schema.from_pandas(df, preserve_index=False)
+                partitions = self._write_partitions(df, generation, schema)
+                self._set_partitions(partitions)
+            except Exception:
+                self.current = False
+                shutil.rmtree(generation, ignore_errors=True)
+                raise
+            self.schema = schema
+            self.fingerprint = fingerprint
+            self.current = True
+            self._generations.append(generation)
+            self._remove_old_generations()
+
+    def append(self, records: pd.DataFrame, fingerprint: Optional[str] = None):
+        """Add a batch as new files in the current generation
+
+        Columns the stored schema lacks are not kept; a batch that does not
+        fit the schema marks the store out of date until the next write.
+        """
+        if not self.current or records.empty:
+            return
+        with self._lock:
+            try:
+                batch = records.reindex(columns=self.schema.names)
+                partitions = self._write_partitions(batch, self._generations[-1], self.schema)
+                self._set_partitions(self._index[0] + partitions)
+            except Exception:
+                self.current = False
+                raise
+            self.fingerprint = fingerprint
+
+    def _write_partitions(self, df: pd.DataFrame, directory: Path, schema) -> List[_Partition]:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+
+        keys = [pd.Series(self._months(df), index=df.index)]
+        if self.partition_by_district and 'district' in df.columns:
+            keys.append(df['district'])
+
+        partitions = []
+        for key, positions in df.groupby(keys, sort=True, dropna=False).indices.items():
+            key = key if isinstance(key, tuple) else (key,)
+            month = None if pd.isna(key[0]) else pd.Timestamp(key[0])
+            district = key[1] if len(key) > 1 and isinstance(key[1], str) else None
+
+            part = directory / (f"month={month:%Y-%m}" if month is not None else "month=unknown")
+            if len(key) > 1:
+                part = part / f"district={district if district is not None else 'unknown'}"
+            part.mkdir(parents=True, exist_ok=True)
+            self._sequence += 1
+            path = part / f"part-{self._sequence:06d}-{os.getpid()}.parquet"
+
+            table = pa.Table.from_pandas(df.iloc[positions], schema=schema, preserve_index=False)
+            pq.write_table(table, path)
+
+            stats, non_null = {}, {}
+            for column in STATS_COLUMNS:
+                if column not in table.column_names or table[column].null_count == len(table):
+                    continue
+                extremes = pc.min_max(table[column])
+                low, high = extremes['min'].as_py(), extremes['max'].as_py()
+                stats[column] = (pd.Timestamp(low), pd.Timestamp(high)) if column == 'date' else (low, high)
+                non_null[column] = len(table) - table[column].null_count
+            partitions.append(_Partition(path, month, district, len(table), path.stat().st_size, stats, non_null))
+        return partitions
+
+    def _set_partitions(self, partitions: List[_Partition]):
+        # Partitions of undated records (month=unknown) get a NaT range
+        no_dates = (np.datetime64('NaT'), np.datetime64('NaT'))
+        date_ranges = np.array([partition.stats.get('date', no_dates) for partition in partitions],
+                               dtype='datetime64[ns]').reshape(-1, 2)
+        # Readers take the pair together, so it is swapped in one assignment
+        self._index = (partitions, date_ranges)
+
+    @staticmethod
+    def _months(df: pd.DataFrame) -> np.ndarray:
+        if 'date' not in df.columns:
+            return np.full(len(df), np.datetime64('NaT', 'M'))
+        dates = df['date']
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates, errors='coerce')
+        return dates.to_numpy(dtype='datetime64[ns]').astype('datetime64[M]')
+
+    def _remove_old_generations(self):
+        while len(self._generations) > KEEP_GENERATIONS:
+            generation = self._generations.popleft()
+            # Only this process's generations; forked workers share the master's
+            if generation.parent.name != str(os.getpid()):
+                continue
+            if generation in self._shared:
+                self._replaced.append(generation)
+            else:
+                shutil.rmtree(generation, ignore_errors=True)
+
+    def remove_replaced(self):
+        """Delete old generations forked children could read; call once none can"""
+        with self._lock:
+            replaced, self._replaced = self._replaced, []
+            self._shared.difference_update(replaced)
+        for generation in replaced:
+            shutil.rmtree(generation, ignore_errors=True)
+
+    def read(self, start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None,
+             districts: Optional[Sequence[str]] = None, diseases: Optional[Sequence[str]] = None,
+             columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Records dated within [start, end] for the given districts and diseases, oldest first"""
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+        districts = set(districts) if districts is not None else None
+        diseases = set(diseases) if diseases is not None else None
+        schema = self.schema
+        columns = [column for column in (columns or schema.names) if column in schema.names]
+
+        partitions, date_ranges = self._index
+        candidates = np.ones(len(partitions), dtype=bool)
+        if start is not None or end is not None:
+            # NaT ranges (partitions without dates) compare False and drop out
+            if start is not None:
+                candidates &= date_ranges[:, 1] >= start.to_datetime64()
+            if end is not None:
+                candidates &= date_ranges[:, 0] <= end.to_datetime64()
+        selected = [partitions[i] for i in np.flatnonzero(candidates) if partitions[i].may_contain(districts, diseases)]
+        HISTORY_PARTITIONS.inc('read', amount=len(selected))
+        HISTORY_PARTITIONS.inc('pruned', amount=len(partitions) - len(selected))
+        if not selected:
+            return schema.empty_table().select(columns).to_pandas()
+
+        # Partitions the statistics show to match entirely are read without a filter
+        covered = [partition for partition in selected if partition.covered_by(start, end, districts, diseases)]
+        partial = [partition for partition in selected if not partition.covered_by(start, end, districts, diseases)]
+        tables = []
+        for group, filtered in ((covered, False), (partial, True)):
+            if not group:
+                continue
+            condition = None
+            if filtered:
+                for expression in self._filters(start, end, districts, diseases, schema):
+                    condition = expression if condition is None else condition & expression
+            dataset = ds.dataset([str(partition.path) for partition in group], schema=schema, format='parquet')
+            tables.append(dataset.to_table(columns=columns, filter=condition))
+        df = pa.concat_tables(tables).to_pandas() if len(tables) > 1 else tables[0].to_pandas()
+        if 'date' in df.columns:
+            df = df.sort_values('date', kind='stable', ignore_index=True)
+        return df
+
+    @staticmethod
+    def _filters(start, end, districts, diseases, schema) -> List[Any]:
+        import pyarrow.dataset as ds
+
+        filters = []
+        if start is not None:
+            filters.append(ds.field('date') >= start)
+        if end is not None:
+            filters.append(ds.field('date') <= end)
+        if districts is not None and 'district' in schema.names:
+            filters.append(ds.field('district').isin(list(districts)))
+        if diseases is not None and 'disease' in schema.names:
+            filters.append(ds.field('disease').isin(list(diseases)))
+        return filters
+
+    def latest_date(self) -> Optional[pd.Timestamp]:
+        date_ranges = self._index[1]
+        if not len(date_ranges) or np.isnat(date_ranges[:, 1]).all():
+            return None
+        return pd.Timestamp(np.nanmax(date_ranges[:, 1]))
+
+    def get_info(self) -> Dict[str, Any]:
+        partitions = self._index[0]
+        return {
+            'directory': str(self._generations[-1]) if self._generations else None,
+            'current': self.current,
+            'partition_by_district': self.partition_by_district,
+            'partitions': len(partitions),
+            'rows': sum(partition.rows for partition in partitions),
+            'bytes': sum(partition.size for partition in partitions),
+            'months': len({partition.month for partition in partitions if partition.month is not None}),
+            'partitions_read': int(HISTORY_PARTITIONS.value('read')),
+            'partitions_pruned': int(HISTORY_PARTITIONS.value('pruned'))
+        }
@@ -0,0 +1,338 @@
+import os
+import pickle
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple, Optional
+
+# Latency buckets in seconds, from sub-millisecond stages up to full retrains
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Tuple[str, ...]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labels}")
+        return labels
+
+    def snapshot(self) -> Dict[Tuple[str, ...], Any]:
+        with self._lock:
+            return dict(self._values)
+
+    def merge(self, merged: Dict[Tuple[str, ...], Any], values: Dict[Tuple[str, ...], Any], pid: Optional[int]):
+        """Add another process's snapshot to `merged`; counters sum"""
+        for labels, value in values.items():
+            merged[labels] = merged.get(labels, 0) + value
+
+    def render(self, values: Optional[Dict[Tuple[str, ...], Any]] = None) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        items = list((values if values is not None else self.snapshot()).items())
+        labelnames = self._rendered_labelnames(values)
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(labelnames, labels)} {_format_value(value)}")
+        return lines
+
+    def _rendered_labelnames(self, values: Optional[Dict]) -> Tuple[str, ...]:
+        return self.labelnames
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, *labels: str, amount: float = 1):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._function = None
+
+    def set(self, value: float, *labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function: Callable[[], float]):
+        """Read the value from `function` at scrape time (unlabelled gauges only)"""
+        self._function = function
+
+    def snapshot(self) -> Dict[Tuple[str, ...], Any]:
+        if self._function is not None:
+            try:
+                self.set(self._function())
+            except Exception:
+                pass
+        return super().snapshot()
+
+    def merge(self, merged: Dict[Tuple[str, ...], Any], values: Dict[Tuple[str, ...], Any], pid: Optional[int]):
+        """Gauges don't add up across processes, so each keeps its own series with a pid label"""
+        if pid is None:
+            return
+        for labels, value in values.items():
+            merged[labels + (str(pid),)] = value
+
+    def _rendered_labelnames(self, values: Optional[Dict]) -> Tuple[str, ...]:
+        return self.labelnames + ('pid',) if values is not None else self.labelnames
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str):
+        self._observe(value, labels)
+
+    def _observe(self, value: float, labels: Tuple[str, ...]):
+        # Per-bucket (non-cumulative) counts keep observe() to one increment
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[self._key(labels)] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, *labels: str) -> 'Timer':
+        return Timer(self, labels)
+
+    def count(self, *labels: str) -> int:
+        series = self._values.get(labels)
+        return series[2] if series else 0
+
+    def total(self, *labels: str) -> float:
+        series = self._values.get(labels)
+        return series[1] if series else 0.0
+
+    def totals(self) -> Dict[Tuple[str, ...], float]:
+        """Summed observations per label set"""
+        with self._lock:
+            return {labels: series[1] for labels, series in self._values.items()}
+
+    def snapshot(self) -> Dict[Tuple[str, ...], Any]:
+        with self._lock:
+            return {labels: [list(counts), total, n] for labels, (counts, total, n) in self._values.items()}
+
+    def merge(self, merged: Dict[Tuple[str, ...], Any], values: Dict[Tuple[str, ...], Any], pid: Optional[int]):
+        for labels, (counts, total, n) in values.items():
+            series = merged.get(labels)
+            if series is None:
+                merged[labels] = [list(counts), total, n]
+                continue
+            series[0] = [a + b for a, b in zip(series[0], counts)]
+            series[1] += total
+            series[2] += n
+
+    def render(self, values: Optional[Dict[Tuple[str, ...], Any]] = None) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        items = list((values if values is not None else self.snapshot()).items())
+        for labels, (counts, total, n) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {n}")
+        return lines
+
+class Timer:
+    """Context manager that observes elapsed seconds into a histogram"""
+
+    __slots__ = ('histogram', 'labels', 'start')
+
+    def __init__(self, histogram: Histogram, labels: Tuple[str, ...]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> 'Timer':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram._observe(time.perf_counter() - self.start, self.labels)
+        return False
+
+class MetricsRegistry:
+    """Process-local metrics rendered in the Prometheus text exposition format
+
+    With `multiprocess` set (see MultiprocessMetrics), render() merges in
+    the other processes' snapshots.
+    """
+
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def __init__(self, namespace: str = 'healthnet'):
+        self.namespace = namespace
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        self.multiprocess: Optional['MultiprocessMetrics'] = None
+
+    def _register(self, cls, name: str, documentation: str, labelnames: Tuple[str, ...], **kwargs) -> _Metric:
+        full_name = f"{self.namespace}_{name}" if self.namespace else name
+        with self._lock:
+            metric = self._metrics.get(full_name)
+            if metric is None:
+                metric = self._metrics[full_name] = cls(full_name, documentation, tuple(labelnames), **kwargs)
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Optional[Tuple[float, ...]] = None) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets or DEFAULT_BUCKETS)
+
+    def snapshot(self) -> Dict[str, Dict[Tuple[str, ...], Any]]:
+        """Current values of every metric, by full name"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        snapshots = self.multiprocess.read_others() if self.multiprocess is not None else None
+        lines = []
+        for metric in metrics:
+            if snapshots is None:
+                lines.extend(metric.render())
+                continue
+            merged = {}
+            metric.merge(merged, metric.snapshot(), os.getpid())
+            for pid, snapshot in snapshots:
+                metric.merge(merged, snapshot.get(metric.name, {}), pid)
+            lines.extend(metric.render(merged))
+        return '\n'.join(lines) + '\n'
+
+class MultiprocessMetrics:
+    """Metrics of several processes sharing one registry definition, merged at scrape time
+
+    Every process writes a snapshot of its registry to `directory` (the
+    pre-fork master in its supervision loop, workers from a thread every
+    `interval` seconds), and whichever process renders merges the others'
+    latest snapshots into its own values. Counters and histograms are summed,
+    including those of exited processes, which the master folds into one
+    archive file; gauges get a `pid` label per live process.
+    """
+
+    ARCHIVE = 'exited.pickle'
+
+    def __init__(self, registry: MetricsRegistry, directory: Path, interval: float = 1.0):
+        self.registry = registry
+        self.directory = Path(directory)
+        self.interval = interval
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, pid: int) -> Path:
+        return self.directory / f"{pid}.pickle"
+
+    def write(self):
+        """Write this process's snapshot, replacing its previous one"""
+        path = self._path(os.getpid())
+        temporary = path.with_suffix('.tmp')
+        with open(temporary, 'wb') as f:
+            pickle.dump(self.registry.snapshot(), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+
+    def start(self):
+        """Write snapshots from a daemon thread every interval"""
+        def run():
+            while True:
+                time.sleep(self.interval)
+                try:
+                    self.write()
+                except OSError:
+                    pass
+        threading.Thread(target=run, name='metrics-snapshot', daemon=True).start()
+
+    def read_others(self) -> List[Tuple[Optional[int], Dict[str, Any]]]:
+        """(pid, snapshot) of every other process; the archive of exited ones has pid None"""
+        snapshots = []
+        for path in self.directory.glob('*.pickle'):
+            pid = None if path.name == self.ARCHIVE else int(path.stem)
+            if pid == os.getpid():
+                continue
+            snapshot = self._load(path)
+            if snapshot is not None:
+                snapshots.append((pid, snapshot))
+        return snapshots
+
+    def retire(self, pid: int):
+        """Fold an exited process's counters and histograms into the archive"""
+        path = self._path(pid)
+        snapshot = self._load(path)
+        if snapshot is not None:
+            archive_path = self.directory / self.ARCHIVE
+            archive = self._load(archive_path) or {}
+            with self.registry._lock:
+                metrics = dict(self.registry._metrics)
+            for name, values in snapshot.items():
+                metric = metrics.get(name)
+                if metric is None or isinstance(metric, Gauge):
+                    continue
+                metric.merge(archive.setdefault(name, {}), values, None)
+            temporary = archive_path.with_suffix('.tmp')
+            with open(temporary, 'wb') as f:
+                pickle.dump(archive, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, archive_path)
+        path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _load(path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+REGISTRY = MetricsRegistry()
+
+STAGE_DURATION = REGISTRY.histogram(
+    'pipeline_stage_duration_seconds',
+    'Time spent in each data/ML pipeline stage',
+    ('stage',)
+)
+
+def stage_timer(stage: str) -> Timer:
+    """Time a pipeline stage: `with stage_timer('csv_read'): ...`"""
+    return Timer(STAGE_DURATION, (stage,))
@@ -0,0 +1,95 @@
+import json
+import re
+from pathlib import Path
+import logging
+from typing import Dict, List, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+class RegionHierarchy:
+    """District -> state -> Northeast hierarchy used for regional rollups.
+
+    Built from the GADM level 2 GeoJSON the frontend map uses, so region
+    names line up with NortheastMap. Falls back to the Manipur districts the
+    service has always served if the file is missing.
+    """
+
+    ROOT = 'Northeast'
+
+    def __init__(self, geojson_path: Optional[Path] = None):
+        self.geojson_path = geojson_path or (
+            Path(__file__).parent.parent.parent / "public" / "data" / "geojson" / "gadm_NE_level2.geojson"
+        )
+        self.states = {}
+        self.district_state = {}
+        self._lookup = {}
+        self._load()
+
+    def _load(self):
+        """Read district and state names from the GeoJSON"""
+        try:
+            with open(self.geojson_path, encoding='utf-8') as f:
+                features = json.load(f)['features']
+
+            for feature in features:
+                properties = feature['properties']
+                self._add(self._display_name(properties['NAME_2']), self._display_name(properties['NAME_1']))
+
+            logger.info(f"Loaded region hierarchy: {len(self.district_state)} districts in {len(self.states)} states")
+
+        except Exception as e:
+            logger.warning(f"Could not load region hierarchy from {self.geojson_path}: {str(e)}")
+            for district in ["Imphal East", "Imphal West", "Bishnupur", "Senapati", "Churachandpur"]:
+                self._add(district, 'Manipur')
+
+        self._lookup[self._key(self.ROOT)] = ('region', self.ROOT)
+        for state in self.states:
+            self._lookup[self._key(state)] = ('state', state)
+        for district in self.district_state:
+            self._lookup.setdefault(self._key(district), ('district', district))
+
+    def _add(self, district: str, state: str):
+        self.states.setdefault(state, [])
+        if district not in self.district_state:
+            self.states[state].append(district)
+            self.district_state[district] = state
+
+    def _display_name(self, name: str) -> str:
+        """GADM names are run together ('ImphalEast'); split them into words"""
+        return re.sub(r'(?<=[a-z])(?=[A-Z])', ' ', name).strip()
+
+    def _key(self, name: str) -> str:
+        return re.sub(r'[^a-z0-9]', '', name.lower())
+
+    def resolve(self, name: str) -> Optional[Dict[str, Any]]:
+        """Resolve a district, state or 'Northeast' to its level and districts"""
+        match = self._lookup.get(self._key(name))
+
+        if match is None:
+            return None
+
+        level, canonical = match
+        if level == 'region':
+            districts = list(self.district_state)
+        elif level == 'state':
+            districts = list(self.states[canonical])
+        else:
+            districts = [canonical]
+
+        return {'name': canonical, 'level': level, 'districts': districts}
+
+    def canonical_district(self, name: str) -> str:
+        """Hierarchy spelling of a district name, or the name unchanged if unknown"""
+        return self.known_district(name) or name
+
+    def known_district(self, name: str) -> Optional[str]:
+        """Hierarchy spelling of a district name, or None if it is not a known district"""
+        match = self._lookup.get(self._key(name))
+        return match[1] if match and match[0] == 'district' else None
+
+    def get_hierarchy(self) -> Dict[str, Any]:
+        """Nested view of the hierarchy"""
+        return {
+            'name': self.ROOT,
+            'states': {state: list(districts) for state, districts in self.states.items()}
+        }
@@ -0,0 +1,217 @@
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = ('week', 'month', 'season')
+DIMENSIONS = ('district', 'disease', 'bucket')
+
+# Summed measures; the environmental ones are reported as means
+MEASURES = ['cases', 'temperature', 'humidity', 'rainfall', 'water_quality', 'population_density', 'vaccination_rate']
+
+# Seasons as the source CSVs split the year; winter runs Nov-Jan, so its
+# January belongs to the season that started the November before
+SEASONS = {
+    11: 'winter', 12: 'winter', 1: 'winter',
+    2: 'pre_monsoon', 3: 'pre_monsoon', 4: 'pre_monsoon', 5: 'pre_monsoon',
+    6: 'monsoon', 7: 'monsoon',
+    8: 'post_monsoon', 9: 'post_monsoon', 10: 'post_monsoon'
+}
+SEASON_START_MONTH = np.array([0, 11, 2, 2, 2, 2, 6, 6, 8, 8, 8, 11, 11])
+
+
+def bucket_starts(dates: pd.Series, granularity: str) -> np.ndarray:
+    """First day of the week (Monday), month or season of each date, as datetime64[D]"""
+    days = dates.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]')
+    if granularity == 'week':
+        # 1970-01-01 was a Thursday
+        return days - ((days.astype(np.int64) + 3) % 7).astype('timedelta64[D]')
+    months = days.astype('datetime64[M]')
+    if granularity == 'month':
+        return months.astype('datetime64[D]')
+    if granularity == 'season':
+        month_index = months.astype(np.int64)
+        month = month_index % 12 + 1
+        start_month = SEASON_START_MONTH[month]
+        year = month_index // 12 - (month < start_month)
+        return (year * 12 + start_month - 1).astype('datetime64[M]').astype('datetime64[D]')
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+def bucket_label(start: pd.Timestamp, granularity: str) -> str:
+    if granularity == 'week':
+        year, week, _ = start.isocalendar()
+        return f"{year}-W{week:02d}"
+    if granularity == 'month':
+        return start.strftime('%Y-%m')
+    return f"{start.year} {SEASONS[start.month]}"
+
+
+class _CubeLevel:
+    """Sums per (district, disease, bucket) at one granularity, in growable arrays"""
+
+    def __init__(self, granularity: str):
+        self.granularity = granularity
+        self.positions = {}
+        self.size = 0
+        self.districts = np.empty(0, dtype=object)
+        self.diseases = np.empty(0, dtype=object)
+        self.buckets = np.empty(0, dtype='datetime64[D]')
+        # records, then each measure's sum and non-missing count
+        self.values = np.zeros((0, 1 + 2 * len(MEASURES)))
+
+    def add(self, districts: np.ndarray, diseases: np.ndarray, buckets: np.ndarray, values: np.ndarray):
+        """Fold rows already aggregated per key into the cube"""
+        rows = np.empty(len(districts), dtype=np.intp)
+        new = []
+        # Plain Python keys hash far faster than numpy scalars
+        keys = zip(districts.tolist(), diseases.tolist(), buckets.astype(np.int64).tolist())
+        for i, key in enumerate(keys):
+            position = self.positions.get(key)
+            if position is None:
+                position = self.positions[key] = self.size + len(new)
+                new.append(i)
+            rows[i] = position
+
+        if new:
+            self._grow(self.size + len(new))
+            end = self.size + len(new)
+            self.districts[self.size:end] = districts[new]
+            self.diseases[self.size:end] = diseases[new]
+            self.buckets[self.size:end] = buckets[new]
+            self.size = end
+        # Keys are unique after aggregation, so a buffered add is safe
+        self.values[rows] += values
+
+    def _grow(self, size: int):
+        capacity = len(self.buckets)
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2, 64)
+        self.districts = np.resize(self.districts, capacity)
+        self.diseases = np.resize(self.diseases, capacity)
+        self.buckets = np.resize(self.buckets, capacity)
+        values = np.zeros((capacity, self.values.shape[1]))
+        values[:len(self.values)] = self.values
+        self.values = values
+
+
+class RollupCube:
+    """Pre-aggregated cases and environmental measures by district, disease and time bucket.
+
+    Kept at week, month and season granularity. Each cell holds the record
+    count and, per measure, the sum and the count of non-missing values, so
+    cells roll up by addition and means are exact at any grouping. New
+    records are aggregated on their own and added to the matching cells, so
+    an ingest batch costs O(batch), not a rebuild.
+    """
+
+    def __init__(self):
+        self.levels = {granularity: _CubeLevel(granularity) for granularity in GRANULARITIES}
+        self.records = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'RollupCube':
+        cube = cls()
+        cube.add(df)
+        return cube
+
+    def add(self, df: pd.DataFrame):
+        """Aggregate records and add them to every granularity"""
+        if df is None or df.empty or not {'district', 'disease', 'date'} <= set(df.columns):
+            return
+        dates = df['date']
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates, errors='coerce')
+        valid = (dates.notna() & df['district'].notna() & df['disease'].notna()).to_numpy()
+        if not valid.any():
+            return
+
+        frame = pd.DataFrame({'district': df['district'].to_numpy()[valid], 'disease': df['disease'].to_numpy()[valid]})
+        columns = ['records']
+        frame['records'] = 1.0
+        for measure in MEASURES:
+            if measure in df.columns:
+                values = pd.to_numeric(df[measure], errors='coerce').to_numpy(dtype=float)[valid]
+            else:
+                values = np.full(int(valid.sum()), np.nan)
+            frame[f"{measure}_sum"] = np.nan_to_num(values)
+            frame[f"{measure}_count"] = (~np.isnan(values)).astype(float)
+            columns += [f"{measure}_sum", f"{measure}_count"]
+        dates = dates[valid]
+
+        with self._lock:
+            for granularity, level in self.levels.items():
+                frame['bucket'] = bucket_starts(dates, granularity)
+                grouped = frame.groupby(['district', 'disease', 'bucket'], sort=False)[columns].sum()
+                level.add(
+                    grouped.index.get_level_values(0).to_numpy(dtype=object),
+                    grouped.index.get_level_values(1).to_numpy(dtype=object),
+                    grouped.index.get_level_values(2).to_numpy(dtype='datetime64[D]'),
+                    grouped.to_numpy()
+                )
+            self.records += int(valid.sum())
+
+    def query(self, granularity: str = 'month', start: Optional[str] = None, end: Optional[str] = None,
+              districts: Optional[Sequence[str]] = None, diseases: Optional[Sequence[str]] = None,
+              group_by: Sequence[str] = DIMENSIONS) -> List[Dict[str, Any]]:
+        """Cells whose bucket starts within [start, end], filtered and rolled up to `group_by`"""
+        if granularity not in self.levels:
+            raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+        unknown = [dimension for dimension in group_by if dimension not in DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Cannot group by {', '.join(unknown)}; use {', '.join(DIMENSIONS)}")
+
+        level = self.levels[granularity]
+        with self._lock:
+            size = level.size
+            mask = np.ones(size, dtype=bool)
+            if start is not None:
+                mask &= level.buckets[:size] >= np.datetime64(pd.Timestamp(start).date(), 'D')
+            if end is not None:
+                mask &= level.buckets[:size] <= np.datetime64(pd.Timestamp(end).date(), 'D')
+            if districts:
+                mask &= np.isin(level.districts[:size], list(districts))
+            if diseases:
+                mask &= np.isin(level.diseases[:size], list(diseases))
+            cells = pd.DataFrame(level.values[:size][mask], columns=self._value_columns())
+            cells['district'] = level.districts[:size][mask]
+            cells['disease'] = level.diseases[:size][mask]
+            cells['bucket'] = level.buckets[:size][mask]
+
+        if cells.empty:
+            return []
+        group_by = [dimension for dimension in DIMENSIONS if dimension in group_by]
+        if group_by:
+            cells = cells.groupby(group_by, sort=True)[self._value_columns()].sum().reset_index()
+        else:
+            cells = cells[self._value_columns()].sum().to_frame().T
+
+        rows = []
+        for cell in cells.to_dict('records'):
+            row = {dimension: cell[dimension] for dimension in group_by if dimension != 'bucket'}
+            if 'bucket' in group_by:
+                bucket = pd.Timestamp(cell['bucket'])
+                row['bucket'] = bucket.date().isoformat()
+                row['label'] = bucket_label(bucket, granularity)
+            row['records'] = int(cell['records'])
+            row['cases'] = round(float(cell['cases_sum']), 2)
+            for measure in MEASURES[1:]:
+                count = cell[f"{measure}_count"]
+                row[f"{measure}_mean"] = round(float(cell[f"{measure}_sum"] / count), 3) if count else None
+            rows.append(row)
+        return rows
+
+    def _value_columns(self) -> List[str]:
+        return ['records'] + [f"{measure}_{part}" for measure in MEASURES for part in ('sum', 'count')]
+
+    def get_info(self) -> Dict[str, Any]:
+        return {
+            'records': self.records,
+            'cells': {granularity: level.size for granularity, level in self.levels.items()}
+        }
@@ -0,0 +1,405 @@
+"""
+Pre-fork production server for the AI prediction service
+
+The master process imports the app, loads the CSV data and trains every
+model once, then forks worker processes that serve requests from a shared
+listening socket. Workers inherit the trained models copy-on-write, so
+startup cost is paid once and memory for the models' arrays is shared.
+
+The master owns the models: a worker's /refresh asks the master to retrain
+over a control pipe, and records a worker ingests reach the master through
+the ingest log, which it reads every second. Whenever its state changes the
+master re-forks the workers with a rolling restart (at most once per
+refork_interval for ingest alone), so every worker serves the same models.
+
+Worker lifecycle:
+- Each worker reports readiness to the master over a pipe once uvicorn
+  has started accepting connections.
+- Workers exit gracefully after max_requests (plus per-worker jitter) and
+  the master forks a replacement, bounding memory growth.
+- SIGHUP reloads the data and retrains in the master, then triggers a
+  rolling restart: each worker is replaced only after its replacement is
+  ready. SIGTERM/SIGINT shut everything down gracefully.
+
+Every process writes a snapshot of its metrics to a shared directory, so
+/metrics on any worker reports all of them (see MultiprocessMetrics).
+
+Requires a POSIX system (os.fork).
+"""
+
+import gc
+import importlib
+import logging
+import multiprocessing
+import os
+import random
+import select
+import shutil
+import signal
+import socket
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+
+import numpy as np
+import uvicorn
+
+from ml_models.metrics import REGISTRY, MultiprocessMetrics
+
+logger = logging.getLogger(__name__)
+
+
+class ReadyNotifyingServer(uvicorn.Server):
+    """uvicorn Server that writes to a pipe once it is accepting connections"""
+
+    def __init__(self, config: uvicorn.Config, ready_fd: int):
+        super().__init__(config)
+        self.ready_fd = ready_fd
+
+    async def startup(self, sockets=None):
+        await super().startup(sockets=sockets)
+        if self.started:
+            os.write(self.ready_fd, b"1")
+        os.close(self.ready_fd)
+
+
+class MasterLink:
+    """A worker's end of its control pipe to the master"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.lock = threading.Lock()
+
+    def request(self, command: str, **arguments) -> Any:
+        """Run a command in the master and return its result"""
+        with self.lock:
+            self.connection.send((command, arguments))
+            status, result = self.connection.recv()
+        if status != "ok":
+            raise RuntimeError(f"Master could not {command}: {result}")
+        return result
+
+
+class PreforkServer:
+    def __init__(self, app_module: str = "app", host: str = "0.0.0.0", port: int = 8000,
+                 workers: Optional[int] = None, max_requests: int = 0, max_requests_jitter: int = 0,
+                 graceful_timeout: int = 30, refork_interval: float = 10.0, log_level: str = "info"):
+        self.app_module_name = app_module
+        self.host = host
+        self.port = port
+        self.num_workers = workers or os.cpu_count() or 1
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.refork_interval = refork_interval
+        self.log_level = log_level
+
+        self.app_module = None
+        self.metrics = None
+        self.socket = None
+        self.workers: Dict[int, Dict[str, Any]] = {}
+        self.retiring = deque()
+        self.replacing: Optional[int] = None
+        self.shutting_down = False
+        self.restart_requested = False
+        self.refork_at: Optional[float] = None
+        self.last_refork = time.time()
+
+    def run(self):
+        """Preload models, fork workers and supervise them until shutdown"""
+        if not hasattr(os, "fork"):
+            raise RuntimeError("Production mode requires a POSIX system (os.fork)")
+
+        logger.info("Preloading data and models in master process...")
+        self.app_module = importlib.import_module(self.app_module_name)
+        if self.app_module.ingest_buffer.log_path is None:
+            raise RuntimeError("Production mode needs an ingest log (INGEST_LOG_PATH) to pass ingested records to the master")
+        self.app_module.initialize_models()
+
+        self.metrics = MultiprocessMetrics(REGISTRY, tempfile.mkdtemp(prefix="healthnet-metrics-"))
+        REGISTRY.multiprocess = self.metrics
+
+        # Move preloaded objects out of the GC's tracked generations so that
+        # collections in the workers don't touch (and copy) their pages
+        gc.collect()
+        gc.freeze()
+
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind((self.host, self.port))
+        self.socket.listen(2048)
+        self.socket.set_inheritable(True)
+
+        signal.signal(signal.SIGTERM, self._handle_shutdown)
+        signal.signal(signal.SIGINT, self._handle_shutdown)
+        signal.signal(signal.SIGHUP, self._handle_restart)
+
+        logger.info(f"Master {os.getpid()} listening on {self.host}:{self.port}, starting {self.num_workers} workers")
+        for _ in range(self.num_workers):
+            self._spawn_worker()
+
+        try:
+            while not self.shutting_down:
+                self._poll_workers(timeout=1.0)
+                self._reap_workers()
+                if self.restart_requested:
+                    self._reload_models()
+                    self._begin_rolling_restart()
+                self._apply_logged_ingest()
+                if self.refork_at is not None and time.time() >= self.refork_at:
+                    self._begin_rolling_restart()
+                self._continue_rolling_restart()
+                self._remove_replaced_state()
+                self._write_metrics()
+        finally:
+            self._stop_workers()
+            self.socket.close()
+            shutil.rmtree(self.metrics.directory, ignore_errors=True)
+            logger.info("Master shut down")
+
+    def _reload_models(self):
+        """Reload the data and retrain everything for SIGHUP"""
+        logger.info("Reloading data and models in master process...")
+        try:
+            self.app_module.initialize_models()
+        except Exception as e:
+            logger.error(f"Error reloading models, restarting workers with the current ones: {str(e)}")
+
+    def _apply_logged_ingest(self):
+        try:
+            applied = self.app_module.apply_logged_ingest()
+        except Exception as e:
+            # The records stay in the log and are restored by the next refresh
+            logger.error(f"Error applying ingested records: {str(e)}")
+            return
+        if applied is not None:
+            self._request_refork(self.last_refork + self.refork_interval)
+
+    def _request_refork(self, at: float):
+        """Roll the workers onto the master's current state no later than `at`"""
+        self.refork_at = at if self.refork_at is None else min(self.refork_at, at)
+
+    def _handle_command(self, pid: int, info: Dict[str, Any]):
+        connection = info["control"]
+        try:
+            command, arguments = connection.recv()
+        except (EOFError, OSError):
+            # The worker exited; _reap_workers handles it
+            connection.close()
+            info["control"] = None
+            return
+
+        try:
+            if command != "refresh":
+                raise ValueError(f"unknown command {command!r}")
+            result = self.app_module.refresh_models(**arguments)
+            if result["decision"]["decision"] != "skip":
+                self._request_refork(time.time())
+            reply = ("ok", result)
+        except Exception as e:
+            logger.error(f"Error handling {command} from worker {pid}: {str(e)}")
+            reply = ("error", str(e))
+
+        try:
+            connection.send(reply)
+        except OSError:
+            pass
+
+    def _spawn_worker(self, replaces: Optional[int] = None) -> int:
+        read_fd, write_fd = os.pipe()
+        control, worker_control = multiprocessing.Pipe()
+        max_requests = 0
+        if self.max_requests > 0:
+            max_requests = self.max_requests + random.randint(0, self.max_requests_jitter)
+
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            control.close()
+            for info in self.workers.values():
+                if info["control"] is not None:
+                    info["control"].close()
+            self.app_module.master_link = MasterLink(worker_control)
+            self._run_worker(write_fd, max_requests)
+            os._exit(0)
+
+        os.close(write_fd)
+        worker_control.close()
+        self.workers[pid] = {
+            "ready_fd": read_fd,
+            "control": control,
+            "ready": False,
+            "started_at": time.time(),
+            "replaces": replaces
+        }
+        return pid
+
+    def _run_worker(self, ready_fd: int, max_requests: int):
+        """Worker body: serve the preloaded app on the inherited socket"""
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(sig, signal.SIG_DFL)
+        # Don't let every worker replay the master's random stream
+        random.seed()
+        np.random.seed()
+
+        config = uvicorn.Config(
+            self.app_module.app,
+            log_level=self.log_level,
+            limit_max_requests=max_requests or None,
+            timeout_graceful_shutdown=self.graceful_timeout
+        )
+        server = ReadyNotifyingServer(config, ready_fd)
+        self.metrics.start()
+        try:
+            server.run(sockets=[self.socket])
+        except Exception as e:
+            logger.error(f"Worker {os.getpid()} crashed: {str(e)}")
+            os._exit(1)
+        self.metrics.write()
+
+    def _poll_workers(self, timeout: float):
+        """Wait for readiness reports and control commands from the workers"""
+        pending = {
+            info["ready_fd"]: pid for pid, info in self.workers.items()
+            if info["ready_fd"] is not None
+        }
+        commands = {
+            info["control"].fileno(): pid for pid, info in self.workers.items()
+            if info["control"] is not None
+        }
+        if not pending and not commands:
+            time.sleep(timeout)
+            return
+
+        readable, _, _ = select.select(list(pending) + list(commands), [], [], timeout)
+
+        for fd in readable:
+            if fd in commands:
+                pid = commands[fd]
+                if pid in self.workers and self.workers[pid]["control"] is not None:
+                    self._handle_command(pid, self.workers[pid])
+                continue
+
+            pid = pending[fd]
+            info = self.workers[pid]
+            info["ready"] = os.read(fd, 1) == b"1"
+            os.close(fd)
+            info["ready_fd"] = None
+
+            if not info["ready"]:
+                continue  # Exited before it was ready; _reap_workers handles it
+
+            logger.info(f"Worker {pid} ready in {time.time() - info['started_at']:.2f}s")
+            if info["replaces"] is not None:
+                self._signal(info["replaces"], signal.SIGTERM)
+                self.replacing = None
+
+    def _reap_workers(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+
+            info = self.workers.pop(pid, None)
+            if info is None:
+                continue
+            self.metrics.retire(pid)
+            if info["ready_fd"] is not None:
+                os.close(info["ready_fd"])
+            if info["control"] is not None:
+                info["control"].close()
+
+            if info.get("retired"):
+                logger.info(f"Worker {pid} retired")
+                continue
+
+            logger.info(f"Worker {pid} exited with code {os.waitstatus_to_exitcode(status)}")
+            if self.shutting_down:
+                continue
+
+            old_pid = info["replaces"]
+            if old_pid is not None and not info["ready"]:
+                # Replacement failed during a rolling restart: keep the old worker and retry
+                self.replacing = None
+                if old_pid in self.workers:
+                    self.workers[old_pid]["retired"] = False
+                    self.retiring.appendleft(old_pid)
+                continue
+
+            new_pid = self._spawn_worker()
+            logger.info(f"Spawned worker {new_pid} to replace {pid}")
+
+    def _begin_rolling_restart(self):
+        self.restart_requested = False
+        self.refork_at = None
+        self.last_refork = time.time()
+        # Let the replaced models be collected, then freeze the new ones for the next forks
+        gc.unfreeze()
+        gc.collect()
+        gc.freeze()
+
+        current = [pid for pid in self.workers if pid not in self.retiring]
+        self.retiring.extend(current)
+        logger.info(f"Rolling restart of {len(current)} workers")
+
+    def _continue_rolling_restart(self):
+        if self.replacing is not None or not self.retiring:
+            return
+
+        old_pid = self.retiring.popleft()
+        if old_pid not in self.workers:
+            return
+        self.workers[old_pid]["retired"] = True
+        self.replacing = self._spawn_worker(replaces=old_pid)
+
+    def _write_metrics(self):
+        try:
+            self.metrics.write()
+        except OSError as e:
+            logger.warning(f"Could not write master metrics: {str(e)}")
+
+    def _remove_replaced_state(self):
+        """Delete what the workers' old state referenced once none of them can read it"""
+        if self.refork_at is not None or self.retiring or self.replacing is not None:
+            return
+        if any(info.get("retired") for info in self.workers.values()):
+            return
+        self.app_module.remove_replaced_state()
+
+    def _stop_workers(self):
+        for pid in list(self.workers):
+            self._signal(pid, signal.SIGTERM)
+
+        deadline = time.time() + self.graceful_timeout
+        while self.workers and time.time() < deadline:
+            for pid in list(self.workers):
+                try:
+                    done, _ = os.waitpid(pid, os.WNOHANG)
+                except ChildProcessError:
+                    done = pid
+                if done:
+                    info = self.workers.pop(pid, None)
+                    if info is not None and info["control"] is not None:
+                        info["control"].close()
+            time.sleep(0.1)
+
+        for pid in list(self.workers):
+            logger.warning(f"Worker {pid} did not stop in time, killing it")
+            self._signal(pid, signal.SIGKILL)
+
+    def _signal(self, pid: int, sig: int):
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def _handle_shutdown(self, signum, frame):
+        self.shutting_down = True
+
+    def _handle_restart(self, signum, frame):
+        self.restart_requested = True
@@ -0,0 +1,454 @@
+"""
+On-demand profiling for the AI prediction service
+
+Opt-in and admin-only: nothing here runs unless PROFILING_ADMIN_TOKEN is
+set and a request presents it. Three capture modes are supported:
+
+- cprofile: deterministic cProfile of the event loop thread plus work handed
+  to the threadpool through run_in_capture(), downloadable as a pstats file
+  (snakeviz, flameprof, `python -m pstats`) or as text
+- sample: a background thread samples the same threads' stacks every few
+  milliseconds and counts collapsed stacks, the format flamegraph.pl and
+  speedscope read directly
+- memory: tracemalloc snapshots taken around load_csv_data/train_models,
+  reported as the top allocation deltas plus peak traced memory
+
+A single request is profiled with `X-Profile: cprofile|sample` (or
+`?profile=...`) plus `X-Admin-Token` (or `?admin_token=...`); the response
+carries `X-Profile-Id`. POST /debug/profile profiles the next N requests or
+a timed window. Captures are kept in a small in-memory ring.
+"""
+
+import asyncio
+import cProfile
+import hmac
+import io
+import itertools
+import logging
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, Optional
+from urllib.parse import parse_qs
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ('cprofile', 'sample')
+PROFILE_FORMATS = {
+    'cprofile': ('pstats', 'text'),
+    'sample': ('collapsed', 'text'),
+    'memory': ('text',),
+}
+
+
+class ProfileCapture:
+    """One finished profile held for download"""
+
+    def __init__(self, kind: str, label: str, duration: float, data: Any, session_id: Optional[str] = None):
+        self.id = None
+        self.kind = kind
+        self.label = label
+        self.duration = duration
+        self.data = data
+        self.session_id = session_id
+        self.created_at = datetime.now().isoformat()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'label': self.label,
+            'duration_seconds': round(self.duration, 6),
+            'session_id': self.session_id,
+            'created_at': self.created_at,
+            'formats': list(PROFILE_FORMATS[self.kind]),
+        }
+
+    def render(self, fmt: Optional[str] = None) -> bytes:
+        """Encode the capture; the first listed format is the default"""
+        fmt = fmt or PROFILE_FORMATS[self.kind][0]
+        if fmt not in PROFILE_FORMATS[self.kind]:
+            raise ValueError(f"{self.kind} profiles support formats {PROFILE_FORMATS[self.kind]}")
+
+        if self.kind == 'cprofile':
+            if fmt == 'pstats':
+                # Same layout Profile.dump_stats writes, so pstats.Stats(path) loads it
+                return marshal.dumps(self.data)
+            stats = pstats.Stats(_StatsHolder(self.data), stream=io.StringIO())
+            stats.sort_stats('cumulative').print_stats(50)
+            return stats.stream.getvalue().encode('utf-8')
+
+        if self.kind == 'sample':
+            stacks = sorted(self.data.items(), key=lambda item: item[1], reverse=True)
+            if fmt == 'collapsed':
+                return ''.join(f"{stack} {count}\n" for stack, count in stacks).encode('utf-8')
+            total = sum(self.data.values()) or 1
+            lines = [f"{count:>7} {100.0 * count / total:5.1f}%  {stack.rsplit(';', 1)[-1]}" for stack, count in stacks[:50]]
+            return ('\n'.join([f"{total} samples"] + lines) + '\n').encode('utf-8')
+
+        return self.data.encode('utf-8')
+
+
+class _StatsHolder:
+    """Minimal object pstats.Stats accepts in place of a Profile"""
+
+    def __init__(self, stats: Dict):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+class StackSampler:
+    """Samples the Python stacks of a set of threads at a fixed interval"""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_ids = {thread_id}
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self) -> 'StackSampler':
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self):
+        own_frames = sys._current_frames
+        while not self._stop.wait(self.interval):
+            frames = own_frames()
+            for thread_id in list(self.thread_ids):
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.stacks[';'.join(reversed(names))] += 1
+
+
+class _ActiveProfile:
+    """A running capture started by begin() and finished by end()"""
+
+    def __init__(self, mode: str, thread_id: int, interval: float):
+        self.mode = mode
+        self.start = time.perf_counter()
+        self.worker_stats = []
+        if mode == 'cprofile':
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        else:
+            self.profiler = StackSampler(thread_id, interval).start()
+
+    def run(self, function, *args, **kwargs):
+        """Run blocking work on the calling worker thread as part of this capture"""
+        if self.mode == 'cprofile':
+            worker = cProfile.Profile()
+            worker.enable()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                worker.disable()
+                worker.create_stats()
+                self.worker_stats.append(worker.stats)
+
+        thread_id = threading.get_ident()
+        self.profiler.thread_ids.add(thread_id)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            self.profiler.thread_ids.discard(thread_id)
+
+    def end(self):
+        duration = time.perf_counter() - self.start
+        if self.mode == 'cprofile':
+            self.profiler.disable()
+            stats = pstats.Stats(self.profiler, stream=io.StringIO())
+            for worker_stats in self.worker_stats:
+                stats.add(_StatsHolder(worker_stats))
+            return duration, stats.stats
+        return duration, dict(self.profiler.stop())
+
+
+class Profiler:
+    """Admin-gated request profiling, profiling sessions and memory snapshots"""
+
+    def __init__(self, admin_token: Optional[str] = None, max_captures: int = 32,
+                 sample_interval: float = 0.005, always_trace_memory: bool = False):
+        self.admin_token = admin_token
+        self.max_captures = max_captures
+        self.sample_interval = sample_interval
+        self.always_trace_memory = always_trace_memory
+        self.captures = OrderedDict()
+        self.session = None
+        self._ids = itertools.count(1)
+        self._session_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        # cProfile hooks are per thread and only one profiler can own a thread,
+        # so at most one capture runs at a time
+        self._busy = threading.Lock()
+        self._active = None
+        self._window = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.admin_token)
+
+    def is_admin(self, token: Optional[str]) -> bool:
+        return self.enabled and token is not None and hmac.compare_digest(token, self.admin_token)
+
+    def reserve_id(self) -> str:
+        with self._lock:
+            return f"p{next(self._ids)}"
+
+    def store(self, capture: ProfileCapture, profile_id: Optional[str] = None) -> str:
+        capture.id = profile_id or self.reserve_id()
+        with self._lock:
+            self.captures[capture.id] = capture
+            while len(self.captures) > self.max_captures:
+                self.captures.popitem(last=False)
+        return capture.id
+
+    def get(self, profile_id: str) -> Optional[ProfileCapture]:
+        return self.captures.get(profile_id)
+
+    def begin(self, mode: str) -> Optional[_ActiveProfile]:
+        """Start profiling the calling thread, or None if a capture is already running"""
+        if not self._busy.acquire(blocking=False):
+            return None
+        try:
+            self._active = _ActiveProfile(mode, threading.get_ident(), self.sample_interval)
+            return self._active
+        except Exception:
+            self._busy.release()
+            raise
+
+    def end(self, active: _ActiveProfile, label: str, session_id: Optional[str] = None,
+            profile_id: Optional[str] = None) -> str:
+        self._active = None
+        try:
+            duration, data = active.end()
+        finally:
+            self._busy.release()
+        return self.store(ProfileCapture(active.mode, label, duration, data, session_id), profile_id)
+
+    def run_in_capture(self, function, *args, **kwargs):
+        """Call `function` from a threadpool worker so an active capture includes it"""
+        active = self._active
+        if active is None:
+            return function(*args, **kwargs)
+        return active.run(function, *args, **kwargs)
+
+    def start_session(self, mode: str, requests: Optional[int] = None, seconds: Optional[float] = None,
+                      trace_memory: bool = False) -> Dict[str, Any]:
+        """Profile the next `requests` requests, or everything for `seconds`"""
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"mode must be one of {PROFILE_MODES}")
+        if (requests is None) == (seconds is None):
+            raise ValueError("Specify exactly one of requests or seconds")
+        if requests is not None and requests <= 0:
+            raise ValueError("requests must be positive")
+        if seconds is not None and not 0 < seconds <= 300:
+            raise ValueError("seconds must be in (0, 300]")
+
+        with self._lock:
+            if self.session is not None and self.session['state'] == 'active':
+                raise RuntimeError(f"Profiling session {self.session['id']} is already active")
+
+            session = {
+                'id': f"s{next(self._session_ids)}",
+                'mode': mode,
+                'state': 'active',
+                'requests_remaining': requests,
+                'seconds': seconds,
+                'trace_memory': trace_memory,
+                'started_at': datetime.now().isoformat(),
+                'profile_ids': [],
+            }
+
+            if seconds is not None:
+                # Started on the calling (event loop) thread, which is the one profiled
+                self._window = self.begin(mode)
+                if self._window is None:
+                    raise RuntimeError("Another profile capture is running")
+                self._schedule(seconds, session)
+
+            self.session = session
+
+        logger.info(f"Started profiling session {session['id']}: mode={mode} requests={requests} seconds={seconds}")
+        return dict(session)
+
+    def _schedule(self, seconds: float, session: Dict[str, Any]):
+        # cProfile.disable() only clears the hook of the thread that calls it,
+        # so a window started from the event loop is also finished on it
+        try:
+            asyncio.get_running_loop().call_later(seconds, self._finish_window, session)
+        except RuntimeError:
+            timer = threading.Timer(seconds, self._finish_window, args=(session,))
+            timer.daemon = True
+            timer.start()
+
+    def _finish_window(self, session: Dict[str, Any]):
+        with self._lock:
+            if self.session is not session or session['state'] != 'active':
+                return
+            active, self._window = self._window, None
+            session['state'] = 'finished'
+        profile_id = self.end(active, f"window {session['seconds']}s", session['id'])
+        session['profile_ids'].append(profile_id)
+        logger.info(f"Finished profiling session {session['id']}")
+
+    def stop_session(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            session = self.session
+            if session is None or session['state'] != 'active':
+                return session
+            active, self._window = self._window, None
+            session['state'] = 'stopped'
+        if active is not None:
+            session['profile_ids'].append(self.end(active, 'window (stopped)', session['id']))
+        return dict(session)
+
+    def claim_request(self) -> Optional[Dict[str, Any]]:
+        """Take one slot of an active next-N-requests session, if any"""
+        with self._lock:
+            session = self.session
+            if session is None or session['state'] != 'active' or session['requests_remaining'] is None:
+                return None
+            session['requests_remaining'] -= 1
+            if session['requests_remaining'] <= 0:
+                session['state'] = 'finished'
+            return session
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            captures = [capture.summary() for capture in self.captures.values()]
+            session = dict(self.session) if self.session else None
+        return {
+            'session': session,
+            'tracing_memory': tracemalloc.is_tracing(),
+            'profiles': captures,
+        }
+
+    def _memory_requested(self) -> bool:
+        session = self.session
+        return self.always_trace_memory or (
+            session is not None and session['state'] == 'active' and session['trace_memory']
+        )
+
+    @contextmanager
+    def memory_snapshot(self, label: str):
+        """tracemalloc snapshot around a block when memory tracing is requested"""
+        if not self._memory_requested():
+            yield
+            return
+
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start(25)
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            after = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            if started:
+                tracemalloc.stop()
+
+            diffs = after.compare_to(before, 'lineno')
+            lines = [
+                f"{label}: peak {peak / 1e6:.1f} MB, current {current / 1e6:.1f} MB, {duration:.3f}s",
+                f"net change {sum(diff.size_diff for diff in diffs) / 1e6:+.1f} MB",
+                "",
+            ] + [str(diff) for diff in diffs[:25]]
+
+            session = self.session
+            profile_id = self.store(ProfileCapture(
+                'memory', label, duration, '\n'.join(lines) + '\n',
+                session['id'] if session is not None and session['trace_memory'] else None
+            ))
+            if session is not None and session['trace_memory']:
+                session['profile_ids'].append(profile_id)
+            logger.info(f"Memory snapshot {profile_id} for {label}: peak {peak / 1e6:.1f} MB")
+
+
+profiler = Profiler(
+    admin_token=os.getenv('PROFILING_ADMIN_TOKEN') or None,
+    sample_interval=float(os.getenv('PROFILING_SAMPLE_INTERVAL_MS', 5)) / 1000.0,
+    always_trace_memory=os.getenv('PROFILING_TRACE_MEMORY', '').lower() in ('1', 'true', 'yes'),
+)
+
+
+class ProfilingMiddleware:
+    """Profile single requests on request, or the next N during a session"""
+
+    def __init__(self, app, profiler: Profiler = profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.profiler.enabled or scope["path"].startswith("/debug/"):
+            await self.app(scope, receive, send)
+            return
+
+        mode, session = self._requested_mode(scope)
+        active = self.profiler.begin(mode) if mode else None
+        if active is None:
+            await self.app(scope, receive, send)
+            return
+
+        label = f"{scope['method']} {scope['path']}"
+        # Reserve the id up front so the response header can name the capture
+        profile_id = self.profiler.reserve_id()
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile_id.encode("latin-1")))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            self.profiler.end(active, label, session['id'] if session else None, profile_id)
+            if session is not None:
+                session['profile_ids'].append(profile_id)
+
+    def _requested_mode(self, scope):
+        """(mode, session) for this request, or (None, None) when not profiled"""
+        headers = dict(scope.get("headers", []))
+        mode = headers.get(b"x-profile", b"").decode("latin-1").lower()
+        token = headers.get(b"x-admin-token", b"").decode("latin-1") or None
+
+        if b"profile" in scope.get("query_string", b""):
+            query = parse_qs(scope["query_string"].decode("latin-1"))
+            mode = mode or query.get("profile", [""])[0].lower()
+            token = token or query.get("admin_token", [None])[0]
+
+        if mode in ("1", "true"):
+            mode = "cprofile"
+        if mode in PROFILE_MODES and self.profiler.is_admin(token):
+            return mode, None
+
+        session = self.profiler.claim_request()
+        if session is not None:
+            return session['mode'], session
+        return None, None
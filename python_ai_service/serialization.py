@@ -0,0 +1,117 @@
+"""
+Fast JSON encoding for API responses
+
+Encodes plain dicts/lists straight to bytes, using orjson when it is
+installed (with native NumPy support) and the standard library otherwise.
+Both produce the same compact wire format as FastAPI's default JSONResponse,
+and both write NaN and infinite floats as null.
+"""
+
+import json
+import math
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from fastapi.responses import Response
+
+from ml_models.metrics import stage_timer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+MODEL_VERSION = "v2.1"
+
+
+def _json_default(value: Any) -> Any:
+    """Encode NumPy scalars and arrays, and timestamps, for either encoder"""
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    if isinstance(value, (datetime, pd.Timestamp)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _replace_non_finite(value: Any) -> Any:
+    """Copy of value with NaN and infinite floats as None, as orjson writes them"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _replace_non_finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_replace_non_finite(item) for item in value]
+    if isinstance(value, (np.generic, np.ndarray)):
+        return _replace_non_finite(value.tolist())
+    return value
+
+
+def _stdlib_dumps(content: Any) -> bytes:
+    return json.dumps(
+        content, default=_json_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to compact JSON bytes"""
+    with stage_timer("serialization"):
+        if orjson is not None:
+            return orjson.dumps(content, default=_json_default, option=ORJSON_OPTIONS)
+        try:
+            return _stdlib_dumps(content)
+        except ValueError:
+            # Non-finite floats are rare, so only then is the content copied
+            return _stdlib_dumps(_replace_non_finite(content))
+
+
+class FastJSONResponse(Response):
+    """JSONResponse that skips response_model validation and encodes with dumps()"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def prediction_records(predictions: List[Dict[str, Any]], now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """Convert DiseasePredictor output to the PredictionResponse wire format.
+
+    The field order and types match PredictionResponse, so the encoded
+    output is what response_model validation would have produced. The
+    timestamp is taken once for the whole batch.
+    """
+    now = now or datetime.now()
+    id_prefix = f"pred-{now.strftime('%Y%m%d%H%M%S')}-"
+    timestamp = now.isoformat()
+
+    records = [
+        {
+            "id": f"{id_prefix}{i}",
+            "district": str(pred["district"]),
+            "disease": str(pred["disease"]),
+            "riskLevel": str(pred["risk_level"]),
+            "probability": float(pred["probability"]),
+            "confidence": float(pred["confidence"]),
+            "timeframe": pred["timeframe"],
+            "factors": pred["factors"],
+            "environmentalData": {k: float(v) for k, v in pred["environmental_data"].items()},
+            "populationData": {k: float(v) for k, v in pred["population_data"].items()},
+            "historicalTrend": pred["historical_trend"],
+            "recommendations": pred["recommendations"],
+            "createdAt": timestamp,
+            "updatedAt": timestamp,
+            "modelVersion": MODEL_VERSION,
+            "stale": None
+        }
+        for i, pred in enumerate(predictions)
+    ]
+    # Stale predictions (served past a request deadline) keep the time they were made
+    for record, pred in zip(records, predictions):
+        if pred.get("stale"):
+            record["createdAt"] = record["updatedAt"] = pred["materialized_at"]
+            record["stale"] = True
+    return records
@@ -0,0 +1,83 @@
+"""
+Single-flight request coalescing for the AI prediction service
+
+Concurrent requests that normalize to the same key share one computation:
+the first (leader) starts it in the threadpool, later ones (coalesced) await
+the same future. The computation's result or exception is delivered to every
+waiter, and the key is released as soon as it finishes, so nothing is cached
+beyond the in-flight window.
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from ml_models.metrics import REGISTRY
+from profiling import profiler
+
+logger = logging.getLogger(__name__)
+
+SINGLE_FLIGHT_REQUESTS = REGISTRY.counter(
+    'single_flight_requests_total',
+    'Requests served by single-flight groups, by role (leader computed, coalesced waited)',
+    ('group', 'role')
+)
+SINGLE_FLIGHT_TIMEOUTS = REGISTRY.counter(
+    'single_flight_timeouts_total',
+    'Waiters that gave up on an in-flight computation',
+    ('group',)
+)
+SINGLE_FLIGHT_ERRORS = REGISTRY.counter(
+    'single_flight_errors_total',
+    'Shared computations that raised',
+    ('group',)
+)
+
+
+class SingleFlightTimeout(asyncio.TimeoutError):
+    """Raised to a waiter whose timeout expired before the shared result was ready"""
+
+
+class SingleFlight:
+    """Coalesces identical in-flight computations within one event loop"""
+
+    def __init__(self, group: str, timeout: float = 30.0):
+        self.group = group
+        self.timeout = timeout
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    async def do(self, key: Hashable, function: Callable[..., Any], *args,
+                 timeout: Optional[float] = None, **kwargs) -> Any:
+        """Run `function(*args, **kwargs)` once per key for all concurrent callers"""
+        future = self._in_flight.get(key)
+        if future is None:
+            role = 'leader'
+            future = asyncio.ensure_future(run_in_threadpool(profiler.run_in_capture, function, *args, **kwargs))
+            self._in_flight[key] = future
+            future.add_done_callback(lambda done, key=key: self._release(key, done))
+        else:
+            role = 'coalesced'
+        SINGLE_FLIGHT_REQUESTS.inc(self.group, role)
+
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            # Shielded so a waiter timing out (or disconnecting) never cancels
+            # the computation other waiters depend on
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            SINGLE_FLIGHT_TIMEOUTS.inc(self.group)
+            raise SingleFlightTimeout(f"Timed out after {timeout}s waiting for {self.group} {key!r}")
+
+    def _release(self, key: Hashable, future: asyncio.Future):
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        # Retrieve the exception so it is not reported as unhandled when
+        # every waiter has already timed out
+        if not future.cancelled() and future.exception() is not None:
+            SINGLE_FLIGHT_ERRORS.inc(self.group)
+            logger.warning(f"Single-flight {self.group} {key!r} failed: {future.exception()}")
@@ -1,8 +1,16 @@
 #!/usr/bin/env python3
 """
 NE HealthNet AI Prediction Service Startup Script
+
+Development (default): single process, with auto-reload unless started
+as `python app.py` or with --no-reload.
+Production (--production): data and models are loaded once in a master
+process, which then forks worker processes that share them. Refreshes and
+ingested records are applied in the master, which re-forks the workers.
 """
 
+import argparse
+import logging
 import uvicorn
 import sys
 import os
@@ -11,23 +19,61 @@ from pathlib import Path
 # Add the current directory to Python path
 sys.path.append(str(Path(__file__).parent))
 
-def main():
-    """Start the AI prediction service"""
+def parse_args(reload: bool = True):
+    parser = argparse.ArgumentParser(description="Start the NE HealthNet AI Prediction Service")
+    parser.add_argument("--reload", action=argparse.BooleanOptionalAction, default=reload,
+                        help="Restart on code changes in development mode")
+    parser.add_argument("--production", action="store_true",
+                        help="Preload models once and serve from forked worker processes")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", 0)) or os.cpu_count(),
+                        help="Worker processes in production mode (default: WEB_CONCURRENCY or CPU count)")
+    parser.add_argument("--max-requests", type=int, default=int(os.getenv("MAX_REQUESTS", 10000)),
+                        help="Recycle a worker after this many requests, 0 to disable")
+    parser.add_argument("--max-requests-jitter", type=int, default=1000,
+                        help="Random extra requests per worker so they don't recycle together")
+    parser.add_argument("--graceful-timeout", type=int, default=30,
+                        help="Seconds a worker gets to finish in-flight requests on shutdown")
+    parser.add_argument("--refork-interval", type=float, default=float(os.getenv("REFORK_INTERVAL", 10)),
+                        help="Minimum seconds between re-forking the workers for ingested records")
+    return parser.parse_args()
+
+def main(reload: bool = True):
+    """Start the AI prediction service; `reload` is the development mode default"""
+    args = parse_args(reload)
+    
     print("🚀 Starting NE HealthNet AI Prediction Service...")
     print("📊 Loading CSV data and training ML models...")
-    print("🌐 Starting FastAPI server on http://localhost:8000")
-    print("📖 API Documentation: http://localhost:8000/docs")
-    print("🔍 Health Check: http://localhost:8000/health")
+    print(f"🌐 Starting FastAPI server on http://localhost:{args.port}")
+    print(f"📖 API Documentation: http://localhost:{args.port}/docs")
+    print(f"🔍 Health Check: http://localhost:{args.port}/health")
     print("-" * 50)
     
     try:
-        uvicorn.run(
-            "app:app",
-            host="0.0.0.0",
-            port=8000,
-            reload=True,
-            log_level="info"
-        )
+        if args.production:
+            from production_server import PreforkServer
+            
+            logging.basicConfig(level=logging.INFO)
+            print(f"🏭 Production mode: {args.workers} workers sharing preloaded models")
+            PreforkServer(
+                app_module="app",
+                host=args.host,
+                port=args.port,
+                workers=args.workers,
+                max_requests=args.max_requests,
+                max_requests_jitter=args.max_requests_jitter,
+                graceful_timeout=args.graceful_timeout,
+                refork_interval=args.refork_interval
+            ).run()
+        else:
+            uvicorn.run(
+                "app:app",
+                host=args.host,
+                port=args.port,
+                reload=args.reload,
+                log_level="info"
+            )
     except KeyboardInterrupt:
         print("\n👋 Shutting down AI Prediction Service...")
     except Exception as e:
@@ -29,6 +29,8 @@ export interface Prediction {
   createdAt: string;
   updatedAt: string;
   modelVersion: string;
+  // Set when the service served its last materialized prediction past a request deadline
+  stale?: boolean;
 }
 
 export interface PredictionRequest {
@@ -44,6 +46,10 @@ export interface RefreshResponse {
   message: string;
   predictions_updated: number;
   timestamp: string;
+  decision?: 'skip' | 'forecast_only' | 'full';
+  reason?: string;
+  fingerprint?: string;
+  drift?: Record<string, any>;
 }
 
 export interface ForecastResponse {
@@ -60,6 +66,59 @@ export interface ForecastResponse {
   };
 }
 
+export interface RegionForecastResponse {
+  region: string;
+  level: 'district' | 'state' | 'region' | 'custom';
+  districts: string[];
+  districts_without_models: string[];
+  forecast_period: string;
+  generated_at: string;
+  dates: string[];
+  disease_forecasts: Record<string, { predicted_cases: number[]; districts_reporting: number }>;
+  district_totals: Record<string, number>;
+  summary: {
+    total_predicted_cases: number;
+    highest_risk_disease: string;
+    average_confidence: number;
+    diseases_forecasted: number;
+    districts_forecasted: number;
+    risk_assessment: string;
+  };
+}
+
+export interface ForecastSummaryUpdate {
+  total_predicted_cases: number | null;
+  highest_risk_disease: string | null;
+  risk_assessment: string | null;
+}
+
+export interface PredictionSnapshot {
+  version: number;
+  risks: Record<string, Record<string, { riskLevel: Prediction['riskLevel']; probability: number }>>;
+  forecasts: Record<string, ForecastSummaryUpdate>;
+}
+
+export interface PredictionDiff {
+  version: number;
+  previous_version: number;
+  generated_at: string;
+  risk_changes: {
+    district: string;
+    disease: string;
+    riskLevel: Prediction['riskLevel'] | null;
+    previousRiskLevel: Prediction['riskLevel'] | null;
+    probability: number | null;
+  }[];
+  forecast_changes: (ForecastSummaryUpdate & { district: string; previous: ForecastSummaryUpdate | null })[];
+}
+
+export interface PredictionUpdateHandlers {
+  onSnapshot?: (snapshot: PredictionSnapshot) => void;
+  onDiff?: (diff: PredictionDiff) => void;
+  /** The client fell behind; refetch full predictions */
+  onResync?: () => void;
+}
+
 class AIPredictionService {
   private baseUrl: string;
 
@@ -183,6 +242,51 @@ class AIPredictionService {
     }
   }
 
+  /**
+   * Get an aggregated forecast for a state, 'Northeast', or a set of districts
+   */
+  async getRegionForecast(region: string | string[], days: number = 30): Promise<RegionForecastResponse> {
+    try {
+      const query = Array.isArray(region)
+        ? `districts=${encodeURIComponent(region.join(','))}`
+        : `region=${encodeURIComponent(region)}`;
+      const response = await fetch(`${this.baseUrl}/forecast/region?${query}&days=${days}`);
+      
+      if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+      }
+
+      return await response.json();
+    } catch (error) {
+      console.error('Failed to get region forecast:', error);
+      throw error;
+    }
+  }
+
+  /**
+   * Subscribe to prediction changes pushed after each model refresh.
+   * Returns a function that closes the subscription.
+   */
+  subscribeToUpdates(handlers: PredictionUpdateHandlers): () => void {
+    const source = new EventSource(`${this.baseUrl}/subscribe`);
+
+    source.addEventListener('snapshot', (event) => {
+      handlers.onSnapshot?.(JSON.parse((event as MessageEvent).data));
+    });
+    source.addEventListener('diff', (event) => {
+      handlers.onDiff?.(JSON.parse((event as MessageEvent).data));
+    });
+    source.addEventListener('resync', () => {
+      handlers.onResync?.();
+    });
+    source.onerror = (error) => {
+      // EventSource reconnects on its own, resuming from the last event id
+      console.error('Prediction update stream error:', error);
+    };
+
+    return () => source.close();
+  }
+
   /**
    * Generate predictions for multiple districts
    */